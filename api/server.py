@@ -0,0 +1,1283 @@
+"""ProTrace backend: the Flask app and the services behind it.
+
+Imported by the ``api/index.py`` entry script once it is past
+``multiprocessing.freeze_support()``; render worker processes never import
+this module, so the caches, log listener and background managers below exist
+only in the server process.
+"""
+import time
+_process_start = time.perf_counter()
+
+from flask import Flask, request, jsonify, send_file, g
+from flask_cors import CORS
+import functools
+import importlib
+import io
+import base64
+import json
+import logging
+import sys
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the src directory to the path for both development and PyInstaller
+if hasattr(sys, '_MEIPASS'):
+    # PyInstaller bundle
+    src_path = os.path.join(sys._MEIPASS, 'src')
+else:
+    # Development
+    src_path = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+sys.path.insert(0, src_path)
+
+# Import our plotting modules. numpy, pandas and matplotlib are not imported
+# here: the server starts listening first and a background warm-up loads them.
+try:
+    import FontCache
+    if hasattr(sys, '_MEIPASS'):
+        # Persistent matplotlib cache seeded with the prebuilt font list, set
+        # before anything imports matplotlib (render workers inherit it)
+        FontCache.use_bundled_cache(os.path.join(sys._MEIPASS, 'mpl-cache'))
+    from DatasetCache import DatasetCache, content_digest
+    from Export import MIME_TYPES, QUALITIES, normalize_format, render_formats, zip_outputs
+    from RenderPool import RenderPool, RenderTimeoutError, apply_cosmetics, refresh_plot
+    from FigureStore import FigureStore, figure_key
+    from LiveAcquisition import LiveManager
+    from ImageCache import ImageCache, code_fingerprint, render_key
+    from Startup import Warmup
+    from Logs import setup_logging
+    from Jobs import JobManager, checkpoint
+    import Metrics
+    from Metrics import MetricsRegistry, SIZE_BUCKETS, stage
+except ImportError as e:
+    print(f"Failed to import modules: {e}")
+    print(f"Python path: {sys.path}")
+    print(f"Current directory: {os.getcwd()}")
+    print(f"Files in current directory: {os.listdir('.')}")
+    if os.path.exists('src'):
+        print(f"Files in src directory: {os.listdir('src')}")
+    raise
+
+# Log records go through a non-blocking queue into a ring buffer served by
+# /logs, stderr and optionally a rotating file; repeats are rate limited
+log_system = setup_logging(
+    level=os.environ.get('PROTRACE_LOG_LEVEL', 'INFO'),
+    capacity=int(os.environ.get('PROTRACE_LOG_BUFFER', '2000')),
+    file_path=os.environ.get('PROTRACE_LOG_FILE') or None,
+    file_max_bytes=int(os.environ.get('PROTRACE_LOG_FILE_MB', '10')) * 1024 * 1024,
+    file_backups=int(os.environ.get('PROTRACE_LOG_FILE_BACKUPS', '3')),
+    console=os.environ.get('PROTRACE_LOG_CONSOLE', '1') == '1',
+    rate=float(os.environ.get('PROTRACE_LOG_RATE', '5')),
+)
+log = logging.getLogger('protrace')
+
+# Seconds since process start at which start-up milestones were reached
+STARTUP_TIMES = {'imports': round(time.perf_counter() - _process_start, 4)}
+
+app = Flask(__name__)
+# Only the desktop webview and the dev server may call the API from a page;
+# the frontend reads ETag for conditional requests
+ALLOWED_ORIGINS = [o.strip() for o in os.environ.get(
+    'PROTRACE_ALLOWED_ORIGINS',
+    'tauri://localhost,https://tauri.localhost,http://localhost:3000,http://127.0.0.1:3000'
+).split(',') if o.strip()]
+CORS(app, origins=ALLOWED_ORIGINS, expose_headers=['ETag', 'X-Cache', 'Content-Disposition', 'Server-Timing'])
+
+# Files the user picked in a desktop dialog (POST /picked-paths), and the
+# directories exports may always be written to
+picked_paths = set()
+picked_paths_lock = threading.Lock()
+OUTPUT_DIRS = [os.path.realpath(d) for d in os.environ.get('PROTRACE_OUTPUT_DIRS', '').split(os.pathsep) if d]
+
+# Parsed datasets keyed by the SHA-256 of the uploaded workbook
+dataset_cache = DatasetCache(
+    max_bytes=int(os.environ.get('PROTRACE_DATASET_CACHE_MB', '256')) * 1024 * 1024,
+    max_entries=int(os.environ.get('PROTRACE_DATASET_CACHE_ENTRIES', '16')),
+)
+
+# Plates after a request's ``preprocessing`` pipeline, keyed by dataset and
+# pipeline; kept apart so they never evict an uploaded dataset
+preprocessed_cache = DatasetCache(
+    max_bytes=int(os.environ.get('PROTRACE_PREPROCESS_CACHE_MB', '128')) * 1024 * 1024,
+    max_entries=int(os.environ.get('PROTRACE_PREPROCESS_CACHE_ENTRIES', '16')),
+)
+
+# Pre-warmed render worker processes (0 workers renders inside the request thread)
+render_pool = RenderPool(
+    processes=int(os.environ.get('PROTRACE_RENDER_WORKERS', '2')),
+    timeout=float(os.environ.get('PROTRACE_RENDER_TIMEOUT', '60')),
+    max_jobs_per_worker=int(os.environ.get('PROTRACE_RENDER_MAX_JOBS', '50')),
+    mode=os.environ.get('PROTRACE_RENDER_MODE', 'process'),
+)
+
+# Last figure per job session, so title/label/font/width edits update it
+# instead of rebuilding it
+figure_store = FigureStore(max_entries=int(os.environ.get('PROTRACE_FIGURE_STORE_ENTRIES', '8')))
+# Builds the figure of a session whose render was answered from the image
+# cache, one at a time, so the session's next cosmetic edit can reuse it
+figure_builder = ThreadPoolExecutor(max_workers=1, thread_name_prefix='figure-builder')
+figure_builds = set()
+figure_builds_lock = threading.Lock()
+
+# Plate-reader exports followed while a run is acquiring (``live:<id>`` datasets)
+live_manager = LiveManager(
+    interval=float(os.environ.get('PROTRACE_LIVE_INTERVAL', '2')),
+    max_sources=int(os.environ.get('PROTRACE_LIVE_SOURCES', '4')),
+)
+
+# Resolution of previews (quality=preview) and of exports without an explicit dpi
+PREVIEW_DPI = int(os.environ.get('PROTRACE_PREVIEW_DPI', '96'))
+EXPORT_DPI = int(os.environ.get('PROTRACE_EXPORT_DPI', '150'))
+MIN_DPI, MAX_DPI = 36, 1200
+
+# Asynchronous render jobs (/jobs); a session's new job cancels its unfinished one
+job_manager = JobManager(
+    workers=int(os.environ.get('PROTRACE_JOB_WORKERS', str(max(1, render_pool.processes)))),
+    max_finished=int(os.environ.get('PROTRACE_JOB_HISTORY', '100')),
+)
+
+# Rendered images keyed by a hash of dataset, samples, settings and formats.
+# Set PROTRACE_IMAGE_CACHE_DIR to an empty string to keep images in memory only.
+image_cache = ImageCache(
+    max_bytes=int(os.environ.get('PROTRACE_IMAGE_CACHE_MB', '64')) * 1024 * 1024,
+    max_entries=int(os.environ.get('PROTRACE_IMAGE_CACHE_ENTRIES', '64')),
+    disk_dir=os.environ.get('PROTRACE_IMAGE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'protrace', 'image-cache')),
+    disk_max_bytes=int(os.environ.get('PROTRACE_IMAGE_CACHE_DISK_MB', '256')) * 1024 * 1024,
+    policy=os.environ.get('PROTRACE_IMAGE_CACHE_POLICY', 'lru'),
+)
+
+@functools.cache
+def render_salt():
+    """Fingerprint of the rendering code, so cached images never outlive it
+    (computed on first use, it imports matplotlib)"""
+    return code_fingerprint(src_path)
+
+# Request/stage latency histograms, payload sizes and cache counters for /metrics
+metrics = MetricsRegistry()
+metrics.histogram('protrace_http_request_duration_seconds', 'Request latency by endpoint, method and status')
+metrics.histogram('protrace_stage_duration_seconds', 'Time spent per processing stage')
+metrics.histogram('protrace_http_request_bytes', 'Request body size by endpoint', SIZE_BUCKETS)
+metrics.histogram('protrace_http_response_bytes', 'Response body size by endpoint', SIZE_BUCKETS)
+metrics.counter('protrace_latency_budget_exceeded_total', 'Requests slower than PROTRACE_LATENCY_BUDGET_MS')
+
+# Requests slower than this are logged with their stage breakdown (0 = off)
+LATENCY_BUDGET = float(os.environ.get('PROTRACE_LATENCY_BUDGET_MS', '0')) / 1000
+
+def cache_metrics():
+    """Scrape-time gauges and counters of the caches and the render pool"""
+    for name, cache_stats in (('dataset', dataset_cache.stats()), ('preprocessed', preprocessed_cache.stats()),
+                              ('image', image_cache.stats())):
+        hits = cache_stats['hits'] + cache_stats.get('disk_hits', 0)
+        lookups = hits + cache_stats['misses']
+        yield ('protrace_cache_hits_total', 'counter', 'Cache hits', {'cache': name}, hits)
+        yield ('protrace_cache_misses_total', 'counter', 'Cache misses', {'cache': name}, cache_stats['misses'])
+        yield ('protrace_cache_hit_ratio', 'gauge', 'Hits per lookup since start', {'cache': name}, hits / lookups if lookups else 0)
+        yield ('protrace_cache_entries', 'gauge', 'Entries held in memory', {'cache': name}, cache_stats['entries'])
+        yield ('protrace_cache_bytes', 'gauge', 'Bytes held in memory', {'cache': name}, cache_stats['bytes'])
+    image_stats = image_cache.stats()
+    yield ('protrace_image_cache_disk_hits_total', 'counter', 'Image cache hits served from disk', {}, image_stats['disk_hits'])
+    yield ('protrace_image_cache_disk_bytes', 'gauge', 'Bytes held in the on-disk image cache', {}, image_stats['disk_bytes'])
+    pool_stats = render_pool.stats()
+    for outcome in ('completed', 'failed', 'timeouts'):
+        yield ('protrace_render_jobs_total', 'counter', 'Render jobs by outcome', {'outcome': outcome}, pool_stats[outcome])
+    figure_stats = figure_store.stats()
+    yield ('protrace_figure_store_hits_total', 'counter', 'Session renders that updated the stored figure', {}, figure_stats['hits'])
+    yield ('protrace_figure_store_misses_total', 'counter', 'Session renders that rebuilt the figure', {}, figure_stats['misses'])
+    live_stats = live_manager.stats()
+    yield ('protrace_live_sources', 'gauge', 'Live sources being followed', {}, live_stats['sources'])
+    yield ('protrace_live_reads', 'gauge', 'Reads held by the live sources', {}, live_stats['reads'])
+    job_stats = job_manager.stats()
+    for state in ('done', 'failed', 'cancelled'):
+        yield ('protrace_async_jobs_total', 'counter', 'Finished /jobs jobs by state', {'state': state}, job_stats[state])
+    for state in ('queued', 'running'):
+        yield ('protrace_async_jobs', 'gauge', 'Unfinished /jobs jobs by state', {'state': state}, job_stats[state])
+
+metrics.add_collector(cache_metrics)
+
+def import_modules(*names):
+    """Warm-up phase importing *names*"""
+    return lambda: [importlib.import_module(name) for name in names]
+
+def backend_ready(warmup):
+    # Machine-readable line the desktop shell waits for (flushed: stdout is a pipe there)
+    print(f"PROTRACE_READY port={SERVER_PORT} seconds={warmup.elapsed():.3f} {warmup.summary()}", flush=True)
+
+# Start-up work done in the background once the server is listening; the
+# phase timings are the import-time breakdown reported by /ready. Worker
+# processes are spawned first so they warm up alongside this process, unless
+# they have to wait for the system fonts to be added to a fresh font cache.
+SERVER_PORT = 5001
+# loopback only unless PROTRACE_HOST opts in to listening on the network
+SERVER_HOST = os.environ.get('PROTRACE_HOST', '127.0.0.1')
+warmup = Warmup([
+    *([] if FontCache.system_fonts_pending() else [('spawn_workers', render_pool.start)]),
+    ('numpy', import_modules('numpy')),
+    ('pandas', import_modules('pandas')),
+    ('openpyxl', import_modules('openpyxl')),
+    ('matplotlib', import_modules('matplotlib', 'matplotlib.figure', 'matplotlib.backends.backend_agg')),
+    ('fonts', FontCache.add_system_fonts),
+    ('modules', import_modules('Ingestion', 'PlateMatrix', 'Preprocessing', 'Sample', 'ProtPlotting', 'Kinetics', 'LiveAcquisition')),
+    ('render_salt', render_salt),
+    ('render_pool', lambda: render_pool.start(wait=True)),
+], on_ready=backend_ready)
+
+@app.before_request
+def start_request_timer():
+    g.timer = Metrics.StageTimer()
+    g.timer_token = Metrics.activate(g.timer)
+
+@app.after_request
+def report_request_timing(response):
+    """Expose the stage breakdown as Server-Timing and feed the histograms"""
+    timer = g.get('timer')
+    if timer is None:
+        return response
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    response.headers['Server-Timing'] = timer.server_timing()
+
+    elapsed = timer.elapsed()
+    metrics.observe('protrace_http_request_duration_seconds', elapsed,
+                    endpoint=endpoint, method=request.method, status=str(response.status_code))
+    for name, seconds in timer.stages():
+        metrics.observe('protrace_stage_duration_seconds', seconds, stage=name)
+    metrics.observe('protrace_http_request_bytes', request.content_length or 0, endpoint=endpoint)
+    if not response.direct_passthrough:
+        metrics.observe('protrace_http_response_bytes', response.calculate_content_length() or 0, endpoint=endpoint)
+    elif response.content_length is not None:
+        metrics.observe('protrace_http_response_bytes', response.content_length, endpoint=endpoint)
+
+    if LATENCY_BUDGET and elapsed > LATENCY_BUDGET:
+        metrics.inc('protrace_latency_budget_exceeded_total', endpoint=endpoint)
+        log.warning("Latency budget exceeded: %s %s took %.0f ms (%s)",
+                    request.method, endpoint, elapsed * 1000, response.headers['Server-Timing'])
+    return response
+
+@app.teardown_request
+def stop_request_timer(exc):
+    token = g.pop('timer_token', None)
+    if token is not None:
+        try:
+            Metrics.deactivate(token)
+        except ValueError:
+            # created in a different context (e.g. a streamed response)
+            pass
+
+def load_dataset(file_data):
+    """Parse and preprocess an uploaded workbook (called on cache misses only)"""
+    # Parse the Excel file. The header row (``Time`` + well IDs) and the end
+    # of the read block are detected while streaming the sheet; every well
+    # is kept because the parsed plate is shared by all sample layouts.
+    from Ingestion import read_plate_excel
+    from PlateMatrix import PlateMatrix
+    from Preprocessing import pre_process_df
+
+    try:
+        with stage('parse'):
+            df = read_plate_excel(file_data)
+        log.info("Loaded Excel file: %d reads x %d wells", df.shape[0], df.shape[1] - 1)
+        log.debug("Column names: %s", list(df.columns))
+
+    except Exception as e:
+        log.warning("Error reading Excel file: %s", e)
+        raise ValueError(f"Could not read Excel file. Please ensure it is a valid Excel file with a 'Time' column followed by well IDs. Error: {str(e)}")
+
+    checkpoint()
+    # Keep every read with data; a request's ``preprocessing`` pipeline runs
+    # on the cached plate later (see preprocess_plate)
+    try:
+        with stage('preprocess'):
+            processed_df = pre_process_df(df)
+        log.debug("Processed data shape: %s", processed_df.shape)
+    except Exception as e:
+        log.warning("Error preprocessing data: %s", e)
+        raise ValueError(f"Could not preprocess data: {str(e)}")
+
+    # One contiguous reads x wells matrix shared by every Sample of the dataset;
+    # the time axis is resolved here once so cached plates carry it along
+    with stage('matrix'):
+        plate = PlateMatrix.from_dataframe(processed_df)
+        plate.time_axis
+    return plate
+
+class DatasetNotFoundError(LookupError):
+    """Raised when a request references a dataset id that is not cached"""
+
+def resolve_live(dataset_id):
+    """``(versioned key, plate snapshot)`` of a ``live:<id>`` dataset, ``None`` for other ids
+
+    The key carries the read count, so renders of a grown plate never hit an
+    image cached for fewer reads.
+    """
+    source = live_manager.resolve(dataset_id)
+    if source is None:
+        if dataset_id.startswith('live:'):
+            raise DatasetNotFoundError(f"Live source {dataset_id} is unknown or was stopped")
+        return None
+    plate = source.snapshot()
+    if plate is None:
+        raise RenderRequestError(f"Live source {dataset_id} has no reads yet")
+    return f"{dataset_id}@{plate.n_reads}", plate
+
+def preprocessing_pipeline(data):
+    """Canonical ``preprocessing`` pipeline of a request body (``{}`` for none)"""
+    from Preprocessing import normalize_pipeline
+
+    try:
+        return normalize_pipeline(data.get('preprocessing'))
+    except ValueError as e:
+        raise RenderRequestError(str(e)) from None
+
+def preprocess_plate(plate_key, plate, pipeline):
+    """*plate* after *pipeline*, computed once per dataset and pipeline
+
+    *plate_key* is the ``pipeline_key`` of the dataset; every sample and
+    re-render of the same dataset and pipeline shares the cached result.
+    """
+    if not pipeline:
+        return plate
+    processed = preprocessed_cache.get(plate_key)
+    if processed is None:
+        from Preprocessing import run_pipeline
+
+        try:
+            with stage('preprocess'):
+                processed = run_pipeline(plate, pipeline)
+        except ValueError as e:
+            raise RenderRequestError(str(e)) from None
+        preprocessed_cache.put(plate_key, processed)
+        log.debug("Preprocessed %s: %s", plate_key[:12], pipeline)
+    return processed
+
+def sample_datasets(data, samples_config):
+    """Ids of the other datasets that ``samplesConfig`` entries take samples from"""
+    own = data.get('datasetId')
+    ids = []
+    for entry in samples_config:
+        dataset_id = entry.get('datasetId') if isinstance(entry, dict) else None
+        if dataset_id and dataset_id != own and dataset_id not in ids:
+            if not isinstance(dataset_id, str):
+                raise RenderRequestError("samplesConfig datasetId must be a string")
+            ids.append(dataset_id)
+    return ids
+
+def resolve_sample_plates(data, samples_config, pipeline):
+    """``(keys, plates)`` of the other datasets named in ``samplesConfig``
+
+    Every workbook is parsed once by the dataset cache, so a figure comparing
+    plates only looks them up. *keys* (live sources with their read count)
+    join the render key; *plates* maps dataset id to the preprocessed plate.
+    """
+    from Preprocessing import pipeline_key
+
+    keys, plates = [], {}
+    for dataset_id in sample_datasets(data, samples_config):
+        key, plate = resolve_dataset({'datasetId': dataset_id})
+        key = pipeline_key(key, pipeline)
+        keys.append(key)
+        plates[dataset_id] = preprocess_plate(key, plate, pipeline)
+    return keys, plates
+
+def sample_plates(plate, others):
+    """What the samples are built from: the request's *plate*, or a dict by dataset id
+
+    With samples from other workbooks the request's own plate is keyed
+    ``None`` (see ``Sample.samples_from_config``).
+    """
+    return {None: plate, **others} if others else plate
+
+def dataset_available(dataset_id):
+    if dataset_id.startswith('live:'):
+        return live_manager.resolve(dataset_id) is not None
+    # a probe, not a use: no hit/miss and no change to the eviction order
+    return dataset_id in dataset_cache
+
+def resolve_dataset(data):
+    """Return ``(dataset_id, plate)`` for a request body.
+
+    The body either references a previously uploaded dataset (or a live
+    source) through ``datasetId`` or carries the workbook inline as base64
+    ``fileData``.
+    """
+    dataset_id = data.get('datasetId')
+    if dataset_id:
+        live = resolve_live(dataset_id)
+        if live is not None:
+            return live
+        plate = dataset_cache.get(dataset_id)
+        if plate is None:
+            raise DatasetNotFoundError(f"Dataset {dataset_id} is unknown or has expired, please upload it again")
+        return dataset_id, plate
+
+    # Reuse the parsed dataset when this exact payload was seen before;
+    # the base64 text itself is hashed so a hit skips decoding as well.
+    file_data_b64 = data['fileData']
+    payload_alias = content_digest(file_data_b64.encode('ascii'))
+    dataset_key = dataset_cache.resolve_alias(payload_alias)
+    plate = dataset_cache.get(dataset_key) if dataset_key else None
+    if plate is not None:
+        log.debug("Using cached dataset %s", dataset_key[:12])
+        return dataset_key, plate
+
+    # Decode base64 file data
+    try:
+        with stage('decode'):
+            file_data = base64.b64decode(file_data_b64)
+        log.debug("Decoded file data: %d bytes", len(file_data))
+    except Exception as e:
+        log.warning("Error decoding base64 data: %s", e)
+        raise ValueError(f"Invalid base64 data: {str(e)}")
+
+    return dataset_cache.get_or_load(file_data, load_dataset, alias=payload_alias)
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Health check endpoint"""
+    return jsonify({
+        "status": "healthy",
+        "message": "Python backend is running",
+        "renderPool": render_pool.stats(),
+        "jobs": job_manager.stats(),
+        "figureStore": figure_store.stats(),
+        "live": live_manager.stats(),
+        "imageCache": image_cache.stats()
+    })
+
+@app.route('/ready', methods=['GET'])
+def readiness():
+    """Start-up progress: 200 once the backend is warm, 503 with the current phase before"""
+    status = warmup.status()
+    status['startup'] = STARTUP_TIMES
+    return jsonify(status), 200 if status['ready'] else 503
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus text-format metrics (latency histograms, cache hit rates, payload sizes)"""
+    return app.response_class(metrics.expose(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/logs', methods=['GET'])
+def logs_endpoint():
+    """Recent log records from the ring buffer (desktop app only)
+
+    ``since`` returns only records after that sequence number (poll with the
+    returned ``lastSeq``), ``level`` sets the minimum level, ``limit`` caps
+    the number of records (default 200, newest kept).
+    """
+    if not is_trusted_request():
+        return untrusted_response("Log requests are")
+    level_name = request.args.get('level', 'DEBUG').upper()
+    level = logging.getLevelName(level_name)
+    if not isinstance(level, int):
+        return jsonify({"success": False, "error": f"Unknown log level {level_name}"}), 400
+    records = log_system.ring.records(
+        since=request.args.get('since', 0, type=int),
+        level=level,
+        limit=request.args.get('limit', 200, type=int),
+    )
+    return jsonify({"success": True, "records": records, **log_system.stats()})
+
+@app.route('/datasets', methods=['POST'])
+def upload_dataset():
+    """Upload a workbook once and get back an id for later requests
+
+    Accepts either a multipart form with a ``file`` field or the raw workbook
+    bytes as the request body (e.g. ``application/octet-stream``).
+    """
+    try:
+        upload = request.files.get('file')
+        file_data = upload.read() if upload is not None else request.get_data(cache=False)
+        if not file_data:
+            return jsonify({"success": False, "error": "No file data provided"}), 400
+
+        dataset_id, plate = dataset_cache.get_or_load(file_data, load_dataset)
+        if dataset_id not in dataset_cache:
+            # larger than the whole cache: the id would not resolve on the next request
+            log.warning("Rejected dataset %s: %d bytes parsed, cache holds %d",
+                        dataset_id[:12], plate.nbytes, dataset_cache.max_bytes)
+            return jsonify({
+                "success": False,
+                "error": (f"Dataset is too large to keep: it needs {plate.nbytes / 2**20:.1f} MB parsed, "
+                          f"the dataset cache holds {dataset_cache.max_bytes / 2**20:.1f} MB "
+                          "(PROTRACE_DATASET_CACHE_MB)"),
+                "code": "dataset_too_large"
+            }), 413
+        log.info("Registered dataset %s (%d bytes)", dataset_id[:12], len(file_data))
+
+        return jsonify({
+            "success": True,
+            "datasetId": dataset_id,
+            "size": len(file_data),
+            "shape": list(plate.shape)
+        })
+
+    except Exception as e:
+        log.error("Error uploading dataset: %s", e)
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/datasets/<dataset_id>', methods=['GET'])
+def get_dataset(dataset_id):
+    """Report whether an uploaded dataset (or a ``live:`` source) is still available
+
+    A live source reports the shape of the reads it has so far.
+    """
+    source = live_manager.resolve(dataset_id)
+    if source is not None:
+        plate = source.snapshot()
+        shape = list(plate.shape) if plate is not None else [0, 0]
+    else:
+        plate = None if dataset_id.startswith('live:') else dataset_cache.peek(dataset_id)
+        if plate is None:
+            return jsonify({
+                "success": False,
+                "error": f"Dataset {dataset_id} is unknown or has expired",
+                "code": "dataset_not_found"
+            }), 404
+        shape = list(plate.shape)
+    return jsonify({
+        "success": True,
+        "datasetId": dataset_id,
+        "shape": shape
+    })
+
+class RenderRequestError(ValueError):
+    """Raised for a malformed render request (answered with 400)"""
+
+def render_resolution(data):
+    """``(dpi, quality)`` of a render request
+
+    ``quality`` is ``export`` (default; tight bounding box, full PNG
+    compression) or ``preview`` (fixed layout, fast compression, screen dpi).
+    """
+    quality = data.get('quality') or 'export'
+    if quality not in QUALITIES:
+        raise RenderRequestError(f"quality must be one of {', '.join(QUALITIES)}")
+    dpi = data.get('dpi')
+    if dpi is None:
+        return (PREVIEW_DPI if quality == 'preview' else EXPORT_DPI), quality
+    if isinstance(dpi, bool) or not isinstance(dpi, (int, float)) or not MIN_DPI <= dpi <= MAX_DPI:
+        raise RenderRequestError(f"dpi must be a number between {MIN_DPI} and {MAX_DPI}")
+    return int(round(dpi)), quality
+
+def check_alignment(plot_settings):
+    """Validate ``plotSettings.align``: ``true`` or ``{"step": minutes, "span": ...}``"""
+    align = plot_settings.get('align')
+    if not align or align is True:
+        return
+    from PlateMatrix import ALIGN_SPANS
+
+    if not isinstance(align, dict) or set(align) - {'step', 'span'}:
+        raise RenderRequestError("plotSettings.align must be true or an object with step and span")
+    step = align.get('step')
+    if step is not None and (isinstance(step, bool) or not isinstance(step, (int, float)) or step <= 0):
+        raise RenderRequestError("plotSettings.align.step must be a positive number of minutes")
+    if align.get('span', 'shortest') not in ALIGN_SPANS:
+        raise RenderRequestError(f"plotSettings.align.span must be one of {', '.join(ALIGN_SPANS)}")
+
+def check_artists(plot_settings):
+    """Validate ``plotSettings.artists`` (``sample`` or ``replicate``)"""
+    artists = plot_settings.get('artists', 'sample')
+    from ProtPlotting import _ARTIST_MODES
+
+    if artists not in _ARTIST_MODES:
+        raise RenderRequestError(f"plotSettings.artists must be one of {', '.join(_ARTIST_MODES)}")
+
+def parse_render_request(data):
+    """Validate a render request body
+
+    Returns ``(samples_config, plot_settings, formats, zipped)``; *zipped* is
+    true when several formats were requested through ``exportFormats``.
+    """
+    if not data:
+        raise RenderRequestError("No data provided")
+    render_resolution(data)
+    preprocessing_pipeline(data)
+
+    # Extract components
+    samples_config = data.get('samplesConfig')
+    plot_settings = data.get('plotSettings')
+    export_format = normalize_format(data.get('exportFormat'))
+    # Several formats at once are rendered from one figure and zipped
+    export_formats = data.get('exportFormats')
+    if export_formats is not None:
+        if not isinstance(export_formats, list):
+            raise RenderRequestError("exportFormats must be a list")
+        export_formats = [f for f in (str(f).lower() for f in export_formats) if f in MIME_TYPES]
+        if not export_formats:
+            raise RenderRequestError(f"exportFormats must contain at least one of {', '.join(MIME_TYPES)}")
+
+    if not (data.get('datasetId') or data.get('fileData')) or not all([samples_config, plot_settings]):
+        raise RenderRequestError("Missing required data")
+    check_alignment(plot_settings)
+    check_artists(plot_settings)
+
+    return samples_config, plot_settings, export_formats or [export_format], export_formats is not None
+
+def entity_tag(cache_key, variant=None):
+    """ETag of one representation of a render (raw bytes, or e.g. the JSON wrapper)"""
+    return cache_key if variant is None else f"{cache_key}-{variant}"
+
+def render_cached(data, samples_config, plot_settings, formats, conditional=True, variant=None, session=None):
+    """Return ``(cache_key, outputs, cache_status)`` for a validated request
+
+    *outputs* is ``None`` (status ``not-modified``) when *conditional* and the
+    client's ``If-None-Match`` already names this render's *variant*. With a
+    *session*, its last figure is reused when only cosmetic settings changed
+    or a live dataset gained reads (status ``cosmetic``). Samples may come
+    from other datasets through their own ``datasetId``.
+    """
+    from Preprocessing import pipeline_key
+
+    # A dataset id is enough to key the render; inline workbooks are
+    # hashed (and parsed) first and live sources keyed by their read count
+    plate = None
+    dataset_key = data.get('datasetId')
+    if not dataset_key or dataset_key.startswith('live:'):
+        dataset_key, plate = resolve_dataset(data)
+    # Renders are keyed by the dataset as preprocessed; the pipeline itself
+    # only runs once a plate is actually needed
+    pipeline = preprocessing_pipeline(data)
+    plate_key = pipeline_key(dataset_key, pipeline)
+    # Samples taken from other workbooks add their datasets to the key
+    other_keys, others = resolve_sample_plates(data, samples_config, pipeline)
+    data_key = '&'.join([plate_key, *other_keys])
+
+    dpi, quality = render_resolution(data)
+    cache_key = render_key(data_key, samples_config, plot_settings, formats, dpi,
+                           quality=quality, salt=render_salt())
+
+    # The client already holds this exact image
+    if conditional and entity_tag(cache_key, variant) in request.if_none_match:
+        return cache_key, None, 'not-modified'
+
+    # A session's last figure only needs new cosmetics when its data is the
+    # same, or new reads when it shows an earlier version of a live dataset
+    live_id = data['datasetId'] if (data.get('datasetId') or '').startswith('live:') else None
+    live = bool(live_id) or any(dataset_id.startswith('live:') for dataset_id in others)
+    version = data_key if live else None
+    fig_key = None
+    if session:
+        stable_key = '&'.join([pipeline_key(live_id, pipeline) if live_id else plate_key,
+                               *(pipeline_key(dataset_id, pipeline) for dataset_id in others)])
+        fig_key = figure_key(stable_key, samples_config, plot_settings, salt=render_salt())
+
+    outputs = image_cache.get(cache_key)
+    if outputs is not None:
+        log.debug("Using cached render %s", cache_key[:12])
+        if session and not figure_store.holds(session, fig_key):
+            build_session_figure(session, fig_key, version, data, plate, plate_key, pipeline, others,
+                                 samples_config, plot_settings, formats, dpi)
+        return cache_key, outputs, 'hit'
+    if plate is not None:
+        plate = preprocess_plate(plate_key, plate, pipeline)
+
+    if session:
+        if plate is None and live:
+            dataset_key, plate = resolve_dataset(data)
+            plate = preprocess_plate(plate_key, plate, pipeline)
+        outputs = render_cosmetic(session, fig_key, plot_settings, formats, dpi, quality,
+                                  plate=sample_plates(plate, others), samples_config=samples_config,
+                                  version=version)
+        if outputs is not None:
+            image_cache.put(cache_key, outputs)
+            log.info("Updated the figure of session %s as %s", session[:12], ', '.join(outputs).upper())
+            return cache_key, outputs, 'cosmetic'
+
+    if plate is None:
+        dataset_key, plate = resolve_dataset(data)
+        plate = preprocess_plate(plate_key, plate, pipeline)
+    checkpoint()
+    # Requests arriving during start-up wait for the fonts and workers
+    # (started here when the app is served without the __main__ block)
+    with stage('warmup'):
+        warmup.start().wait(render_pool.timeout)
+    # Render on a warm worker: samples, figure and every requested format
+    # "render" is the wall time incl. queueing; the worker's own stages are merged in
+    plates = sample_plates(plate, others)
+    with stage('render'):
+        if session:
+            outputs, fig = render_pool.render_figure(plates, samples_config, plot_settings, formats, dpi, quality)
+            figure_store.put(session, fig_key, fig, version)
+        else:
+            outputs = render_pool.render(plates, samples_config, plot_settings, formats, dpi, quality)
+    image_cache.put(cache_key, outputs)
+    log.info("Rendered %d samples as %s", len(samples_config), ', '.join(outputs).upper())
+    return cache_key, outputs, 'miss'
+
+def build_session_figure(session, fig_key, version, data, plate, plate_key, pipeline, others,
+                         samples_config, plot_settings, formats, dpi):
+    """Build the session's figure in the background after an image-cache hit
+
+    The hit itself needs no figure, but without one the session's next
+    cosmetic edit would rebuild from scratch. The session's figure of other
+    data is dropped now; one it gets from a render in the meantime is kept.
+    """
+    with figure_builds_lock:
+        if session in figure_builds:
+            return
+        figure_builds.add(session)
+    figure_store.discard(session)
+
+    def build():
+        try:
+            built = plate
+            if built is None:
+                _, built = resolve_dataset(data)
+            built = preprocess_plate(plate_key, built, pipeline)
+            warmup.start().wait(render_pool.timeout)
+            _, fig = render_pool.render_figure(sample_plates(built, others), samples_config, plot_settings,
+                                               formats[:1], dpi, 'preview')
+            figure_store.put(session, fig_key, fig, version, replace=False)
+            log.debug("Built the figure of session %s after a cached render", session[:12])
+        except Exception as e:
+            log.warning("Could not build the figure of session %s: %s", session[:12], e)
+        finally:
+            with figure_builds_lock:
+                figure_builds.discard(session)
+
+    figure_builder.submit(build)
+
+def render_cosmetic(session, fig_key, plot_settings, formats, dpi, quality,
+                    plate=None, samples_config=None, version=None):
+    """Outputs of the session's stored figure updated to *plot_settings*, or
+    ``None`` when there is no figure of the same data to update
+
+    A figure of an older *version* of a live dataset is first moved to the
+    reads of *plate*.
+    """
+    entry = figure_store.take(session, fig_key)
+    if entry is None:
+        return None
+    fig, fig_version = entry
+    checkpoint()
+    # Drawn in this thread: the figure lives in this process
+    with stage('render'):
+        if fig_version != version:
+            refresh_plot(fig, plate, samples_config, plot_settings)
+        apply_cosmetics(fig, plot_settings)
+        outputs = render_formats(fig, formats, dpi=dpi, quality=quality)
+    figure_store.put(session, fig_key, fig, version)
+    return outputs
+
+def tag_response(response, cache_key, cache_status, variant=None):
+    """Attach the render's ETag so clients can revalidate instead of re-downloading"""
+    response.set_etag(entity_tag(cache_key, variant))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Cache'] = cache_status
+    return response
+
+def render_failure(e):
+    """Error response shared by the render endpoints"""
+    if isinstance(e, RenderRequestError):
+        return jsonify({"error": str(e)}), 400
+    if isinstance(e, RenderTimeoutError):
+        log.error("Render timed out: %s", e)
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 504
+    if isinstance(e, DatasetNotFoundError):
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "code": "dataset_not_found"
+        }), 404
+    log.error("Error generating plot: %s", e, exc_info=e)
+    return jsonify({
+        "success": False,
+        "error": str(e)
+    }), 500
+
+def output_payload(outputs, formats, zipped):
+    """``(payload, mime, extension)`` of a render: one format's bytes, or all of them zipped"""
+    if zipped:
+        with stage('zip'):
+            return zip_outputs(outputs), 'application/zip', 'zip'
+    extension = formats[0]
+    return outputs[extension], MIME_TYPES[extension], extension
+
+def payload_response(payload, mime, extension, zipped):
+    return send_file(
+        io.BytesIO(payload),
+        mimetype=mime,
+        as_attachment=zipped,
+        download_name=f'protrace_plot.{extension}'
+    )
+
+def is_local_request():
+    """True when the request comes from this machine"""
+    return request.remote_addr in ('127.0.0.1', '::1', '::ffff:127.0.0.1')
+
+def is_trusted_request():
+    """True when the request comes from this machine and not from a foreign web page
+
+    A browser always sends ``Origin`` with a cross-site POST or fetch, so a
+    request is trusted only without one (a local tool) or from one of
+    ALLOWED_ORIGINS (the desktop app); an opaque ``null`` origin is refused.
+    """
+    if not is_local_request():
+        return False
+    origin = request.headers.get('Origin')
+    return origin is None or origin in ALLOWED_ORIGINS
+
+def untrusted_response(what):
+    return jsonify({
+        "success": False,
+        "error": f"{what} only accepted from the desktop app",
+        "code": "untrusted_origin"
+    }), 403
+
+def real_dir_path(path):
+    """*path* with its directory resolved (symlinks, ``..``), so it compares with picked paths"""
+    return os.path.join(os.path.realpath(os.path.dirname(path)), os.path.basename(path))
+
+def output_dir_allowed(directory):
+    """True when *directory* holds a file the user picked or lies in PROTRACE_OUTPUT_DIRS"""
+    with picked_paths_lock:
+        if any(os.path.dirname(p) == directory for p in picked_paths):
+            return True
+    return any(directory == d or directory.startswith(d.rstrip(os.sep) + os.sep) for d in OUTPUT_DIRS)
+
+def write_output(path, payload, extension):
+    """Write *payload* to the caller-given *path* (atomically) and return its size"""
+    if not os.path.isabs(path):
+        raise RenderRequestError("outputPath must be an absolute path")
+    path = real_dir_path(path)
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    allowed = {'jpg', 'jpeg'} if extension in ('jpg', 'jpeg') else {extension}
+    if ext not in allowed:
+        raise RenderRequestError(f"outputPath must end in .{extension} for this export")
+    if not os.path.isdir(os.path.dirname(path)):
+        raise RenderRequestError(f"Directory {os.path.dirname(path)} does not exist")
+    if not output_dir_allowed(os.path.dirname(path)):
+        raise RenderRequestError(
+            f"Directory {os.path.dirname(path)} was not chosen in a save dialog (POST /picked-paths) "
+            "or listed in PROTRACE_OUTPUT_DIRS"
+        )
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as fh:
+        fh.write(payload)
+    os.replace(tmp_path, path)
+    return len(payload)
+
+@app.route('/picked-paths', methods=['POST'])
+def pick_path():
+    """Record a path the user chose in a desktop file dialog (desktop app only)
+
+    Exports may then be written to its directory with ``outputPath``, and
+    ``/live`` may follow it.
+    """
+    if not is_trusted_request():
+        return untrusted_response("Picked paths are")
+    path = (request.get_json(silent=True) or {}).get('path')
+    if not isinstance(path, str) or not os.path.isabs(path):
+        return jsonify({"success": False, "error": "path must be an absolute path"}), 400
+    path = real_dir_path(path)
+    with picked_paths_lock:
+        picked_paths.add(path)
+    log.info("User picked %s", path)
+    return jsonify({"success": True, "path": path})
+
+@app.route('/generate-plot', methods=['POST'])
+def generate_plot():
+    """Generate plot from uploaded Excel data and sample configuration"""
+    try:
+        # Get the request data
+        data = request.get_json()
+        samples_config, plot_settings, formats, zipped = parse_render_request(data)
+        # The JSON wrapper is a different representation than /render's bytes
+        variant = None if zipped else 'json'
+
+        cache_key, outputs, cache_status = render_cached(
+            data, samples_config, plot_settings, formats, variant=variant
+        )
+        if outputs is None:
+            return tag_response(app.response_class(status=304), cache_key, cache_status, variant)
+
+        if zipped:
+            # Built once, every requested format returned zipped
+            with stage('zip'):
+                archive = zip_outputs(outputs)
+            response = send_file(
+                io.BytesIO(archive),
+                mimetype='application/zip',
+                as_attachment=True,
+                download_name='protrace_plot.zip'
+            )
+            return tag_response(response, cache_key, cache_status)
+
+        # Convert to base64 for response
+        export_format = formats[0]
+        mime = MIME_TYPES[export_format]
+        with stage('encode_base64'):
+            img_data = base64.b64encode(outputs[export_format]).decode('utf-8')
+        img_url = f"data:{mime};base64,{img_data}"
+        
+        log.debug("Plot generation completed successfully")
+
+        response = jsonify({
+            "success": True,
+            "imageUrl": img_url,
+            "message": f"Plot generated successfully as {export_format.upper()}"
+        })
+        return tag_response(response, cache_key, cache_status, variant)
+        
+    except Exception as e:
+        return render_failure(e)
+
+@app.route('/render', methods=['POST'])
+def render_plot():
+    """Render a plot and return the raw image bytes (or write them to ``outputPath``)
+
+    Takes the same body as ``/generate-plot``. The response is the encoded
+    image with its own content type instead of a base64 data URL in JSON, or
+    a zip archive for ``exportFormats``. With ``outputPath`` (desktop app
+    only, in a directory the user picked) the file is written there directly
+    and a JSON summary is returned.
+    """
+    try:
+        data = request.get_json()
+        samples_config, plot_settings, formats, zipped = parse_render_request(data)
+
+        output_path = data.get('outputPath')
+        if output_path and not is_trusted_request():
+            return untrusted_response("outputPath is")
+
+        cache_key, outputs, cache_status = render_cached(
+            data, samples_config, plot_settings, formats, conditional=not output_path
+        )
+        if outputs is None:
+            return tag_response(app.response_class(status=304), cache_key, cache_status)
+
+        payload, mime, extension = output_payload(outputs, formats, zipped)
+        if output_path:
+            size = write_output(output_path, payload, extension)
+            log.info("Wrote %d bytes to %s", size, output_path)
+            return jsonify({
+                "success": True,
+                "path": output_path,
+                "size": size,
+                "format": extension,
+                "message": f"Plot saved as {extension.upper()}"
+            })
+
+        return tag_response(payload_response(payload, mime, extension, zipped), cache_key, cache_status)
+
+    except Exception as e:
+        return render_failure(e)
+
+def run_render_job(data, samples_config, plot_settings, formats, zipped):
+    """Job body: render (or fetch from the image cache) outside any request"""
+    checkpoint()
+    cache_key, outputs, cache_status = render_cached(
+        data, samples_config, plot_settings, formats, conditional=False,
+        session=data.get('sessionId') and str(data['sessionId'])
+    )
+    return cache_key, outputs, cache_status, formats, zipped
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue a render and return its job id at once (``202``)
+
+    Takes the same body as ``/render`` (without ``outputPath``) plus an
+    optional ``sessionId``; a new job of a session cancels the session's
+    unfinished one. Poll ``GET /jobs/<id>``, then fetch ``/jobs/<id>/result``.
+    """
+    try:
+        data = request.get_json()
+        samples_config, plot_settings, formats, zipped = parse_render_request(data)
+        if data.get('outputPath'):
+            raise RenderRequestError("outputPath is not supported for jobs, use /render")
+        # Fail fast on an expired dataset so the client can re-upload
+        for dataset_id in [data.get('datasetId'), *sample_datasets(data, samples_config)]:
+            if dataset_id and not dataset_available(dataset_id):
+                raise DatasetNotFoundError(f"Dataset {dataset_id} is unknown or has expired, please upload it again")
+
+        session = data.get('sessionId')
+        job, superseded = job_manager.submit(
+            run_render_job, data, samples_config, plot_settings, formats, zipped,
+            session=str(session) if session else None,
+        )
+        if superseded:
+            log.info("Job %s supersedes %s", job.id[:12], ', '.join(j.id[:12] for j in superseded))
+
+        response = jsonify({
+            "success": True,
+            **job.to_dict(),
+            "superseded": [j.id for j in superseded]
+        })
+        response.status_code = 202
+        response.headers['Location'] = f'/jobs/{job.id}'
+        return response
+
+    except Exception as e:
+        return render_failure(e)
+
+def job_not_found(job_id):
+    return jsonify({
+        "success": False,
+        "error": f"Job {job_id} is unknown or has expired",
+        "code": "job_not_found"
+    }), 404
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Job state; ``wait=<seconds>`` long-polls until it finishes
+    (or, with ``state=<state>``, until it leaves that state)"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return job_not_found(job_id)
+    wait = min(max(request.args.get('wait', 0, type=float), 0), 30)
+    if wait:
+        job_manager.wait(job, wait, request.args.get('state'))
+    return jsonify({"success": True, **job.to_dict()})
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running job"""
+    job = job_manager.cancel(job_id, reason="cancelled by client")
+    if job is None:
+        return job_not_found(job_id)
+    return jsonify({"success": True, **job.to_dict()})
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """The finished job's image like ``/render`` (``202`` while pending, ``410`` if cancelled)"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return job_not_found(job_id)
+    if job.state == 'failed':
+        return render_failure(job.exception)
+    if job.state == 'cancelled':
+        return jsonify({"success": False, **job.to_dict()}), 410
+    if job.state != 'done':
+        response = jsonify({"success": True, **job.to_dict()})
+        response.status_code = 202
+        response.headers['Retry-After'] = '1'
+        return response
+
+    cache_key, outputs, cache_status, formats, zipped = job.result
+    if cache_key in request.if_none_match:
+        return tag_response(app.response_class(status=304), cache_key, 'not-modified')
+    payload, mime, extension = output_payload(outputs, formats, zipped)
+    return tag_response(payload_response(payload, mime, extension, zipped), cache_key, cache_status)
+
+# Options of /analyze: request field -> (fit_kinetics keyword, default)
+ANALYSIS_OPTIONS = {
+    'window': ('window', 5),
+    'baselineReads': ('baseline_reads', 5),
+    'plateauReads': ('plateau_reads', 5),
+}
+
+def analysis_options(data):
+    """Keyword arguments of ``fit_kinetics`` from the optional ``analysis`` object"""
+    options = data.get('analysis') or {}
+    if not isinstance(options, dict):
+        raise RenderRequestError("analysis must be an object")
+    unknown = set(options) - set(ANALYSIS_OPTIONS)
+    if unknown:
+        raise RenderRequestError(f"Unknown analysis option(s) {', '.join(sorted(unknown))}; use {', '.join(ANALYSIS_OPTIONS)}")
+    kwargs = {}
+    for field, (keyword, default) in ANALYSIS_OPTIONS.items():
+        value = options.get(field, default)
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise RenderRequestError(f"analysis.{field} must be a positive integer")
+        kwargs[keyword] = value
+    return kwargs
+
+@app.route('/analyze', methods=['POST'])
+def analyze():
+    """Kinetic parameters of every sample well: lag time, maximum slope, plateau, half-time
+
+    Takes ``datasetId`` or ``fileData``, ``samplesConfig`` and optional
+    ``preprocessing`` like ``/render`` plus optional ``analysis`` options.
+    Returns a per-well table and a per-sample summary (mean, SD, n) as JSON,
+    or with ``format: "csv"`` the per-well table as a CSV file.
+    """
+    try:
+        data = request.get_json()
+        if not data or not data.get('samplesConfig') or not (data.get('datasetId') or data.get('fileData')):
+            raise RenderRequestError("Missing required data")
+        options = analysis_options(data)
+        pipeline = preprocessing_pipeline(data)
+        as_csv = data.get('format') == 'csv'
+
+        from Kinetics import analyze_samples
+        from Preprocessing import pipeline_key
+        from Sample import samples_from_config
+
+        dataset_key, plate = resolve_dataset(data)
+        plate = preprocess_plate(pipeline_key(dataset_key, pipeline), plate, pipeline)
+        _, others = resolve_sample_plates(data, data['samplesConfig'], pipeline)
+        with stage('samples'):
+            samples = samples_from_config(sample_plates(plate, others), data['samplesConfig'])
+        wells, summary = analyze_samples(samples, **options)
+        log.info("Analyzed %d wells of %d samples", len(wells), len(summary))
+
+        if as_csv:
+            response = app.response_class(wells.to_csv(index=False), mimetype='text/csv')
+            response.headers['Content-Disposition'] = 'attachment; filename=protrace_kinetics.csv'
+            return response
+        return jsonify({
+            "success": True,
+            "datasetId": dataset_key,
+            "units": {"time": "min", "slope": "per min"},
+            # to_json writes NaN (no transition) as null
+            "wells": json.loads(wells.to_json(orient='records')),
+            "samples": json.loads(summary.to_json(orient='records'))
+        })
+
+    except Exception as e:
+        return render_failure(e)
+
+def live_not_found(live_id):
+    return jsonify({
+        "success": False,
+        "error": f"Live source {live_id} is unknown or was stopped",
+        "code": "live_not_found"
+    }), 404
+
+@app.route('/live', methods=['POST'])
+def open_live():
+    """Follow a plate-reader export on local disk while the run is acquiring (desktop app only)
+
+    ``path`` is a ``.csv``/``.xlsx`` export or a directory of per-read dumps
+    that the user picked in a file dialog (see ``/picked-paths``);
+    optional ``interval`` (seconds between polls) and ``timeCol``. The
+    returned ``datasetId`` (``live:<id>``) works wherever a dataset id does;
+    renders with a ``sessionId`` move the session's figure to the new reads.
+    """
+    if not is_trusted_request():
+        return untrusted_response("Live sources are")
+    try:
+        data = request.get_json() or {}
+        path = data.get('path')
+        if not path or not os.path.isabs(path):
+            raise RenderRequestError("path must be an absolute path")
+        path = real_dir_path(path)
+        with picked_paths_lock:
+            picked = path in picked_paths
+        if not picked:
+            raise RenderRequestError(f"{path} was not picked in a file dialog (POST /picked-paths)")
+        interval = data.get('interval')
+        if interval is not None and (isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval < 0.1):
+            raise RenderRequestError("interval must be at least 0.1 seconds")
+        try:
+            source = live_manager.open(path, time_col=data.get('timeCol') or 'Time', interval=interval)
+        except (OSError, ValueError) as e:
+            raise RenderRequestError(str(e))
+        return jsonify({"success": True, **source.status()})
+
+    except Exception as e:
+        return render_failure(e)
+
+@app.route('/live', methods=['GET'])
+def list_live():
+    """The live sources being followed"""
+    return jsonify({"success": True, "sources": [s.status() for s in live_manager.sources()]})
+
+@app.route('/live/<live_id>', methods=['GET'])
+def live_status(live_id):
+    """Live source state; ``wait=<seconds>`` long-polls until it has more than ``since`` reads"""
+    source = live_manager.get(live_id)
+    if source is None:
+        return live_not_found(live_id)
+    wait = min(max(request.args.get('wait', 0, type=float), 0), 30)
+    if wait:
+        source.wait(request.args.get('since', source.reads, type=int), wait)
+    return jsonify({"success": True, **source.status()})
+
+@app.route('/live/<live_id>', methods=['DELETE'])
+def close_live(live_id):
+    """Stop following a live source (its ``live:`` dataset id stops working)"""
+    source = live_manager.close(live_id)
+    if source is None:
+        return live_not_found(live_id)
+    log.info("Stopped live source %s after %d read(s)", live_id[:12], source.reads)
+    return jsonify({"success": True, **source.status()})
+
+@app.route('/test-packages', methods=['GET'])
+def test_packages():
+    """Test if all required packages are available"""
+    try:
+        # Test pandas
+        import pandas as pd
+        df = pd.DataFrame({'test': [1, 2, 3]})
+        
+        # Test numpy
+        import numpy as np
+        arr = np.array([1, 2, 3])
+        
+        # Test matplotlib
+        import matplotlib
+        from matplotlib.figure import Figure
+        fig = Figure()
+        ax = fig.add_subplot()
+        ax.plot([1, 2, 3], [1, 2, 3])
+        fig.savefig(io.BytesIO(), format='png')
+        
+        # Test openpyxl
+        import openpyxl
+        
+        return jsonify({
+            "success": True,
+            "message": "All packages working correctly",
+            "packages": {
+                "pandas": pd.__version__,
+                "numpy": np.__version__,
+                "matplotlib": matplotlib.__version__,
+                "openpyxl": openpyxl.__version__
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+def main():
+    """Serve the app on SERVER_PORT until interrupted"""
+    from werkzeug.serving import make_server
+
+    log.info("Starting Python backend server...")
+    log.info("Available endpoints:\n%s", "\n".join([
+        "  GET  /health - Health check",
+        "  GET  /ready - Start-up progress (503 until warm)",
+        "  GET  /logs - Recent log records (desktop app only)",
+        "  GET  /test-packages - Test package availability",
+        "  GET  /metrics - Prometheus metrics (request and stage latencies, caches)",
+        "  POST /datasets - Upload a workbook, returns a dataset id",
+        "  GET  /datasets/<id> - Check that an uploaded dataset is available",
+        "  POST /generate-plot - Generate plot from data (exportFormats -> zip)",
+        "  POST /render - Same as /generate-plot, returns raw image bytes or writes outputPath",
+        "  POST /picked-paths - Record a path chosen in a desktop dialog (desktop app only)",
+        "  POST /jobs - Queue a render (sessionId supersedes), GET/DELETE /jobs/<id>, GET /jobs/<id>/result",
+        "  POST /analyze - Lag time, max slope, plateau and half-time of every sample well",
+        "  POST /live - Follow a picked export (desktop app only), GET/DELETE /live/<id>, GET /live",
+    ]))
+
+    # Bind the port before the heavy imports so clients can connect at once;
+    # the reloader would start a second server process (and pool)
+    app.debug = os.environ.get('PROTRACE_DEBUG') == '1'
+    if app.debug:
+        from werkzeug.debug import DebuggedApplication
+        server = make_server(SERVER_HOST, SERVER_PORT, DebuggedApplication(app, evalex=True), threaded=True)
+    else:
+        server = make_server(SERVER_HOST, SERVER_PORT, app, threaded=True)
+    STARTUP_TIMES['listening'] = round(time.perf_counter() - _process_start, 4)
+    print(f"PROTRACE_LISTENING port={SERVER_PORT} seconds={STARTUP_TIMES['listening']:.3f}", flush=True)
+    log.info("Render pool: %d %s worker(s)", render_pool.processes, render_pool.mode)
+
+    warmup.start()
+    try:
+        server.serve_forever()
+    finally:
+        live_manager.shutdown()
+        job_manager.shutdown()
+        render_pool.shutdown()
+        log_system.stop()
@@ -0,0 +1,104 @@
+"""Draw time and vector export size of ``plot_stdized_samples`` per artist mode.
+
+Builds a synthetic full plate (96 wells, 361 reads, 32 samples of one
+background + two replicate wells) and, for every ``artists`` mode, times the
+figure build, an Agg draw and SVG/PDF encoding, and reports the file sizes
+(``raw KB``: the SVG as matplotlib writes it, before :func:`Export.compact_svg`).
+
+    python benchmarks/bench_artists.py [--repeat N] [--reads N]
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Export import save_figure  # noqa: E402
+from PlateMatrix import PlateMatrix  # noqa: E402
+from ProtPlotting import _ARTIST_MODES, plot_stdized_samples  # noqa: E402
+from Sample import samples_from_config  # noqa: E402
+from run import sample_layout  # noqa: E402
+from workbook import plate_wells, synthetic_values  # noqa: E402
+
+
+def synthetic_plate(reads: int = 361, seed: int = 0) -> PlateMatrix:
+    """Full 96-well plate of :func:`workbook.synthetic_values` traces read every 5 minutes."""
+    wells = plate_wells(96)
+    start = dt.datetime(2024, 1, 1, 9, 0)
+    time_col = pd.Series([(start + dt.timedelta(minutes=5 * i)).time() for i in range(reads)])
+    return PlateMatrix(synthetic_values(reads, len(wells), seed), wells, time_col)
+
+
+def _data_artists(fig) -> int:
+    """Artists carrying data points (dividers and the zero line are excluded)."""
+    ax = fig.axes[0]
+    return sum(line.get_marker() == "." for line in ax.lines) + len(ax.collections)
+
+
+def _raw_svg(fig) -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format="svg", bbox_inches="tight")
+    return buf.getvalue()
+
+
+def _best(fn, repeat: int) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(repeat: int = 3, reads: int = 361) -> list[dict]:
+    plate = synthetic_plate(reads)
+    config = sample_layout(plate.wells)
+    rows = []
+    for mode in _ARTIST_MODES:
+        def build():
+            samples = samples_from_config(plate, config)
+            return plot_stdized_samples(samples, figsize=(15, 5), title="Benchmark", artists=mode)[0]
+
+        t_build, fig = _best(build, repeat)
+        t_draw, _ = _best(fig.canvas.draw, repeat)
+        t_svg, svg = _best(lambda: save_figure(fig, "svg"), repeat)
+        t_pdf, pdf = _best(lambda: save_figure(fig, "pdf"), repeat)
+        rows.append({
+            "mode": mode,
+            "artists": _data_artists(fig),
+            "build_s": t_build,
+            "draw_s": t_draw,
+            "svg_s": t_svg,
+            "svg_kb": len(svg) / 1024,
+            "svg_raw_kb": len(_raw_svg(fig)) / 1024,
+            "pdf_s": t_pdf,
+            "pdf_kb": len(pdf) / 1024,
+        })
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="best of N timings (default 3)")
+    parser.add_argument("--reads", type=int, default=361, help="reads per well (default 361)")
+    args = parser.parse_args(argv)
+
+    header = (f"{'mode':<10}{'artists':>8}{'build s':>9}{'draw s':>9}{'svg s':>8}{'svg KB':>9}{'raw KB':>9}"
+              f"{'pdf s':>8}{'pdf KB':>9}")
+    print(header)
+    print("-" * len(header))
+    for r in run(args.repeat, args.reads):
+        print(f"{r['mode']:<10}{r['artists']:>8}{r['build_s']:>9.3f}{r['draw_s']:>9.3f}"
+              f"{r['svg_s']:>8.3f}{r['svg_kb']:>9.0f}{r['svg_raw_kb']:>9.0f}{r['pdf_s']:>8.3f}{r['pdf_kb']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Per-stage and end-to-end benchmarks of the plotting pipeline.
+
+Generates a synthetic workbook (see :mod:`workbook`) and times
+
+* ``ingest`` – ``read_plate_excel`` on the workbook bytes
+* ``preprocess`` – ``pre_process_df``
+* ``preprocess_pipeline`` – ``Preprocessing.run_pipeline`` with blank
+  subtraction, MAD outlier masking and Savitzky–Golay smoothing of every well
+* ``align_plates`` – resampling two plates onto a common time grid
+* ``stdized_diff_sample`` – ``Sample.stdized_diff_sample`` for every sample
+* ``stdized_diff_samples`` – the batched standardisation of all samples
+* ``summarize_samples`` – mean, SD, SEM and n of every sample in one pass
+* ``kinetics`` – ``Kinetics.analyze_samples`` (lag time, slope, plateau,
+  half-time of every replicate)
+* ``plot`` – ``plot_stdized_samples`` (figure build incl. layout)
+* ``plot_summary`` – the same with ``summary="sd"`` (mean line + band per sample)
+* ``serialize_<fmt>`` – encoding the figure per export format
+* ``e2e_cold`` – ``/generate-plot`` through the Flask test client with empty
+  dataset and image caches (inline workbook, rendered inline)
+* ``e2e_dataset_cached`` – same request with the dataset already parsed
+* ``e2e_image_cached`` – same request answered from the image cache
+
+Results can be saved as JSON and compared against an earlier run::
+
+    python benchmarks/run.py --save benchmarks/results/baseline.json
+    python benchmarks/run.py --compare benchmarks/results/baseline.json
+
+``--compare`` exits with status 1 when a stage is slower than the baseline
+by more than ``--threshold`` (median, default 10 %).
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import datetime as dt
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "src"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from workbook import TIME_FORMATS, make_workbook, plate_wells  # noqa: E402
+
+FORMATS = ("png", "svg", "pdf", "jpg")
+
+# ───────────────────────── helper utilities ──────────────────────────
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> dict[str, Any]:
+    """Run *fn* ``warmup + repeat`` times and summarise the timed runs (seconds)."""
+    for _ in range(warmup):
+        fn()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.fmean(runs),
+        "stdev": statistics.stdev(runs) if len(runs) > 1 else 0.0,
+        "runs": runs,
+    }
+
+
+def sample_layout(wells: list[str], replicates: int = 2, limit: int | None = None) -> list[dict]:
+    """One background well plus *replicates* sample wells per sample, in plate order."""
+    step = replicates + 1
+    layout = [
+        {"sampleName": f"S{i // step + 1}", "backgroundWell": wells[i], "sampleWells": wells[i + 1:i + step]}
+        for i in range(0, len(wells) - step + 1, step)
+    ]
+    return layout[:limit] if limit else layout
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment() -> dict[str, Any]:
+    import matplotlib
+    import numpy
+    import pandas
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "matplotlib": matplotlib.__version__,
+        "revision": _git_revision(),
+        "timestamp": dt.datetime.now().isoformat(timespec="seconds"),
+    }
+
+# ────────────────────────── the benchmarks ───────────────────────────
+
+def run_stages(
+    data: bytes, wells: list[str], layout: list[dict], reads_num: int, formats: list[str], repeat: int
+) -> dict[str, Any]:
+    from Export import save_figure
+    from Ingestion import read_plate_excel
+    from Kinetics import analyze_samples
+    from PlateMatrix import PlateMatrix, align_plates
+    from Preprocessing import normalize_pipeline, pre_process_df, run_pipeline
+    from ProtPlotting import plot_stdized_samples
+    from Sample import samples_from_config, stdized_diff_samples, summarize_samples
+
+    results = {"ingest": measure(lambda: read_plate_excel(data), repeat)}
+    df = read_plate_excel(data)
+    missing = [w for w in wells if w not in df.columns]
+    if missing:
+        # timings of a partial plate would pass for the full one
+        raise RuntimeError(f"Ingestion dropped {len(missing)} of {len(wells)} wells (e.g. {missing[0]})")
+    results["preprocess"] = measure(lambda: pre_process_df(df, reads_num=reads_num), repeat)
+    plate = PlateMatrix.from_dataframe(pre_process_df(df, reads_num=reads_num))
+    pipeline = normalize_pipeline({"blank": plate.wells[-1], "outliers": True, "smooth": True})
+    results["preprocess_pipeline"] = measure(lambda: run_pipeline(plate, pipeline), repeat)
+    results["align_plates"] = measure(lambda: align_plates({"a": plate, "b": plate}, step=0.5), repeat)
+    samples = samples_from_config(plate, layout)
+
+    results["stdized_diff_sample"] = measure(lambda: [s.stdized_diff_sample() for s in samples], repeat)
+    results["stdized_diff_samples"] = measure(lambda: stdized_diff_samples(samples), repeat)
+    results["summarize_samples"] = measure(lambda: summarize_samples(samples), repeat)
+    results["kinetics"] = measure(lambda: analyze_samples(samples), repeat)
+
+    def plot(summary=None):
+        return plot_stdized_samples(samples, figsize=(9, 5), title="Benchmark", subtitle="synthetic",
+                                    summary=summary)[0]
+
+    results["plot"] = measure(plot, repeat)
+    results["plot_summary"] = measure(lambda: plot("sd"), repeat)
+    fig = plot()
+    for fmt in formats:
+        results[f"serialize_{fmt}"] = measure(lambda: save_figure(fig, fmt), repeat)
+    return results
+
+
+def run_end_to_end(data: bytes, layout: list[dict], repeat: int) -> dict[str, Any]:
+    # inline rendering, memory-only image cache: measures the pipeline, not IPC or disk
+    os.environ.setdefault("PROTRACE_RENDER_WORKERS", "0")
+    os.environ["PROTRACE_IMAGE_CACHE_DIR"] = ""
+    os.environ.setdefault("PROTRACE_LOG_LEVEL", "WARNING")
+    sys.path.insert(0, os.path.join(ROOT, "api"))
+    import contextlib
+    import io
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import server
+    client = server.app.test_client()
+    body = {
+        "fileData": base64.b64encode(data).decode("ascii"),
+        "samplesConfig": layout,
+        "plotSettings": {"width": 9, "font": "DejaVu Sans", "title": "Benchmark",
+                         "subtitle": "synthetic", "yLabel": "$A_{350}$"},
+    }
+
+    def post():
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = client.post("/generate-plot", json=body)
+        if response.status_code != 200:
+            raise RuntimeError(f"/generate-plot failed: {response.status_code} {response.get_data(as_text=True)[:200]}")
+
+    def cold():
+        server.dataset_cache.clear()
+        server.image_cache.clear()
+        post()
+
+    def dataset_cached():
+        server.image_cache.clear()
+        post()
+
+    try:
+        return {
+            "e2e_cold": measure(cold, repeat),
+            "e2e_dataset_cached": measure(dataset_cached, repeat),
+            "e2e_image_cached": measure(post, repeat),
+        }
+    finally:
+        server.render_pool.shutdown()
+
+# ───────────────────────── reporting / comparison ─────────────────────
+
+def print_results(results: dict[str, Any]) -> None:
+    print(f"{'benchmark':<24}{'median ms':>12}{'min ms':>10}{'stdev ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<24}{r['median'] * 1000:>12.2f}{r['min'] * 1000:>10.2f}{r['stdev'] * 1000:>10.2f}")
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> bool:
+    """Print median ratios against *baseline*; return ``True`` if nothing regressed."""
+    ok = True
+    print(f"\n{'benchmark':<24}{'baseline ms':>12}{'now ms':>10}{'ratio':>8}")
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<24}{'-':>12}{r['median'] * 1000:>10.2f}{'new':>8}")
+            continue
+        ratio = r["median"] / base["median"] if base["median"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag, ok = "  REGRESSION", False
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<24}{base['median'] * 1000:>12.2f}{r['median'] * 1000:>10.2f}{ratio:>8.2f}{flag}")
+    return ok
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the ProTrace pipeline on a synthetic workbook.")
+    parser.add_argument("--plate", type=int, default=96, help="wells per plate (default 96)")
+    parser.add_argument("--reads", type=int, default=361, help="reads per well (default 361)")
+    parser.add_argument("--header-rows", type=int, default=30, help="metadata rows above the header (default 30)")
+    parser.add_argument("--time-format", choices=TIME_FORMATS, default="time")
+    parser.add_argument("--samples", type=int, default=None, help="limit the number of plotted samples")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="comma-separated export formats")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark (default 5)")
+    parser.add_argument("--only", choices=("stages", "e2e"), help="run just one group")
+    parser.add_argument("--save", metavar="JSON", help="write the results to this file")
+    parser.add_argument("--compare", metavar="JSON", help="compare against a saved run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown for --compare (default 0.10)")
+    args = parser.parse_args(argv)
+
+    params = {
+        "plate": args.plate, "reads": args.reads, "header_rows": args.header_rows,
+        "time_format": args.time_format, "samples": args.samples, "repeat": args.repeat,
+    }
+    data = make_workbook(plate=args.plate, reads=args.reads, header_rows=args.header_rows,
+                         time_format=args.time_format)
+    wells = plate_wells(args.plate)
+    layout = sample_layout(wells, limit=args.samples)
+    formats = [f.strip().lower() for f in args.formats.split(",") if f.strip()]
+
+    results: dict[str, Any] = {}
+    if args.only != "e2e":
+        results.update(run_stages(data, wells, layout, args.reads, formats, args.repeat))
+    if args.only != "stages":
+        results.update(run_end_to_end(data, layout, args.repeat))
+    print_results(results)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as fh:
+            json.dump({"environment": environment(), "params": params, "results": results}, fh, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        if baseline.get("params") != params:
+            print(f"\nWarning: baseline was run with different parameters: {baseline.get('params')}")
+        if not compare(results, baseline["results"], args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Synthetic plate-reader workbooks for benchmarks.
+
+The layout mimics a Gen5 export: a block of metadata rows, a header row with
+``Time``, a temperature column and one column per well, the kinetic reads, and
+a results block after a blank row.
+
+    python benchmarks/workbook.py out.xlsx --plate 384 --reads 2000 --time-format string
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import io
+
+import numpy as np
+from openpyxl import Workbook
+
+# wells per plate -> (rows, columns)
+PLATE_LAYOUTS = {6: (2, 3), 12: (3, 4), 24: (4, 6), 48: (6, 8), 96: (8, 12), 384: (16, 24), 1536: (32, 48)}
+TIME_FORMATS = ("time", "datetime", "timedelta", "string", "minutes")
+
+
+def plate_wells(plate: int) -> list[str]:
+    """Well IDs of a *plate*-well plate in row-major order (``A1``, ``A2``, …)."""
+    try:
+        rows, cols = PLATE_LAYOUTS[plate]
+    except KeyError:
+        raise ValueError(f"Unsupported plate size {plate}; use one of {', '.join(map(str, PLATE_LAYOUTS))}") from None
+    letters = [chr(ord("A") + r) if r < 26 else "A" + chr(ord("A") + r - 26) for r in range(rows)]
+    return [f"{row}{col}" for row in letters for col in range(1, cols + 1)]
+
+
+def _time_cells(reads: int, interval_s: float, time_format: str) -> list:
+    start = dt.datetime(2024, 4, 15, 9, 0, 0)
+    stamps = [start + dt.timedelta(seconds=i * interval_s) for i in range(reads)]
+    if time_format == "time":
+        return [s.time() for s in stamps]
+    if time_format == "datetime":
+        return stamps
+    if time_format == "timedelta":
+        return [s - start for s in stamps]
+    if time_format == "string":
+        return [s.strftime("%H:%M:%S") for s in stamps]
+    if time_format == "minutes":
+        return [i * interval_s / 60 for i in range(reads)]
+    raise ValueError(f"Unknown time format {time_format!r}; use one of {', '.join(TIME_FORMATS)}")
+
+
+def synthetic_values(reads: int, wells: int, seed: int = 0) -> np.ndarray:
+    """Sigmoidal A350-like traces with per-well lag, amplitude and read noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(reads, dtype=float)[:, None]
+    lag = rng.uniform(0.1, 0.6, wells) * reads
+    amp = rng.uniform(0.05, 0.8, wells)
+    width = rng.uniform(0.02, 0.06, wells) * reads
+    return 0.04 + amp / (1 + np.exp(-(t - lag) / width)) + rng.normal(0, 0.004, (reads, wells))
+
+
+def make_workbook(
+    path: str | None = None,
+    *,
+    plate: int = 96,
+    reads: int = 361,
+    header_rows: int = 30,
+    time_format: str = "time",
+    interval_s: float = 60.0,
+    seed: int = 0,
+    trailer: bool = True,
+) -> bytes:
+    """Build a workbook and return its bytes (also written to *path* if given).
+
+    Parameters
+    ----------
+    plate : int, default 96
+        Plate size (6, 12, 24, 48, 96, 384 or 1536 wells).
+    reads : int, default 361
+        Kinetic reads per well.
+    header_rows : int, default 30
+        Metadata rows above the ``Time`` header row.
+    time_format : {"time", "datetime", "timedelta", "string", "minutes"}
+        How the time column is stored.
+    interval_s : float, default 60
+        Seconds between reads.
+    trailer : bool, default True
+        Append a results block below the reads, as Gen5 does.
+    """
+    wells = plate_wells(plate)
+    times = _time_cells(reads, interval_s, time_format)
+    values = synthetic_values(reads, len(wells), seed).tolist()
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Plate 1")
+    for i in range(header_rows):
+        ws.append([f"Meta {i}", f"value {i}"])
+    ws.append([None, "Time", "T° 350"] + wells)
+    for t, row in zip(times, values):
+        ws.append([None, t, 25.0] + row)
+    if trailer:
+        ws.append([])
+        ws.append(["Results"])
+        ws.append(["Max V", 1, 2])
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    data = buf.getvalue()
+    if path:
+        with open(path, "wb") as fh:
+            fh.write(data)
+    return data
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic plate-reader workbook.")
+    parser.add_argument("path")
+    parser.add_argument("--plate", type=int, default=96)
+    parser.add_argument("--reads", type=int, default=361)
+    parser.add_argument("--header-rows", type=int, default=30)
+    parser.add_argument("--time-format", choices=TIME_FORMATS, default="time")
+    parser.add_argument("--interval", type=float, default=60.0, help="seconds between reads")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    data = make_workbook(
+        args.path, plate=args.plate, reads=args.reads, header_rows=args.header_rows,
+        time_format=args.time_format, interval_s=args.interval, seed=args.seed,
+    )
+    print(f"Wrote {args.path} ({len(data)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
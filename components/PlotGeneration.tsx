@@ -19,6 +19,17 @@ interface PlotSettings {
   yLabel: string;
 }
 
+const exportFormatOptions = ['png', 'svg', 'pdf', 'jpg'];
+
+// Resolution of exported raster images (PNG/JPG); 300/600 for journals
+const exportDpiOptions = [150, 300, 600];
+
+// Previews render at screen resolution with the backend's fast preview encoding
+const previewDpi = () => {
+  const ratio = typeof window !== 'undefined' ? window.devicePixelRatio || 1 : 1;
+  return Math.round(96 * Math.min(Math.max(ratio, 1), 2));
+};
+
 const fontOptions = [
   { value: 'Arial', label: 'Arial' },
   { value: 'serif', label: 'Serif' },
@@ -39,73 +50,103 @@ export default function PlotGeneration({ samples, uploadedFile, onBack }: PlotGe
   const [plotImageUrl, setPlotImageUrl] = useState<string | null>(null);
   const [isGenerating, setIsGenerating] = useState(false);
   const [pyScriptReady, setPyScriptReady] = useState(false);
+  // Start-up phase reported by /ready while the backend warms up
+  const [backendPhase, setBackendPhase] = useState<string | null>(null);
   const [exportingFormat, setExportingFormat] = useState<string | null>(null);
+  const [exportDpi, setExportDpi] = useState(300);
+  // Dataset id returned by /datasets for the currently uploaded file
+  const datasetRef = useRef<{ file: File; id: string } | null>(null);
+  // Images of earlier requests by request payload, revalidated through their ETag
+  const plotResultsRef = useRef(new Map<string, { etag: string; blob: Blob }>());
+  // Object URL of the preview currently shown
+  const previewUrlRef = useRef<string | null>(null);
+  // Preview jobs of this view share a session, so a new preview cancels the previous one
+  const sessionIdRef = useRef(Math.random().toString(36).slice(2));
+  const previewJobRef = useRef<string | null>(null);
+  const previewRequestRef = useRef(0);
 
-    useEffect(() => {
-    // Check if Python backend is available
-    const checkBackend = async () => {
+  useEffect(() => () => {
+    if (previewUrlRef.current) {
+      URL.revokeObjectURL(previewUrlRef.current);
+    }
+    if (previewJobRef.current) {
+      fetch(`http://localhost:5001/jobs/${previewJobRef.current}`, { method: 'DELETE' }).catch(() => {});
+    }
+  }, []);
+
+  useEffect(() => {
+    let cancelled = false;
+    let timer: ReturnType<typeof setTimeout> | undefined;
+    let unlisten: (() => void) | undefined;
+    const deadline = Date.now() + 60000;
+
+    // Poll /ready until the backend is warm. Before that it answers 503 with
+    // the current start-up phase (or refuses connections while it starts).
+    const pollReady = async () => {
+      clearTimeout(timer);
       try {
-        // Check if we're running in Tauri
-        if (typeof window !== 'undefined' && (window as any).__TAURI__) {
-          console.log('Running in Tauri, starting embedded Python backend...');
-          
-          // Dynamic import to avoid SSR issues
-          const { invoke } = await import('@tauri-apps/api/tauri');
-          
-          try {
-            const result = await invoke('start_python_backend');
-            console.log('Tauri backend start result:', result);
-            
-            // Wait a moment for the backend to start, then test connection
-            setTimeout(async () => {
-              try {
-                const response = await fetch('http://localhost:5001/health');
-                const healthResult = await response.json();
-                if (healthResult.status === 'healthy') {
-                  setPyScriptReady(true);
-                  console.log('Embedded Python backend is ready!');
-                }
-              } catch (e) {
-                console.log('Backend starting, will retry...');
-                // Retry after another delay
-                setTimeout(async () => {
-                  try {
-                    const response = await fetch('http://localhost:5001/health');
-                    const healthResult = await response.json();
-                    if (healthResult.status === 'healthy') {
-                      setPyScriptReady(true);
-                      console.log('Embedded Python backend is ready!');
-                    }
-                  } catch (retryError) {
-                    console.error('Failed to connect to embedded backend after retries');
-                  }
-                }, 3000);
-              }
-            }, 2000);
-            
-          } catch (tauriError) {
-            console.error('Failed to start embedded Python backend:', tauriError);
-          }
-        } else {
-          // Development mode - check localhost backend
-          console.log('Checking Python backend on localhost...');
-          const response = await fetch('http://localhost:5001/health');
-          const result = await response.json();
-          
-          if (result.status === 'healthy') {
-            setPyScriptReady(true);
-            console.log('Python backend is ready!');
-          } else {
-            console.log('Python backend is not healthy');
-          }
+        const response = await fetch('http://localhost:5001/ready');
+        const status = await response.json();
+        if (cancelled) return;
+        if (status.ready) {
+          setPyScriptReady(true);
+          setBackendPhase(null);
+          console.log(`Python backend is ready after ${status.elapsed.toFixed(1)} s`, status.phases);
+          return;
+        }
+        if (status.error) {
+          console.error('Python backend failed to start:', status.error);
+          setBackendPhase('failed');
+          return;
         }
+        setBackendPhase(status.phase);
       } catch (error) {
+        // not listening yet
+      }
+      if (cancelled) return;
+      if (Date.now() > deadline) {
         console.log('Python backend is not running on localhost:5001');
         console.log('Please start the Python backend server');
+        return;
       }
+      timer = setTimeout(pollReady, 250);
+    };
+
+    const checkBackend = async () => {
+      // Check if we're running in Tauri
+      if (typeof window !== 'undefined' && (window as any).__TAURI__) {
+        console.log('Running in Tauri, starting embedded Python backend...');
+
+        // Dynamic import to avoid SSR issues
+        const { invoke } = await import('@tauri-apps/api/tauri');
+        const { listen } = await import('@tauri-apps/api/event');
+        // The shell relays the backend's readiness line as an event
+        unlisten = await listen('backend-ready', () => pollReady());
+        if (cancelled) {
+          unlisten();
+          return;
+        }
+
+        try {
+          const result = await invoke('start_python_backend');
+          console.log('Tauri backend start result:', result);
+        } catch (tauriError) {
+          console.error('Failed to start embedded Python backend:', tauriError);
+          return;
+        }
+      } else {
+        // Development mode - check localhost backend
+        console.log('Checking Python backend on localhost...');
+      }
+      pollReady();
     };
 
     checkBackend();
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+      unlisten?.();
+    };
   }, []);
 
   const handleSettingChange = (field: keyof PlotSettings, value: string | number) => {
@@ -115,6 +156,150 @@ export default function PlotGeneration({ samples, uploadedFile, onBack }: PlotGe
     }));
   };
 
+  // Upload the workbook once as raw bytes and remember the returned dataset id
+  const ensureDataset = async (file: File, force = false): Promise<string> => {
+    if (!force && datasetRef.current && datasetRef.current.file === file) {
+      return datasetRef.current.id;
+    }
+    const response = await fetch('http://localhost:5001/datasets', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/octet-stream' },
+      body: file
+    });
+    const result = await response.json();
+    if (!result.success) {
+      throw new Error(result.error || 'Failed to upload data file');
+    }
+    datasetRef.current = { file, id: result.datasetId };
+    console.log('Uploaded dataset:', result.datasetId, 'Size:', result.size, 'bytes');
+    return result.datasetId;
+  };
+
+  // POST to /render (or /jobs) by dataset id, re-uploading once if the backend evicted it
+  const postPlot = async (
+    file: File,
+    payload: Record<string, unknown>,
+    headers: Record<string, string> = {},
+    endpoint = '/render'
+  ): Promise<Response> => {
+    let datasetId = await ensureDataset(file);
+    for (let attempt = 0; ; attempt++) {
+      const response = await fetch(`http://localhost:5001${endpoint}`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', ...headers },
+        body: JSON.stringify({ datasetId, ...payload })
+      });
+      if (response.status === 404 && attempt === 0) {
+        const result = await response.clone().json();
+        if (result.code === 'dataset_not_found') {
+          datasetId = await ensureDataset(file, true);
+          continue;
+        }
+      }
+      return response;
+    }
+  };
+
+  // Read the image bytes of a render response; a 304 means the cached blob is still current
+  const readImage = async (
+    response: Response,
+    cacheKey: string,
+    cached: { etag: string; blob: Blob } | undefined
+  ): Promise<Blob> => {
+    if (response.status === 304 && cached) {
+      return cached.blob;
+    }
+    if (!response.ok) {
+      const result = await response.json();
+      throw new Error(result.error || 'Failed to generate plot');
+    }
+    const blob = await response.blob();
+    const etag = response.headers.get('ETag');
+    if (etag) {
+      const results = plotResultsRef.current;
+      results.delete(cacheKey);
+      results.set(cacheKey, { etag, blob });
+      if (results.size > 20) {
+        results.delete(results.keys().next().value as string);
+      }
+    }
+    return blob;
+  };
+
+  const imageCacheKey = (file: File, payload: Record<string, unknown>) =>
+    `${file.name}:${file.size}:${file.lastModified}:${JSON.stringify(payload)}`;
+
+  // Fetch the rendered image bytes in one request
+  const requestImage = async (file: File, payload: Record<string, unknown>): Promise<Blob> => {
+    const cacheKey = imageCacheKey(file, payload);
+    const cached = plotResultsRef.current.get(cacheKey);
+    const response = await postPlot(file, payload, cached ? { 'If-None-Match': cached.etag } : {});
+    return readImage(response, cacheKey, cached);
+  };
+
+  // Render a preview as a background job of this view's session. Submitting
+  // cancels the session's previous preview; returns null if this one was
+  // superseded in turn before it finished.
+  const requestPreview = async (file: File, payload: Record<string, unknown>): Promise<Blob | null> => {
+    const submitted = await postPlot(file, { ...payload, sessionId: sessionIdRef.current }, {}, '/jobs');
+    const job = await submitted.json();
+    if (!job.success) {
+      throw new Error(job.error || 'Failed to generate plot');
+    }
+    previewJobRef.current = job.jobId;
+
+    let status = job;
+    while (status.state === 'queued' || status.state === 'running') {
+      // long-poll: answers as soon as the job finishes
+      const response = await fetch(`http://localhost:5001/jobs/${job.jobId}?wait=25`);
+      status = await response.json();
+      if (!status.success) {
+        throw new Error(status.error || 'Failed to generate plot');
+      }
+    }
+    if (status.state === 'cancelled') {
+      return null;
+    }
+    if (status.state === 'failed') {
+      throw new Error(status.error || 'Failed to generate plot');
+    }
+
+    const cacheKey = imageCacheKey(file, payload);
+    const cached = plotResultsRef.current.get(cacheKey);
+    const response = await fetch(`http://localhost:5001/jobs/${job.jobId}/result`, {
+      headers: cached ? { 'If-None-Match': cached.etag } : {}
+    });
+    return readImage(response, cacheKey, cached);
+  };
+
+  // Let the backend write an export straight to the path picked in the save dialog
+  const renderToPath = async (file: File, payload: Record<string, unknown>, outputPath: string) => {
+    // The backend only writes into directories the user picked
+    const picked = await fetch('http://localhost:5001/picked-paths', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ path: outputPath })
+    });
+    if (!picked.ok) {
+      throw new Error((await picked.json()).error || 'Failed to confirm the save location');
+    }
+    const response = await postPlot(file, { ...payload, outputPath });
+    const result = await response.json();
+    if (!result.success) {
+      throw new Error(result.error || 'Failed to save plot');
+    }
+    return result;
+  };
+
+  const saveBlob = (blob: Blob, filename: string) => {
+    const url = URL.createObjectURL(blob);
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = filename;
+    link.click();
+    URL.revokeObjectURL(url);
+  };
+
   const handleGenerate = async () => {
     if (!uploadedFile || samples.length === 0) {
       alert('Please ensure you have uploaded a file and selected samples.');
@@ -128,20 +313,8 @@ export default function PlotGeneration({ samples, uploadedFile, onBack }: PlotGe
     }
 
     setIsGenerating(true);
+    const request = ++previewRequestRef.current;
     try {
-      // Convert file to base64 using FileReader (more reliable for large files)
-      const fileBase64 = await new Promise<string>((resolve, reject) => {
-        const reader = new FileReader();
-        reader.onload = () => {
-          const result = reader.result as string;
-          // Remove the data URL prefix (data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,)
-          const base64Data = result.split(',')[1];
-          resolve(base64Data);
-        };
-        reader.onerror = reject;
-        reader.readAsDataURL(uploadedFile);
-      });
-      
       // Prepare data for Python backend
       const samplesConfig = samples.map(sample => ({
         sampleName: sample.sampleName,
@@ -153,29 +326,30 @@ export default function PlotGeneration({ samples, uploadedFile, onBack }: PlotGe
       console.log('Samples:', samplesConfig);
       console.log('File:', uploadedFile.name, 'Size:', uploadedFile.size, 'bytes');
       
-      // Call the Python backend API
-      const response = await fetch('http://localhost:5001/generate-plot', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          fileData: fileBase64,
-          samplesConfig: samplesConfig,
-          plotSettings: settings
-        })
+      // Render as a job of this view's session; clicking again while it runs
+      // replaces it instead of queueing behind it
+      const blob = await requestPreview(uploadedFile, {
+        samplesConfig: samplesConfig,
+        plotSettings: settings,
+        quality: 'preview',
+        dpi: previewDpi()
       });
-      
-      const result = await response.json();
-      
-      if (result.success) {
-        setPlotImageUrl(result.imageUrl);
-        console.log('Plot generated successfully');
-      } else {
-        throw new Error(result.error || 'Failed to generate plot');
+      if (!blob || request !== previewRequestRef.current) {
+        return;
+      }
+
+      const url = URL.createObjectURL(blob);
+      if (previewUrlRef.current) {
+        URL.revokeObjectURL(previewUrlRef.current);
       }
+      previewUrlRef.current = url;
+      setPlotImageUrl(url);
+      console.log('Plot generated successfully');
       
     } catch (error) {
+      if (request !== previewRequestRef.current) {
+        return;
+      }
       console.error('Error generating plot:', error);
       if (error instanceof Error && error.message.includes('fetch')) {
         alert('Error: Could not connect to Python backend. Please make sure the Python server is running on http://localhost:5001');
@@ -183,7 +357,9 @@ export default function PlotGeneration({ samples, uploadedFile, onBack }: PlotGe
         alert(`Error generating plot: ${error instanceof Error ? error.message : 'Unknown error'}`);
       }
     } finally {
-      setIsGenerating(false);
+      if (request === previewRequestRef.current) {
+        setIsGenerating(false);
+      }
     }
   };
 
@@ -194,84 +370,39 @@ export default function PlotGeneration({ samples, uploadedFile, onBack }: PlotGe
     }
     setExportingFormat(format);
     try {
-      // Convert file to base64
-      const fileBase64 = await new Promise<string>((resolve, reject) => {
-        const reader = new FileReader();
-        reader.onload = () => {
-          const result = reader.result as string;
-          const base64Data = result.split(',')[1];
-          resolve(base64Data);
-        };
-        reader.onerror = reject;
-        reader.readAsDataURL(uploadedFile);
-      });
       const samplesConfig = samples.map(sample => ({
         sampleName: sample.sampleName,
         backgroundWell: sample.backgroundWell,
         sampleWells: sample.sampleWells
       }));
-      // Call backend for export
-      const response = await fetch('http://localhost:5001/generate-plot', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          fileData: fileBase64,
-          samplesConfig: samplesConfig,
-          plotSettings: settings,
-          exportFormat: format
-        })
-      });
-      const result = await response.json();
-      if (result.success && result.imageUrl) {
-        // Check if we're running in Tauri
-        if (typeof window !== 'undefined' && (window as any).__TAURI__) {
-          // Use Tauri file system APIs
-          const { save } = await import('@tauri-apps/api/dialog');
-          const { invoke } = await import('@tauri-apps/api/tauri');
-          
-          // Show save dialog
-          const savePath = await save({
-            defaultPath: `protrace_plot.${format === 'jpg' ? 'jpg' : format}`,
-            filters: [{
-              name: `${format.toUpperCase()} Image`,
-              extensions: [format === 'jpg' ? 'jpg' : format]
-            }]
-          });
-          
-          if (savePath) {
-            // Extract base64 data
-            const base64Data = result.imageUrl.split(',')[1];
-            
-            try {
-              // Use Tauri's invoke to call a Rust command for file writing
-              await invoke('save_image_file', {
-                path: savePath,
-                data: base64Data
-              });
-              alert(`Plot successfully saved to: ${savePath}`);
-            } catch (error) {
-              console.error('Error saving file:', error);
-              // Fallback: try using the fs API directly
-              try {
-                const { writeBinaryFile } = await import('@tauri-apps/api/fs');
-                const binaryData = Uint8Array.from(atob(base64Data), c => c.charCodeAt(0));
-                await writeBinaryFile(savePath, binaryData);
-                alert(`Plot successfully saved to: ${savePath}`);
-              } catch (fsError) {
-                console.error('Filesystem error:', fsError);
-                alert(`Failed to save file: ${fsError instanceof Error ? fsError.message : 'Unknown error'}`);
-              }
-            }
-          }
-        } else {
-          // Fallback for web browser (development mode)
-          const link = document.createElement('a');
-          link.href = result.imageUrl;
-          link.download = `protrace_plot.${format === 'jpg' ? 'jpg' : format}`;
-          link.click();
+      const payload = {
+        samplesConfig: samplesConfig,
+        plotSettings: settings,
+        exportFormat: format,
+        dpi: exportDpi
+      };
+      const extension = format === 'jpg' ? 'jpg' : format;
+      // Check if we're running in Tauri
+      if (typeof window !== 'undefined' && (window as any).__TAURI__) {
+        const { save } = await import('@tauri-apps/api/dialog');
+
+        // Show save dialog
+        const savePath = await save({
+          defaultPath: `protrace_plot.${extension}`,
+          filters: [{
+            name: `${format.toUpperCase()} Image`,
+            extensions: [extension]
+          }]
+        });
+
+        if (savePath) {
+          // The backend writes the file itself, no bytes pass through the webview
+          await renderToPath(uploadedFile, payload, savePath);
+          alert(`Plot successfully saved to: ${savePath}`);
         }
       } else {
-        alert(result.error || `Failed to export plot as ${format.toUpperCase()}`);
+        // Fallback for web browser (development mode)
+        saveBlob(await requestImage(uploadedFile, payload), `protrace_plot.${extension}`);
       }
     } catch (error) {
       console.error('Export error:', error);
@@ -281,6 +412,46 @@ export default function PlotGeneration({ samples, uploadedFile, onBack }: PlotGe
     }
   };
 
+  // Render once on the backend and download every format as a single zip
+  const downloadAllFormats = async () => {
+    if (!uploadedFile || samples.length === 0 || !settings.title.trim() || !settings.subtitle.trim() || !settings.yLabel.trim()) {
+      alert('Please ensure you have uploaded a file, selected samples, and filled in all plot settings.');
+      return;
+    }
+    setExportingFormat('all');
+    try {
+      const samplesConfig = samples.map(sample => ({
+        sampleName: sample.sampleName,
+        backgroundWell: sample.backgroundWell,
+        sampleWells: sample.sampleWells
+      }));
+      const payload = {
+        samplesConfig: samplesConfig,
+        plotSettings: settings,
+        exportFormats: exportFormatOptions,
+        dpi: exportDpi
+      };
+      if (typeof window !== 'undefined' && (window as any).__TAURI__) {
+        const { save } = await import('@tauri-apps/api/dialog');
+        const savePath = await save({
+          defaultPath: 'protrace_plot.zip',
+          filters: [{ name: 'ZIP Archive', extensions: ['zip'] }]
+        });
+        if (savePath) {
+          await renderToPath(uploadedFile, payload, savePath);
+          alert(`Plots successfully saved to: ${savePath}`);
+        }
+      } else {
+        saveBlob(await requestImage(uploadedFile, payload), 'protrace_plot.zip');
+      }
+    } catch (error) {
+      console.error('Export error:', error);
+      alert(`Error exporting all formats: ${error instanceof Error ? error.message : 'Unknown error'}`);
+    } finally {
+      setExportingFormat(null);
+    }
+  };
+
   const isFormValid = settings.title.trim() && settings.subtitle.trim() && settings.yLabel.trim() && settings.width > 0;
 
   return (
@@ -316,7 +487,7 @@ export default function PlotGeneration({ samples, uploadedFile, onBack }: PlotGe
             <div className="mt-6 flex flex-col items-center">
               <label className="mb-2 text-sm font-medium text-gray-700">Export Plot As:</label>
               <div className="flex gap-3">
-                {['png', 'svg', 'pdf', 'jpg'].map((fmt) => (
+                {exportFormatOptions.map((fmt) => (
                   <button
                     key={fmt}
                     className={`px-4 py-2 rounded-md font-medium ${exportingFormat === fmt ? 'bg-blue-300 text-white' : 'bg-blue-600 hover:bg-blue-700 text-white'}`}
@@ -326,8 +497,29 @@ export default function PlotGeneration({ samples, uploadedFile, onBack }: PlotGe
                     {exportingFormat === fmt ? 'Exporting...' : fmt.toUpperCase()}
                   </button>
                 ))}
+                <button
+                  className={`px-4 py-2 rounded-md font-medium ${exportingFormat === 'all' ? 'bg-blue-300 text-white' : 'bg-blue-600 hover:bg-blue-700 text-white'}`}
+                  onClick={downloadAllFormats}
+                  disabled={!!exportingFormat}
+                >
+                  {exportingFormat === 'all' ? 'Exporting...' : 'ALL (ZIP)'}
+                </button>
+              </div>
+              <div className="flex items-center gap-2 mt-3">
+                <label htmlFor="export-dpi" className="text-sm text-gray-700">Resolution:</label>
+                <select
+                  id="export-dpi"
+                  value={exportDpi}
+                  onChange={(e) => setExportDpi(Number(e.target.value))}
+                  className="px-2 py-1 border border-gray-300 rounded-md text-sm"
+                  disabled={!!exportingFormat}
+                >
+                  {exportDpiOptions.map((dpi) => (
+                    <option key={dpi} value={dpi}>{dpi} dpi</option>
+                  ))}
+                </select>
               </div>
-              <p className="text-xs text-gray-500 mt-2">Choose a format to export your plot.</p>
+              <p className="text-xs text-gray-500 mt-2">Choose a format to export your plot, or ALL to get every format in one zip. The preview above is a fast screen-resolution rendering; exports are rendered at the selected resolution.</p>
             </div>
           )}
         </div>
@@ -417,14 +609,20 @@ export default function PlotGeneration({ samples, uploadedFile, onBack }: PlotGe
 
             <button
               onClick={handleGenerate}
-              disabled={!isFormValid || isGenerating || !pyScriptReady}
+              disabled={!isFormValid || !pyScriptReady}
               className={`w-full mt-6 py-3 px-4 rounded-md font-medium ${
-                isFormValid && !isGenerating && pyScriptReady
+                isFormValid && pyScriptReady
                   ? 'bg-blue-600 hover:bg-blue-700 text-white'
                   : 'bg-gray-300 text-gray-500 cursor-not-allowed'
               }`}
             >
-              {!pyScriptReady ? 'Connecting to Python Backend...' : isGenerating ? 'Generating...' : 'Generate Plot'}
+              {!pyScriptReady
+                ? backendPhase === 'failed'
+                  ? 'Python Backend Failed to Start'
+                  : backendPhase
+                    ? `Starting Python Backend (${backendPhase})...`
+                    : 'Connecting to Python Backend...'
+                : isGenerating ? 'Generating... (click to update)' : 'Generate Plot'}
             </button>
           </div>
 
@@ -1,14 +1,23 @@
 # -*- mode: python ; coding: utf-8 -*-
 import os
+import sys
+
+# Prebuilt font list of matplotlib's bundled fonts, seeded into a persistent
+# cache at start-up so the app never scans fonts on the critical path
+sys.path.insert(0, 'src')
+from FontCache import build_font_cache
+build_font_cache(os.path.join('build', 'mpl-cache'))
 
 a = Analysis(
     ['api/index.py'],
-    pathex=['.', 'src'],
+    pathex=['.', 'api', 'src'],
     binaries=[],
     datas=[
         ('src/*.py', 'src'),
+        ('build/mpl-cache/*', 'mpl-cache'),
     ],
     hiddenimports=[
+        'server',
         'flask',
         'flask_cors',
         'pandas',
@@ -19,6 +28,22 @@ a = Analysis(
         'Sample',
         'Preprocessing', 
         'ProtPlotting',
+        'DatasetCache',
+        'Ingestion',
+        'PlateMatrix',
+        'TimeAxis',
+        'Export',
+        'RenderPool',
+        'Downsampling',
+        'ImageCache',
+        'Metrics',
+        'FontCache',
+        'Startup',
+        'Logs',
+        'Jobs',
+        'FigureStore',
+        'Kinetics',
+        'LiveAcquisition',
     ],
     hookspath=[],
     hooksconfig={},
@@ -22,8 +22,8 @@ def create_samples_from_config(file_data, samples_config):
         df = pd.read_excel(io.BytesIO(file_data))
         console.log(f"Loaded Excel file with shape: {df.shape}")
         
-        # Preprocess the data (default 361 reads)
-        processed_df = pre_process_df(df, reads_num=361)
+        # Preprocess the data (every read with data)
+        processed_df = pre_process_df(df)
         console.log(f"Processed data shape: {processed_df.shape}")
         
         # Create Sample objects
@@ -1,9 +1,22 @@
 import pandas as pd
 import numpy as np
 
-def pre_process_df(df : pd.DataFrame, reads_num : int) -> pd.DataFrame :
-    if reads_num < 2:
+def detect_reads(values : np.ndarray) -> int:
+    """Number of leading reads up to the last one with a value in any well (missing wells stay NaN)."""
+    finite = np.isfinite(np.asarray(values, dtype=float))
+    if finite.ndim != 2 or not finite.size:
+        return len(finite)
+    read = finite.any(axis=1)
+    return int(np.flatnonzero(read)[-1]) + 1 if read.any() else 0
+
+def pre_process_df(df : pd.DataFrame, reads_num : int = None) -> pd.DataFrame :
+    if df is None:
+        raise ValueError("df cannot be empty!")
+    if reads_num is None:
+        wells = df.drop(columns=[c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c].dtype)])
+        reads_num = detect_reads(wells.to_numpy(dtype=float))
+        if reads_num < 2:
+            raise ValueError("the data must contain at least 2 reads!")
+    elif reads_num < 2:
         raise ValueError("reads_num must be greater or equal than 2!")
-    if df is None or reads_num is None:
-        raise ValueError("df or reads_num cannot be empty!")
-    return df.loc[0: reads_num - 1]
\ No newline at end of file
+    return df.loc[0: reads_num - 1]
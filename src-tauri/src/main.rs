@@ -1,6 +1,7 @@
 // Prevents additional console window on Windows in release, DO NOT REMOVE!!
 #![cfg_attr(not(debug_assertions), windows_subsystem = "windows")]
 
+use std::io::{BufRead, BufReader, Read};
 use std::process::{Command, Child, Stdio};
 use tauri::{Manager, State, AppHandle};
 use std::sync::Mutex;
@@ -11,6 +12,14 @@ struct BackendState {
     child: Mutex<Option<Child>>,
 }
 
+/// Lines of a backend pipe until it is closed or fails to read
+fn backend_lines(pipe: impl Read) -> impl Iterator<Item = String> {
+    BufReader::new(pipe)
+        .split(b'\n')
+        .map_while(Result::ok)
+        .map(|line| String::from_utf8_lossy(&line).trim_end_matches('\r').to_string())
+}
+
 #[tauri::command]
 fn start_python_backend(state: State<BackendState>, app_handle: AppHandle) -> Result<String, String> {
     // First, let's try to find the backend binary by checking different possible paths
@@ -46,12 +55,35 @@ fn start_python_backend(state: State<BackendState>, app_handle: AppHandle) -> Re
 
     println!("Attempting to start backend at: {:?}", backend_path);
 
-    let child = Command::new(&backend_path)
+    let mut child = Command::new(&backend_path)
         .stdout(Stdio::piped())
         .stderr(Stdio::piped())
         .spawn()
         .map_err(|e| format!("Failed to start Python backend: {}", e))?;
 
+    // Keep reading both pipes (a full pipe would block the backend) and tell
+    // the frontend as soon as the backend prints its readiness line. Lines are
+    // decoded lossily so stray non-UTF-8 output does not end the drain; the
+    // first read error (pipe closed or broken) does.
+    if let Some(stdout) = child.stdout.take() {
+        let handle = app_handle.clone();
+        std::thread::spawn(move || {
+            for line in backend_lines(stdout) {
+                println!("[backend] {}", line);
+                if line.starts_with("PROTRACE_READY") {
+                    let _ = handle.emit_all("backend-ready", line.clone());
+                }
+            }
+        });
+    }
+    if let Some(stderr) = child.stderr.take() {
+        std::thread::spawn(move || {
+            for line in backend_lines(stderr) {
+                eprintln!("[backend] {}", line);
+            }
+        });
+    }
+
     *child_guard = Some(child);
     
     Ok("Python backend started successfully".to_string())
@@ -93,8 +125,8 @@ fn main() {
             let app_handle = app.handle().clone();
             
             std::thread::spawn(move || {
-                std::thread::sleep(std::time::Duration::from_millis(2000));
-                // Auto-start the Python backend when the app starts
+                // Auto-start the Python backend when the app starts; it binds
+                // its port at once and reports readiness itself
                 let state = app_handle.state::<BackendState>();
                 let handle_clone = app_handle.clone();
                 if let Err(e) = start_python_backend(state, handle_clone) {
@@ -0,0 +1,254 @@
+"""Headless batch rendering of many workbooks.
+
+Renders every workbook matched by the given paths (files, directories or glob
+patterns) with a sample layout saved from the app (``utils/sampleIO.ts``
+export format) and writes one file per export format, using a pool of worker
+processes across cores::
+
+    python src/Batch.py "runs/2024-04-*/*.xlsx" --layout layout.json \\
+        --out figures --formats png,pdf --title "{name}" --subtitle "WT CA"
+
+Without ``--layout`` each workbook uses ``<workbook name>.json`` from
+``--layout-dir`` (default: next to the workbook).  A manifest in the output
+directory records the hash of every rendered input, so re-running the same
+command only renders workbooks, layouts or settings that changed (or whose
+outputs are missing); ``--force`` renders everything.  ``--preprocessing``
+applies a pipeline (``Preprocessing.run_pipeline``, same JSON as the API's
+``preprocessing`` field) to every workbook.
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any
+
+from DatasetCache import content_digest
+from Export import MIME_TYPES
+from ImageCache import code_fingerprint, render_key
+
+MANIFEST_NAME = ".protrace-batch.json"
+WORKBOOK_EXTENSIONS = (".xlsx", ".xlsm")
+DEFAULT_SETTINGS = {"font": "Arial", "width": 9, "title": "{name}", "subtitle": "", "yLabel": "$A_{350}$"}
+
+# ───────────────────────── helper utilities ──────────────────────────
+
+def find_workbooks(patterns: list[str]) -> list[str]:
+    """Expand files, directories and glob patterns into a sorted list of workbooks."""
+    found = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        for path in matches:
+            name = os.path.basename(path)
+            if (
+                os.path.isfile(path)
+                and name.lower().endswith(WORKBOOK_EXTENSIONS)
+                and not name.startswith("~$")  # Excel lock files
+            ):
+                found.add(os.path.abspath(path))
+    return sorted(found)
+
+
+def load_layout(path: str) -> list[dict]:
+    """Read a layout saved by the app and return it as ``samplesConfig``."""
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    samples = data.get("samples") if isinstance(data, dict) else None
+    if not isinstance(samples, list) or not samples:
+        raise ValueError(f"{path}: not a sample layout export (missing 'samples')")
+    config = []
+    for sample in samples:
+        if not sample.get("sampleName") or not isinstance(sample.get("sampleWells"), list):
+            raise ValueError(f"{path}: invalid sample {sample!r}")
+        config.append({
+            "sampleName": sample["sampleName"],
+            "backgroundWell": sample.get("backgroundWell") or None,
+            "sampleWells": list(sample["sampleWells"]),
+        })
+    return config
+
+
+def _output_names(workbooks: list[str]) -> dict[str, str]:
+    """Output base name per workbook; clashing names get a short path hash."""
+    stems = [os.path.splitext(os.path.basename(p))[0] for p in workbooks]
+    names = {}
+    for path, stem in zip(workbooks, stems):
+        names[path] = stem if stems.count(stem) == 1 else f"{stem}-{content_digest(path.encode())[:8]}"
+    return names
+
+
+def _read_manifest(path: str) -> dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+# ───────────────────────────── worker side ───────────────────────────
+
+def render_workbook(task: dict[str, Any]) -> dict[str, Any]:
+    """Parse one workbook, render it and write its outputs (runs in a worker)."""
+    from Ingestion import read_plate_excel
+    from PlateMatrix import PlateMatrix
+    from Preprocessing import pre_process_df, run_pipeline
+    from RenderPool import render_job
+
+    start = time.perf_counter()
+    with open(task["workbook"], "rb") as fh:
+        df = read_plate_excel(fh.read())
+    plate = PlateMatrix.from_dataframe(pre_process_df(df, reads_num=task["reads_num"]))
+    plate = run_pipeline(plate, task["preprocessing"])
+    outputs, _ = render_job(plate, task["samples_config"], task["plot_settings"], task["formats"], task["dpi"])
+
+    written = {}
+    for fmt, data in outputs.items():
+        path = os.path.join(task["out_dir"], f"{task['name']}.{fmt}")
+        _write_atomic(path, data)
+        written[fmt] = os.path.basename(path)
+    return {"outputs": written, "seconds": time.perf_counter() - start}
+
+# ───────────────────────────── main driver ───────────────────────────
+
+def plan(args: argparse.Namespace, workbooks: list[str], manifest: dict[str, Any]) -> tuple[list[dict], list[str]]:
+    """Build render tasks; return ``(tasks, skipped workbook paths)``."""
+    from Preprocessing import normalize_pipeline, pipeline_key
+
+    pipeline = {}
+    if args.preprocessing:
+        with open(args.preprocessing, encoding="utf-8") as fh:
+            pipeline = normalize_pipeline(json.load(fh))
+    settings = dict(DEFAULT_SETTINGS)
+    if args.settings:
+        with open(args.settings, encoding="utf-8") as fh:
+            settings.update(json.load(fh))
+    for key, value in (("title", args.title), ("subtitle", args.subtitle), ("font", args.font),
+                       ("width", args.width), ("yLabel", args.y_label)):
+        if value is not None:
+            settings[key] = value
+
+    shared_layout = load_layout(args.layout) if args.layout else None
+    salt = code_fingerprint()
+    names = _output_names(workbooks)
+    tasks, skipped = [], []
+    for path in workbooks:
+        name = names[path]
+        if shared_layout is not None:
+            samples_config = shared_layout
+        else:
+            layout_dir = args.layout_dir or os.path.dirname(path)
+            layout_path = os.path.join(layout_dir, f"{os.path.splitext(os.path.basename(path))[0]}.json")
+            if not os.path.exists(layout_path):
+                print(f"SKIP {path}: no layout {layout_path}", file=sys.stderr)
+                skipped.append(path)
+                continue
+            samples_config = load_layout(layout_path)
+
+        plot_settings = {k: (v.replace("{name}", name) if isinstance(v, str) else v) for k, v in settings.items()}
+        with open(path, "rb") as fh:
+            digest = content_digest(fh.read())
+        key = render_key(pipeline_key(digest, pipeline), samples_config, plot_settings, args.formats, args.dpi,
+                         salt=f"{salt}:{args.reads_num}")
+
+        entry = manifest.get(name)
+        up_to_date = (
+            not args.force
+            and entry is not None
+            and entry.get("key") == key
+            and all(os.path.exists(os.path.join(args.out, f)) for f in entry.get("outputs", {}).values())
+        )
+        if up_to_date:
+            skipped.append(path)
+            continue
+        tasks.append({
+            "workbook": path, "name": name, "key": key, "out_dir": args.out,
+            "samples_config": samples_config, "plot_settings": plot_settings,
+            "formats": args.formats, "dpi": args.dpi, "reads_num": args.reads_num,
+            "preprocessing": pipeline,
+        })
+    return tasks, skipped
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Render plots for many workbooks in parallel.")
+    parser.add_argument("inputs", nargs="+", help="workbook files, directories or glob patterns")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--layout", help="layout JSON (app export) used for every workbook")
+    parser.add_argument("--layout-dir", help="directory of per-workbook <name>.json layouts")
+    parser.add_argument("--settings", help="JSON file with plotSettings (font, width, title, subtitle, yLabel, ...)")
+    parser.add_argument("--title", help="plot title; {name} is replaced by the workbook name")
+    parser.add_argument("--subtitle", help="plot subtitle; {name} is replaced by the workbook name")
+    parser.add_argument("--font")
+    parser.add_argument("--width", type=float)
+    parser.add_argument("--y-label")
+    parser.add_argument("--formats", default="png", help="comma-separated export formats (default png)")
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--reads-num", type=int, help="reads kept per well (default: every read with data)")
+    parser.add_argument("--preprocessing", help="JSON file with a preprocessing pipeline (blank, outliers, smooth, ...)")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--force", action="store_true", help="render even if outputs are up to date")
+    args = parser.parse_args(argv)
+
+    args.formats = list(dict.fromkeys(f.strip().lower() for f in args.formats.split(",") if f.strip()))
+    unknown = [f for f in args.formats if f not in MIME_TYPES]
+    if unknown or not args.formats:
+        parser.error(f"unsupported format(s) {', '.join(unknown) or '(none)'}; use {', '.join(MIME_TYPES)}")
+
+    workbooks = find_workbooks(args.inputs)
+    if not workbooks:
+        parser.error("no workbooks found")
+    os.makedirs(args.out, exist_ok=True)
+    manifest_path = os.path.join(args.out, MANIFEST_NAME)
+    manifest = _read_manifest(manifest_path)
+
+    try:
+        tasks, skipped = plan(args, workbooks, manifest)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"{len(workbooks)} workbook(s): {len(tasks)} to render, {len(skipped)} skipped")
+    failures = 0
+    if tasks:
+        from RenderPool import _warm_worker
+
+        ctx = multiprocessing.get_context("spawn")
+        workers = max(1, min(args.jobs, len(tasks)))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_warm_worker) as pool:
+            futures = {pool.submit(render_workbook, task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failures += 1
+                    print(f"FAIL {task['workbook']}: {e}", file=sys.stderr)
+                    continue
+                manifest[task["name"]] = {
+                    "workbook": task["workbook"],
+                    "key": task["key"],
+                    "outputs": result["outputs"],
+                }
+                # written after every workbook so an interrupted run resumes here
+                _write_atomic(manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+                print(f"OK   {task['workbook']} -> {', '.join(result['outputs'].values())} ({result['seconds']:.1f} s)")
+
+    print(f"Done: {len(tasks) - failures} rendered, {len(skipped)} skipped, {failures} failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""Content-addressed cache of parsed plate-reader datasets.
+
+Every preview and export request used to re-decode and re-parse the same
+workbook.  Entries here are keyed by the SHA-256 of the uploaded bytes, so a
+repeated upload of the same file resolves to the already parsed and
+preprocessed plate data without touching ``pd.read_excel`` again.
+
+The cache is bounded both by entry count and by the approximate in-memory size
+of the cached objects; the least recently used entry is evicted first.
+Concurrent misses on the same content are loaded once: later callers wait
+for the first one's result instead of parsing the workbook again.
+"""
+from __future__ import annotations
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+# ───────────────────────── helper utilities ──────────────────────────
+
+def content_digest(data: bytes) -> str:
+    """Return the hex SHA-256 digest used as dataset key for *data*."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _approx_nbytes(obj: Any) -> int:
+    """Best-effort size estimate of a cached value in bytes."""
+    # pandas is only consulted once something imported it, so the cache
+    # itself does not pull it in at server start-up
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    nbytes = getattr(obj, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    return 0
+
+# ────────────────────────── cache implementation ─────────────────────
+
+class DatasetCache:
+    """Thread-safe LRU cache mapping dataset digests to parsed plate data.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Upper bound on the summed size of all cached values.  A single value
+        larger than this is returned to the caller but never stored
+        (:meth:`put` returns ``False``).
+    max_entries : int
+        Upper bound on the number of cached datasets.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, max_entries: int = 16):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        # digest of an alternative encoding (e.g. the base64 text) -> key
+        self._aliases: dict[str, str] = {}
+        self._lock = threading.Lock()
+        # key -> [lock held while loading it, callers using the lock]
+        self._loading: dict[str, list] = {}
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    # ― lookups ―──────────────────────────────────────────────────────
+    def get(self, key: str) -> Any | None:
+        """Return the cached value for *key* (marking it recently used) or ``None``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, key: str) -> Any | None:
+        """Return the cached value for *key* or ``None``, without counting or reordering it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def __contains__(self, key: str) -> bool:
+        """Whether *key* is cached; like :meth:`peek`, not a hit, miss or use."""
+        with self._lock:
+            return key in self._entries
+
+    def resolve_alias(self, alias: str) -> str | None:
+        """Map an alias digest to its dataset key if that dataset is still cached."""
+        with self._lock:
+            key = self._aliases.get(alias)
+            if key is not None and key not in self._entries:
+                del self._aliases[alias]
+                return None
+            return key
+
+    # ― updates ―──────────────────────────────────────────────────────
+    def put(self, key: str, value: Any, *, alias: str | None = None) -> bool:
+        """Store *value* under *key*, evicting least recently used entries.
+
+        Returns ``False`` when *value* alone exceeds ``max_bytes`` and was
+        not stored.
+        """
+        nbytes = _approx_nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return False
+            self._entries[key] = (value, nbytes)
+            self._size += nbytes
+            if alias is not None:
+                self._aliases[alias] = key
+            self._evict_locked()
+            return True
+
+    def get_or_load(
+        self,
+        data: bytes,
+        loader: Callable[[bytes], Any],
+        *,
+        alias: str | None = None,
+    ) -> tuple[str, Any]:
+        """Return ``(key, value)`` for *data*, calling *loader* only on a miss.
+
+        While one caller loads a key, others missing the same key wait and
+        take its result (or load it themselves if it could not be stored).
+        """
+        key = content_digest(data)
+        value = self.get(key)
+        if value is None:
+            with self._load_lock(key):
+                with self._lock:
+                    entry = self._entries.get(key)
+                if entry is not None:  # loaded while we waited
+                    value = entry[0]
+                else:
+                    value = loader(data)
+                    self.put(key, value)
+        if alias is not None:
+            with self._lock:
+                if key in self._entries:
+                    self._aliases[alias] = key
+        return key, value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._aliases.clear()
+            self._size = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return a snapshot of occupancy and hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    # ― internals ―────────────────────────────────────────────────────
+    @contextmanager
+    def _load_lock(self, key: str) -> Iterator[None]:
+        """Hold the lock serialising loads of *key*; dropped once unused."""
+        with self._lock:
+            loading = self._loading.setdefault(key, [threading.Lock(), 0])
+            loading[1] += 1
+        try:
+            with loading[0]:
+                yield
+        finally:
+            with self._lock:
+                loading[1] -= 1
+                if not loading[1]:
+                    del self._loading[key]
+
+    def _evict_locked(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._size > self.max_bytes
+        ):
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self._size -= nbytes
+        if len(self._aliases) > 4 * self.max_entries:
+            self._aliases = {a: k for a, k in self._aliases.items() if k in self._entries}
@@ -0,0 +1,145 @@
+"""Shape-preserving downsampling of long kinetic traces.
+
+A full plate of several thousand reads per well puts far more points on the
+page than there are pixel columns to show them.  Both methods below keep the
+visual shape of a trace while bounding the number of points per trace, and
+work on all replicate columns of a sample at once (``y`` of shape
+``(reads, replicates)`` sharing one time axis ``x``):
+
+* ``"lttb"`` – Largest-Triangle-Three-Buckets: one point per bucket, the one
+  spanning the largest triangle with its neighbours; keeps peaks and the
+  overall curve.
+* ``"minmax"`` – the minimum and maximum of every bucket; keeps the full
+  envelope of noisy traces.
+
+Each method picks its own reads per replicate, so the results carry one x
+column per replicate.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+METHODS = ("lttb", "minmax")
+
+# ───────────────────────── helper utilities ──────────────────────────
+
+def _as_columns(y: np.ndarray) -> np.ndarray:
+    y = np.asarray(y, dtype=float)
+    return y[:, None] if y.ndim == 1 else y
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Row indices chosen by LTTB, shape ``(n_out, replicates)``.
+
+    The first and last read are always kept; NaN reads are never picked over
+    a finite one.
+    """
+    y = _as_columns(y)
+    n, k = y.shape
+    if n_out >= n or n_out < 3:
+        return np.broadcast_to(np.arange(n)[:, None], (n, k)).copy()
+
+    # n_out - 2 buckets over the interior reads [1, n - 1)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    finite = ~np.isnan(y)
+    counts = np.add.reduceat(finite[: n - 1], edges[:-1], axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_y = np.add.reduceat(np.where(finite, y, 0.0)[: n - 1], edges[:-1], axis=0) / counts
+    avg_x = np.add.reduceat(x[: n - 1], edges[:-1]) / np.diff(edges)
+
+    cols = np.arange(k)
+    idx = np.empty((n_out, k), dtype=np.intp)
+    idx[0] = 0
+    idx[-1] = n - 1
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        a = idx[b]
+        ax, ay = x[a], y[a, cols]
+        if b + 1 < n_out - 2:
+            cx, cy = avg_x[b + 1], avg_y[b + 1]
+        else:
+            cx, cy = x[n - 1], y[n - 1]
+        area = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - x[lo:hi, None]) * (cy - ay))
+        idx[b + 1] = lo + np.argmax(np.nan_to_num(area, nan=-1.0), axis=0)
+    return idx
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Row indices of every bucket's minimum and maximum, shape ``(≤ n_out, replicates)``.
+
+    Indices are in time order within each column.
+    """
+    y = _as_columns(y)
+    n, k = y.shape
+    buckets = max(1, n_out // 2)
+    if 2 * buckets >= n:
+        return np.broadcast_to(np.arange(n)[:, None], (n, k)).copy()
+
+    size = -(-n // buckets)
+    buckets = -(-n // size)  # drop buckets that would be pure padding
+    padded = np.full((buckets * size, k), np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(buckets, size, k)
+    lo = np.argmin(np.where(np.isnan(blocks), np.inf, blocks), axis=1)
+    hi = np.argmax(np.where(np.isnan(blocks), -np.inf, blocks), axis=1)
+    offset = (np.arange(buckets) * size)[:, None]
+    idx = np.concatenate([lo + offset, hi + offset])
+    idx.sort(axis=0)
+    return np.minimum(idx, n - 1)
+
+# ────────────────────────── main downsampling API ─────────────────────
+
+def downsample(
+    x: np.ndarray,
+    y: np.ndarray,
+    max_points: int,
+    method: str = "lttb",
+) -> tuple[np.ndarray, np.ndarray]:
+    """Reduce every replicate of a trace to at most *max_points* points.
+
+    Parameters
+    ----------
+    x : numpy.ndarray, shape (reads,)
+        Shared time axis.
+    y : numpy.ndarray, shape (reads,) or (reads, replicates)
+        Values of one or more replicates.
+    max_points : int
+        Upper bound on points per replicate.
+    method : {"lttb", "minmax"}, default "lttb"
+
+    Returns
+    -------
+    x, y : numpy.ndarray, shape (points, replicates)
+        Selected points, one column per replicate.  Traces already within
+        *max_points* are returned unchanged.
+    """
+    x = np.asarray(x, dtype=float)
+    y = _as_columns(y)
+    idx = downsample_indices(x, y, max_points, method)
+    if idx is None:
+        return np.broadcast_to(x[:, None], y.shape), y
+    return x[idx], np.take_along_axis(y, idx, axis=0)
+
+
+def downsample_indices(
+    x: np.ndarray,
+    y: np.ndarray,
+    max_points: int,
+    method: str = "lttb",
+) -> np.ndarray | None:
+    """Row indices :func:`downsample` keeps, shape ``(points, replicates)``.
+
+    ``None`` when the trace is already within *max_points*.  Useful to take
+    the same reads from series that belong to *y*, e.g. error bands of a mean.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method {method!r}; use one of {', '.join(METHODS)}")
+    x = np.asarray(x, dtype=float)
+    y = _as_columns(y)
+    if len(x) != y.shape[0]:
+        raise ValueError("x and y have a different number of reads")
+    if max_points >= len(x):
+        return None
+    if method == "lttb":
+        return lttb_indices(x, y, int(max_points))
+    return minmax_indices(y, int(max_points))
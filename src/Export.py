@@ -0,0 +1,150 @@
+"""Serialise a rendered figure to one or more export formats.
+
+Exporting PNG, SVG and PDF used to mean one full request per format.
+:func:`render_formats` takes a figure that was built once and writes it to
+every requested format.  Matplotlib figures are not safe to draw from several
+threads at once, so for more than one format each extra format gets its own
+copy of the figure (a pickle round trip, much cheaper than rebuilding it from
+the samples) and the copies are encoded concurrently.
+
+Two quality tiers: ``"export"`` crops to the tight bounding box of the
+artists (which costs an extra draw pass) and compresses PNGs fully;
+``"preview"`` keeps the laid-out figure as is and uses fast PNG compression,
+meant for on-screen previews at screen resolution.
+
+SVG exports are compacted without changing what they draw: matplotlib
+writes every marker as a ``<use>`` of a shared marker definition but repeats
+the full style on each of them, so the style of a run of markers with one
+style is moved to their enclosing group (:func:`compact_svg`).
+"""
+from __future__ import annotations
+
+import contextvars
+import io
+import os
+import pickle
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from Metrics import stage
+
+MIME_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "pdf": "application/pdf",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+}
+QUALITIES = ("preview", "export")
+PREVIEW_PNG_COMPRESSION = 1  # zlib level: bigger files, much faster than the default 6
+
+# a group of marker <use>s (e.g. all points of one sample) and its closing tag
+_SVG_MARKER_GROUP = re.compile(
+    rb'(<g(?: clip-path="[^"]*")?)>\n((?:[ ]*<use xlink:href="#[^"]+" x="[^"]*" y="[^"]*" style="[^"]*"/>\n)+)([ ]*</g>)'
+)
+_SVG_USE_STYLE = re.compile(rb'[ ]*(<use [^>]*?) style="([^"]*)"/>\n')
+
+# ───────────────────────── helper utilities ──────────────────────────
+
+def normalize_format(fmt: str | None, default: str = "png") -> str:
+    """Lower-case *fmt* and fall back to *default* for unsupported formats."""
+    fmt = (fmt or default).lower()
+    return fmt if fmt in MIME_TYPES else default
+
+
+def _hoist_marker_style(match: re.Match) -> bytes:
+    uses = _SVG_USE_STYLE.findall(match.group(2))
+    style = uses[0][1]
+    # group opacity would composite overlapping markers differently; fill-/stroke-opacity inherit alike
+    if any(s != style for _, s in uses) or re.search(rb"(?:^|; )opacity:", style):
+        return match.group(0)
+    body = b"".join(use + b"/>\n" for use, _ in uses)
+    return b'%s style="%s">\n%s%s' % (match.group(1), style, body, match.group(3))
+
+
+def compact_svg(svg: bytes) -> bytes:
+    """Move the style shared by a group of marker ``<use>`` elements onto the group.
+
+    ``fill``/``stroke`` and their widths and opacities are inherited, so every
+    marker renders as before; each point is written as its bare
+    ``<use xlink:href=… x=… y=…/>``.  Groups whose markers differ in style or
+    carry a (non-inherited) ``opacity`` are left as they are.
+    """
+    return _SVG_MARKER_GROUP.sub(_hoist_marker_style, svg)
+
+
+def save_figure(fig, fmt: str, *, dpi: int = 150, quality: str = "export") -> bytes:
+    """Encode *fig* as *fmt* at *quality* (see module docstring) and return the file contents."""
+    if quality not in QUALITIES:
+        raise ValueError(f"quality must be one of {', '.join(QUALITIES)}, not {quality!r}")
+    kwargs = {}
+    if quality == "export":
+        kwargs["bbox_inches"] = "tight"
+    elif fmt == "png":
+        kwargs["pil_kwargs"] = {"compress_level": PREVIEW_PNG_COMPRESSION}
+    buf = io.BytesIO()
+    with stage(f"encode_{fmt}"):
+        fig.savefig(buf, format=fmt, dpi=dpi, **kwargs)
+        if fmt == "svg":
+            return compact_svg(buf.getvalue())
+    return buf.getvalue()
+
+# ────────────────────────── main export API ──────────────────────────
+
+def render_formats(
+    fig,
+    formats: Iterable[str],
+    *,
+    dpi: int = 150,
+    quality: str = "export",
+    max_workers: int | None = None,
+) -> dict[str, bytes]:
+    """Encode one figure to several formats.
+
+    Parameters
+    ----------
+    fig : matplotlib.figure.Figure
+        The already laid-out figure.
+    formats : iterable of str
+        Requested formats; duplicates and unsupported names are dropped.
+    dpi : int, default 150
+        Resolution for raster formats.
+    quality : {"export", "preview"}, default "export"
+        Encoding tier, see the module docstring.
+    max_workers : int, optional
+        Encoder threads; defaults to one per format (capped by CPU count).
+
+    Returns
+    -------
+    dict
+        Format name → encoded bytes, in request order.
+    """
+    fmts = list(dict.fromkeys(f.lower() for f in formats if f.lower() in MIME_TYPES))
+    if not fmts:
+        raise ValueError("No supported export format requested")
+    if len(fmts) == 1:
+        return {fmts[0]: save_figure(fig, fmts[0], dpi=dpi, quality=quality)}
+
+    # independent copies so each encoder thread owns its figure
+    with stage("clone"):
+        blob = pickle.dumps(fig)
+        figures = [fig] + [pickle.loads(blob) for _ in fmts[1:]]
+    workers = max_workers or min(len(fmts), os.cpu_count() or 1)
+    # each task runs in a copy of this context so its stages reach the same timer
+    contexts = [contextvars.copy_context() for _ in fmts]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        encoded = list(pool.map(
+            lambda ctx, f, fmt: ctx.run(save_figure, f, fmt, dpi=dpi, quality=quality), contexts, figures, fmts
+        ))
+    return dict(zip(fmts, encoded))
+
+
+def zip_outputs(outputs: dict[str, bytes], basename: str = "protrace_plot") -> bytes:
+    """Bundle ``{format: bytes}`` into a zip archive (``<basename>.<format>`` entries)."""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for fmt, data in outputs.items():
+            zf.writestr(f"{basename}.{fmt}", data)
+    return buf.getvalue()
@@ -0,0 +1,126 @@
+"""Last rendered figure per client session, for cosmetic-only re-renders.
+
+Typing a title used to rebuild the whole figure on every edit: standardise
+every sample, re-plot every point and lay the figure out again.  The store
+keeps each session's last figure together with a key over everything that
+determines its *data* — dataset, sample layout and the non-cosmetic plot
+settings.  When the next render of the session has the same key, only the
+cosmetic settings (:data:`COSMETIC_SETTINGS`) differ and the stored figure is
+updated in place (:func:`RenderPool.apply_cosmetics`) instead of rebuilt.
+
+A figure must not be drawn by two threads at once, so :meth:`FigureStore.take`
+removes the entry while a render uses it and :meth:`FigureStore.put` returns
+it; a concurrent render of the same session meanwhile rebuilds from scratch.
+Figures rendered in a worker process arrive pickled and are only unpickled
+when they are reused.  An entry can also carry the *version* of the data it
+shows: a live dataset keeps its key while it grows, and a stored figure of an
+older version is moved to the new reads (:func:`RenderPool.refresh_plot`)
+instead of rebuilt.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any
+
+# plotSettings that only change text and size, not the plotted data
+COSMETIC_SETTINGS = ("title", "subtitle", "yLabel", "font", "width")
+
+# ───────────────────────── helper utilities ──────────────────────────
+
+def data_settings(plot_settings: dict) -> dict:
+    """The part of *plot_settings* that determines the data artists.
+
+    The width is cosmetic unless it sets the default downsampling budget
+    (``downsample`` without ``maxPoints``).
+    """
+    cosmetic = set(COSMETIC_SETTINGS)
+    if plot_settings.get("downsample") and not plot_settings.get("maxPoints"):
+        cosmetic.discard("width")
+    return {k: v for k, v in plot_settings.items() if k not in cosmetic}
+
+
+def figure_key(dataset_id: str, samples_config: Any, plot_settings: dict, salt: str = "") -> str:
+    """SHA-256 over the inputs a cosmetic update cannot change."""
+    canonical = json.dumps(
+        {
+            "dataset": dataset_id,
+            "samples": samples_config,
+            "settings": data_settings(plot_settings),
+            "salt": salt,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=True,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("ascii")).hexdigest()
+
+# ────────────────────────── store implementation ─────────────────────
+
+class FigureStore:
+    """Thread-safe LRU map of session id to ``(figure key, figure, data version)``.
+
+    Parameters
+    ----------
+    max_entries : int, default 8
+        Sessions whose figure is kept; ``0`` disables the store.
+    """
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max(0, int(max_entries))
+        self._entries: OrderedDict[str, tuple[str, Any, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def take(self, session: str, key: str) -> tuple[Any, Any] | None:
+        """Remove and return ``(figure, data version)`` of the session if built for *key*.
+
+        A figure for another key is dropped (it is about to be replaced).
+        """
+        with self._lock:
+            entry = self._entries.pop(session, None)
+            if entry is None or entry[0] != key:
+                self.misses += 1
+                return None
+            self.hits += 1
+        _, fig, version = entry
+        return (pickle.loads(fig) if isinstance(fig, bytes) else fig), version
+
+    def holds(self, session: str, key: str) -> bool:
+        """True when the session's figure was built for *key* (not counted as a hit or miss)."""
+        with self._lock:
+            entry = self._entries.get(session)
+            return entry is not None and entry[0] == key
+
+    def put(self, session: str, key: str, fig: Any, version: Any = None, *, replace: bool = True) -> None:
+        """Store *fig* (a figure or its pickle) as the session's last figure.
+
+        Without *replace* a figure the session already has is kept.
+        """
+        if not self.max_entries:
+            return
+        with self._lock:
+            if not replace and session in self._entries:
+                return
+            self._entries.pop(session, None)
+            self._entries[session] = (key, fig, version)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, session: str) -> None:
+        with self._lock:
+            self._entries.pop(session, None)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,129 @@
+"""Prebuilt, persistent matplotlib font cache for the packaged backend.
+
+On its first import matplotlib scans every font on the system and stores the
+result as ``fontlist-v<N>.json`` in its cache directory, which takes seconds.
+The PyInstaller bundle points that directory at a fresh temporary folder on
+every launch, so the desktop app paid for the scan on every start.
+
+* :func:`build_font_cache` runs at build time (from ``protrace-backend.spec``)
+  and writes the font list of matplotlib's own bundled fonts; their paths are
+  stored relative to ``mpl-data``, so the file is valid wherever the bundle is
+  unpacked.
+* :func:`use_bundled_cache` runs at start-up, before matplotlib is imported:
+  it points ``MPLCONFIGDIR`` at a persistent per-user directory and seeds it
+  with the prebuilt list the first time, so matplotlib never scans on the
+  critical path.
+* :func:`add_system_fonts` completes a seeded list with the fonts installed on
+  the machine (Arial, Times New Roman, ...).  It runs once per installation,
+  during the background warm-up, and rewrites the cache for later starts.
+"""
+from __future__ import annotations
+
+import glob
+import os
+import shutil
+import sys
+
+APP_NAME = "ProTrace"
+# present while a seeded cache still lacks the system fonts
+PENDING_MARKER = ".protrace-system-fonts-pending"
+
+# ───────────────────────── helper utilities ──────────────────────────
+
+def user_cache_dir() -> str:
+    """Persistent per-user directory for matplotlib's config and caches."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        return os.path.join(base, APP_NAME, "matplotlib")
+    if sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~/Library/Caches"), APP_NAME, "matplotlib")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, APP_NAME.lower(), "matplotlib")
+
+# ───────────────────────────── build time ────────────────────────────
+
+def build_font_cache(dest: str) -> str:
+    """Write the font list of matplotlib's bundled fonts into *dest*; return its path."""
+    import copy
+
+    import matplotlib
+    from matplotlib import font_manager
+
+    data_path = os.path.realpath(matplotlib.get_data_path())
+
+    def bundled(entries):
+        return [e for e in entries if os.path.realpath(e.fname).startswith(data_path + os.sep)]
+
+    manager = copy.copy(font_manager.fontManager)
+    manager.ttflist = bundled(font_manager.fontManager.ttflist)
+    manager.afmlist = bundled(font_manager.fontManager.afmlist)
+
+    os.makedirs(dest, exist_ok=True)
+    path = os.path.join(dest, f"fontlist-v{font_manager.FontManager.__version__}.json")
+    font_manager.json_dump(manager, path)
+    return path
+
+# ────────────────────────────── run time ─────────────────────────────
+
+def use_bundled_cache(bundle_dir: str, cache_dir: str | None = None) -> bool:
+    """Use a persistent matplotlib cache seeded from *bundle_dir*.
+
+    Must run before matplotlib is imported; render worker processes inherit
+    the setting through the environment.  Returns ``True`` when the cache
+    was seeded now (see :func:`add_system_fonts`).
+    """
+    cache_dir = cache_dir or user_cache_dir()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        return False  # keep matplotlib's default (temporary) directory
+    os.environ["MPLCONFIGDIR"] = cache_dir
+
+    seeded = False
+    for source in glob.glob(os.path.join(bundle_dir, "fontlist-v*.json")):
+        target = os.path.join(cache_dir, os.path.basename(source))
+        if not os.path.exists(target):
+            open(os.path.join(cache_dir, PENDING_MARKER), "w").close()
+            shutil.copyfile(source, target)
+            seeded = True
+    return seeded
+
+
+def system_fonts_pending() -> bool:
+    """True while a cache seeded by :func:`use_bundled_cache` lacks the system fonts.
+
+    Does not import matplotlib; only meaningful once ``MPLCONFIGDIR`` was set.
+    """
+    config_dir = os.environ.get("MPLCONFIGDIR")
+    return bool(config_dir) and os.path.exists(os.path.join(config_dir, PENDING_MARKER))
+
+
+def add_system_fonts() -> int:
+    """Add installed fonts to a seeded font list and save it; return the number added.
+
+    A no-op (beyond importing matplotlib's font manager) unless
+    :func:`use_bundled_cache` seeded the current cache directory.
+    """
+    import matplotlib
+    from matplotlib import font_manager
+
+    marker = os.path.join(matplotlib.get_cachedir(), PENDING_MARKER)
+    if not os.path.exists(marker):
+        return 0
+
+    manager = font_manager.fontManager
+    known = {entry.fname for entry in manager.ttflist + manager.afmlist}
+    added = 0
+    for path in font_manager.findSystemFonts(fontext="afm") + font_manager.findSystemFonts(fontext="ttf"):
+        if path in known:
+            continue
+        try:
+            manager.addfont(path)
+        except Exception:
+            continue  # unreadable or unsupported font file
+        added += 1
+
+    path = os.path.join(matplotlib.get_cachedir(), f"fontlist-v{font_manager.FontManager.__version__}.json")
+    font_manager.json_dump(manager, path)
+    os.remove(marker)
+    return added
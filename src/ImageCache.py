@@ -0,0 +1,278 @@
+"""Two-tier cache of rendered plot images.
+
+Toggling back to an earlier setting or re-exporting the same figure used to
+re-render it from scratch.  Rendered outputs (``{format: bytes}``) are cached
+under a canonical hash of everything that determines them — dataset id,
+sample layout, plot settings, formats and resolution — in a bounded in-memory
+tier backed by a bounded on-disk tier that survives restarts.
+
+* ``policy="lru"`` evicts the least recently *used* entry, ``"fifo"`` the
+  oldest *stored* one (hits do not refresh an entry).
+* The same key doubles as the HTTP ``ETag`` of the response.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+
+POLICIES = ("lru", "fifo")
+
+log = logging.getLogger(__name__)
+
+# ───────────────────────── helper utilities ──────────────────────────
+
+def render_key(
+    dataset_id: str,
+    samples_config: Any,
+    plot_settings: Any,
+    formats: list[str],
+    dpi: int,
+    *,
+    quality: str = "export",
+    salt: str = "",
+) -> str:
+    """Canonical SHA-256 of the inputs of one render.
+
+    Dict key order and JSON whitespace do not matter; *salt* should change
+    whenever the rendering code does, so stale disk entries are never served.
+    """
+    canonical = json.dumps(
+        {
+            "dataset": dataset_id,
+            "samples": samples_config,
+            "settings": plot_settings,
+            "formats": list(formats),
+            "dpi": dpi,
+            "quality": quality,
+            "salt": salt,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=True,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("ascii")).hexdigest()
+
+
+def code_fingerprint(src_dir: str | None = None) -> str:
+    """SHA-256 over the rendering modules in *src_dir* and the matplotlib version.
+
+    Used as the *salt* of :func:`render_key` so that images rendered by older
+    code are never served after an update.
+    """
+    import matplotlib
+
+    src_dir = src_dir or os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256(matplotlib.__version__.encode("ascii"))
+    for name in sorted(os.listdir(src_dir)):
+        if name.endswith(".py"):
+            with open(os.path.join(src_dir, name), "rb") as fh:
+                digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def _nbytes(outputs: dict[str, bytes]) -> int:
+    return sum(len(data) for data in outputs.values())
+
+# ────────────────────────── cache implementation ─────────────────────
+
+class ImageCache:
+    """Thread-safe memory + disk cache of ``{format: bytes}`` render outputs.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Upper bound on the in-memory tier (``0`` disables it).
+    max_entries : int
+        Upper bound on the number of in-memory entries.
+    disk_dir : str, optional
+        Directory of the on-disk tier; ``None`` keeps images in memory only.
+        Each entry is one ``<key>.<format>`` file per format.
+    disk_max_bytes : int
+        Upper bound on the on-disk tier.
+    policy : {"lru", "fifo"}, default "lru"
+        Eviction policy of both tiers.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entries: int = 64,
+        *,
+        disk_dir: str | None = None,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+        policy: str = "lru",
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {', '.join(POLICIES)}, not {policy!r}")
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir or None
+        self.disk_max_bytes = disk_max_bytes
+        self.policy = policy
+        self._memory: OrderedDict[str, tuple[dict[str, bytes], int]] = OrderedDict()
+        self._disk: OrderedDict[str, tuple[tuple[str, ...], int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._disk_size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._scan_disk()
+
+    # ― lookups ―──────────────────────────────────────────────────────
+    def get(self, key: str) -> dict[str, bytes] | None:
+        """Return the cached outputs for *key* or ``None``; disk hits are promoted to memory."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self.policy == "lru":
+                    self._memory.move_to_end(key)
+                self.hits += 1
+                return dict(entry[0])
+            formats = self._disk.get(key, (None,))[0]
+
+        outputs = self._read_disk(key, formats) if formats else None
+        with self._lock:
+            if outputs is None:
+                self.misses += 1
+                if formats:
+                    self._drop_disk_locked(key)
+                return None
+            self.disk_hits += 1
+            if self.policy == "lru" and key in self._disk:
+                self._disk.move_to_end(key)
+            self._put_memory_locked(key, outputs)
+        return dict(outputs)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    # ― updates ―──────────────────────────────────────────────────────
+    def put(self, key: str, outputs: dict[str, bytes]) -> None:
+        """Store *outputs* in both tiers, evicting entries as the policy dictates."""
+        outputs = dict(outputs)
+        with self._lock:
+            self._put_memory_locked(key, outputs)
+        if self.disk_dir and _nbytes(outputs) <= self.disk_max_bytes:
+            self._write_disk(key, outputs)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._size = 0
+            for key in list(self._disk):
+                self._drop_disk_locked(key)
+
+    def stats(self) -> dict[str, Any]:
+        """Return a snapshot of occupancy and hit/miss counters."""
+        with self._lock:
+            return {
+                "policy": self.policy,
+                "entries": len(self._memory),
+                "bytes": self._size,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_size,
+                "disk_max_bytes": self.disk_max_bytes if self.disk_dir else 0,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+    # ― memory tier ―──────────────────────────────────────────────────
+    def _put_memory_locked(self, key: str, outputs: dict[str, bytes]) -> None:
+        nbytes = _nbytes(outputs)
+        if key in self._memory:
+            self._size -= self._memory.pop(key)[1]
+        if nbytes > self.max_bytes or self.max_entries <= 0:
+            return
+        self._memory[key] = (outputs, nbytes)
+        self._size += nbytes
+        while self._memory and (len(self._memory) > self.max_entries or self._size > self.max_bytes):
+            _, (_, evicted) = self._memory.popitem(last=False)
+            self._size -= evicted
+
+    # ― disk tier ―────────────────────────────────────────────────────
+    def _path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.{fmt}")
+
+    def _scan_disk(self) -> None:
+        """Rebuild the disk index from the cache directory, oldest file first."""
+        found: dict[str, list] = {}
+        for name in os.listdir(self.disk_dir):
+            key, _, fmt = name.partition(".")
+            if name.endswith(".tmp"):
+                # left behind by an interrupted write
+                try:
+                    os.remove(os.path.join(self.disk_dir, name))
+                except OSError:
+                    pass
+                continue
+            if len(key) != 64 or not fmt:
+                continue
+            try:
+                st = os.stat(os.path.join(self.disk_dir, name))
+            except OSError:
+                continue
+            entry = found.setdefault(key, [[], 0, 0.0])
+            entry[0].append(fmt)
+            entry[1] += st.st_size
+            entry[2] = max(entry[2], st.st_mtime)
+        for key, (fmts, size, _) in sorted(found.items(), key=lambda item: item[1][2]):
+            self._disk[key] = (tuple(fmts), size)
+            self._disk_size += size
+        with self._lock:
+            self._evict_disk_locked()
+
+    def _read_disk(self, key: str, formats: tuple[str, ...]) -> dict[str, bytes] | None:
+        outputs = {}
+        try:
+            for fmt in formats:
+                with open(self._path(key, fmt), "rb") as fh:
+                    outputs[fmt] = fh.read()
+            if self.policy == "lru":
+                # persist the recency order across restarts
+                os.utime(self._path(key, formats[0]))
+        except OSError:
+            return None
+        return outputs
+
+    def _write_disk(self, key: str, outputs: dict[str, bytes]) -> None:
+        try:
+            for fmt, data in outputs.items():
+                tmp = f"{self._path(key, fmt)}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as fh:
+                    fh.write(data)
+                os.replace(tmp, self._path(key, fmt))
+        except OSError as e:
+            log.warning("Image cache: could not write %s to disk: %s", key[:12], e)
+            return
+        with self._lock:
+            if key in self._disk:
+                self._disk_size -= self._disk.pop(key)[1]
+            self._disk[key] = (tuple(outputs), _nbytes(outputs))
+            self._disk_size += _nbytes(outputs)
+            self._evict_disk_locked()
+
+    def _drop_disk_locked(self, key: str) -> None:
+        formats, size = self._disk.pop(key, ((), 0))
+        self._disk_size -= size
+        for fmt in formats:
+            try:
+                os.remove(self._path(key, fmt))
+            except OSError:
+                pass
+
+    def _evict_disk_locked(self) -> None:
+        while self._disk and self._disk_size > self.disk_max_bytes:
+            self._drop_disk_locked(next(iter(self._disk)))
@@ -0,0 +1,419 @@
+"""Streaming ingestion of plate-reader Excel and CSV exports.
+
+Plate-reader workbooks carry a block of run metadata above the kinetic reads
+and often further result blocks below them.  Instead of assuming the read
+header sits on row 31 and letting ``pd.read_excel`` materialise every cell,
+:func:`read_plate_excel` streams the worksheet XML of the first sheet, locates
+the header row (``Time`` followed by well IDs such as ``A1`` … ``AF48``), stops
+at the end of the read block and only decodes the ``Time`` column plus the
+wells that were asked for.  Cells outside that projection are skipped without
+any type conversion, which is where ``openpyxl``/``pandas`` spend most of
+their time on a full plate export.
+
+CSV exports go through :class:`PlateCsvReader`, which takes the text in
+arbitrary chunks — a whole file (:func:`read_plate_csv`) or just the bytes a
+running acquisition appended since the last look (see ``LiveAcquisition``).
+Workbooks that are rewritten during a run can be re-read with ``skip_reads``,
+which leaves the reads seen before undecoded.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import os
+import posixpath
+import re
+import zipfile
+from typing import Any, BinaryIO, Iterable
+from xml.etree.ElementTree import iterparse, parse
+
+import numpy as np
+import pandas as pd
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+
+# A1 … AF48: rows A–Z then AA–AF, columns 1–48 (every layout up to 1536 wells)
+WELL_PATTERN = re.compile(r"^(?:[A-Z]|A[A-F])(?:[1-9]|[1-3][0-9]|4[0-8])$")
+CSV_DELIMITERS = (",", ";", "\t")
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+
+# ───────────────────────── helper utilities ──────────────────────────
+
+def _is_blank(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _column_index(letters: str) -> int:
+    """Zero-based column index of a column reference such as ``"AB"``."""
+    idx = 0
+    for ch in letters:
+        idx = idx * 26 + (ord(ch) - 64)
+    return idx - 1
+
+
+def _match_header(row: dict[int, Any], time_col: str) -> tuple[int, dict[str, int]] | None:
+    """Return ``(time_index, {well: column_index})`` if *row* is the read header."""
+    time_idx = None
+    wells: dict[str, int] = {}
+    for idx in sorted(row):
+        cell = row[idx]
+        if not isinstance(cell, str):
+            continue
+        label = cell.strip()
+        if time_idx is None and label.lower() == time_col.lower():
+            time_idx = idx
+        elif WELL_PATTERN.match(label) and label not in wells:
+            wells[label] = idx
+    if time_idx is None or not wells:
+        return None
+    return time_idx, wells
+
+
+def _to_float_matrix(rows: list[list[Any]], n_cols: int) -> np.ndarray:
+    """Convert collected cell values to a float matrix, non-numeric cells become NaN."""
+    if not rows:
+        return np.empty((0, n_cols), dtype=float)
+    try:
+        return np.array(rows, dtype=float)
+    except (TypeError, ValueError):
+        # e.g. "OVRFLW" or blank cells in a few wells
+        obj = np.array(rows, dtype=object)
+        return np.column_stack(
+            [pd.to_numeric(obj[:, j], errors="coerce") for j in range(n_cols)]
+        ).astype(float)
+
+# ───────────────────────── workbook package parts ─────────────────────
+
+class _Workbook:
+    """Minimal view of an ``.xlsx`` package: sheet paths, strings and date styles."""
+
+    def __init__(self, archive: zipfile.ZipFile):
+        self.archive = archive
+        names = set(archive.namelist())
+
+        wb_root = parse(archive.open("xl/workbook.xml")).getroot()
+        pr = wb_root.find(f"{_NS}workbookPr")
+        date1904 = pr is not None and pr.get("date1904") in ("1", "true")
+        self.epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+
+        rels = {}
+        if "xl/_rels/workbook.xml.rels" in names:
+            for rel in parse(archive.open("xl/_rels/workbook.xml.rels")).getroot():
+                target = rel.get("Target", "")
+                if target.startswith("/"):
+                    target = target.lstrip("/")
+                else:
+                    target = posixpath.normpath(posixpath.join("xl", target))
+                rels[rel.get("Id")] = target
+        self.sheets: list[tuple[str, str]] = []
+        for sh in wb_root.iter(f"{_NS}sheet"):
+            path = rels.get(sh.get(f"{_REL_NS}id"))
+            if path:
+                self.sheets.append((sh.get("name"), path))
+
+        self.strings: list[str] = []
+        if "xl/sharedStrings.xml" in names:
+            for si in parse(archive.open("xl/sharedStrings.xml")).getroot().iter(f"{_NS}si"):
+                self.strings.append("".join(t.text or "" for t in si.iter(f"{_NS}t")))
+
+        # style index -> None (plain number) / "date" / "timedelta"
+        self.date_styles: list[str | None] = []
+        if "xl/styles.xml" in names:
+            st_root = parse(archive.open("xl/styles.xml")).getroot()
+            custom = {}
+            num_fmts = st_root.find(f"{_NS}numFmts")
+            if num_fmts is not None:
+                for nf in num_fmts:
+                    custom[int(nf.get("numFmtId"))] = nf.get("formatCode", "")
+            xfs = st_root.find(f"{_NS}cellXfs")
+            for xf in (xfs if xfs is not None else []):
+                fmt_id = int(xf.get("numFmtId", 0))
+                code = custom.get(fmt_id, BUILTIN_FORMATS.get(fmt_id, "General"))
+                if is_timedelta_format(code):
+                    self.date_styles.append("timedelta")
+                elif is_date_format(code):
+                    self.date_styles.append("date")
+                else:
+                    self.date_styles.append(None)
+
+    def sheet_path(self, sheet: str | int | None) -> str:
+        if not self.sheets:
+            raise ValueError("Workbook does not contain any worksheets")
+        if sheet is None:
+            return self.sheets[0][1]
+        if isinstance(sheet, int):
+            return self.sheets[sheet][1]
+        for name, path in self.sheets:
+            if name == sheet:
+                return path
+        raise KeyError(f"Worksheet {sheet!r} does not exist")
+
+    def cell_value(self, cell) -> Any:
+        """Decode a ``<c>`` element the way ``openpyxl`` would."""
+        kind = cell.get("t", "n")
+        if kind == "inlineStr":
+            return "".join(t.text or "" for t in cell.iter(f"{_NS}t"))
+        v = cell.find(f"{_NS}v")
+        if v is None or v.text is None:
+            return None
+        text = v.text
+        if kind == "s":
+            return self.strings[int(text)]
+        if kind in ("str", "e"):
+            return text
+        if kind == "b":
+            return text == "1"
+        if kind == "d":
+            return from_ISO8601(text)
+        value = float(text)
+        style = int(cell.get("s", 0))
+        fmt = self.date_styles[style] if style < len(self.date_styles) else None
+        if fmt is not None:
+            return from_excel(value, self.epoch, timedelta=fmt == "timedelta")
+        return value
+
+
+def _iter_rows(book: _Workbook, path: str, wanted: set[int]):
+    """Yield ``{column_index: value}`` per worksheet row.
+
+    An empty *wanted* set decodes every cell.  The set is consulted on every
+    row, so callers can fill it once the header row has been seen; from then
+    on cells outside it are skipped undecoded.
+    """
+    row_tag, cell_tag = f"{_NS}row", f"{_NS}c"
+    col_of: dict[str, int] = {}
+    with book.archive.open(path) as fh:
+        for _, el in iterparse(fh):
+            if el.tag != row_tag:
+                continue
+            row: dict[int, Any] = {}
+            next_col = 0
+            for cell in el.iter(cell_tag):
+                ref = cell.get("r")
+                if ref:
+                    letters = ref.rstrip("0123456789")
+                    col = col_of.get(letters)
+                    if col is None:
+                        col = col_of[letters] = _column_index(letters)
+                else:
+                    col = next_col
+                next_col = col + 1
+                if not wanted or col in wanted:
+                    row[col] = book.cell_value(cell)
+            el.clear()
+            yield row
+
+# ────────────────────────── main ingestion API ────────────────────────
+
+def read_plate_excel(
+    source: bytes | str | os.PathLike | BinaryIO,
+    *,
+    wells: Iterable[str] | None = None,
+    time_col: str = "Time",
+    sheet: str | int | None = None,
+    max_header_scan: int = 500,
+    skip_reads: int = 0,
+) -> pd.DataFrame:
+    """Read the kinetic block of a plate-reader workbook.
+
+    Parameters
+    ----------
+    source : bytes, path or binary file object
+        The ``.xlsx`` workbook.
+    wells : iterable of str, optional
+        Well IDs to materialise.  ``None`` keeps every well found in the
+        header row.  Unknown wells raise ``ValueError``.
+    time_col : str, default ``"Time"``
+        Label of the time column in the header row (matched case-insensitively).
+    sheet : str or int, optional
+        Sheet name or index; defaults to the first sheet like ``pd.read_excel``.
+    max_header_scan : int, default 500
+        Give up if no header row is found within this many rows.
+    skip_reads : int, default 0
+        Leave out the first reads of the block; only their time cells are
+        decoded (to find the end of the block).
+
+    Returns
+    -------
+    pandas.DataFrame
+        ``time_col`` followed by the selected well columns, one row per read.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    try:
+        archive = zipfile.ZipFile(source)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Not an .xlsx workbook: {e}") from e
+
+    with archive:
+        book = _Workbook(archive)
+        wanted: set[int] = set()
+        rows = _iter_rows(book, book.sheet_path(sheet), wanted)
+
+        # ― locate the header row ―───────────────────────────────────
+        header = None
+        for row_num, row in enumerate(rows, start=1):
+            header = _match_header(row, time_col)
+            if header is not None or row_num >= max_header_scan:
+                break
+        if header is None:
+            raise ValueError(
+                f"Could not find a header row with a '{time_col}' column and well IDs "
+                f"in the first {max_header_scan} rows"
+            )
+        time_idx, well_idx = header
+
+        # ― column projection ―───────────────────────────────────────
+        if wells is None:
+            selected = list(well_idx)
+        else:
+            selected = list(dict.fromkeys(wells))
+            missing = [w for w in selected if w not in well_idx]
+            if missing:
+                raise ValueError(f"Wells not found in workbook: {', '.join(missing)}")
+        cols = [well_idx[w] for w in selected]
+        wanted.add(time_idx)
+        if skip_reads <= 0:
+            wanted.update(cols)
+
+        # ― read block until the first row without a time / any reads ―
+        times: list[Any] = []
+        values: list[list[Any]] = []
+        skipped = 0
+        for row in rows:
+            t = row.get(time_idx)
+            if _is_blank(t):
+                break
+            if skipped < skip_reads:
+                skipped += 1
+                if skipped == skip_reads:
+                    wanted.update(cols)
+                continue
+            vals = [row.get(c) for c in cols]
+            if all(_is_blank(v) for v in vals):
+                break
+            times.append(t)
+            values.append(vals)
+        rows.close()
+
+    df = pd.DataFrame(_to_float_matrix(values, len(cols)), columns=selected)
+    df.insert(0, time_col, pd.Series(times, dtype=object if not times else None))
+    return df
+
+
+# ───────────────────────────── CSV exports ───────────────────────────
+
+class PlateCsvReader:
+    """Incremental parser of the kinetic block of a plate-reader CSV export.
+
+    Text is passed to :meth:`feed` in chunks of any size; complete lines are
+    parsed and a trailing partial line is kept for the next chunk.  The header
+    row is found as in :func:`read_plate_excel` (the delimiter — comma,
+    semicolon or tab — is the one that yields the most well IDs).  The block
+    ends at the first row without a time or without any reads after the first
+    read; :attr:`finished` is then set and further text is ignored.
+
+    Parameters
+    ----------
+    wells : iterable of str, optional
+        Well IDs to keep; ``None`` keeps every well of the header row.
+    time_col : str, default ``"Time"``
+        Label of the time column in the header row.
+    max_header_scan : int, default 500
+        Raise ``ValueError`` if no header is found within this many lines.
+    """
+
+    def __init__(self, *, wells: Iterable[str] | None = None, time_col: str = "Time", max_header_scan: int = 500):
+        self.time_col = time_col
+        self.max_header_scan = max_header_scan
+        self.requested = list(dict.fromkeys(wells)) if wells is not None else None
+        self.wells: list[str] | None = None  # known once the header was read
+        self.delimiter: str | None = None
+        self.reads = 0
+        self.finished = False
+        self._time_idx = 0
+        self._cols: list[int] = []
+        self._partial = ""
+        self._scanned = 0
+
+    def _find_header(self, line: str) -> None:
+        best = None
+        for delimiter in CSV_DELIMITERS:
+            cells = next(csv.reader([line], delimiter=delimiter), [])
+            header = _match_header(dict(enumerate(cells)), self.time_col)
+            if header is not None and (best is None or len(header[1]) > len(best[1][1])):
+                best = (delimiter, header)
+        if best is None:
+            return
+        self.delimiter, (self._time_idx, well_idx) = best
+        if self.requested is None:
+            selected = list(well_idx)
+        else:
+            selected = self.requested
+            missing = [w for w in selected if w not in well_idx]
+            if missing:
+                raise ValueError(f"Wells not found in CSV export: {', '.join(missing)}")
+        self._cols = [well_idx[w] for w in selected]
+        self.wells = selected
+
+    def feed(self, text: str, final: bool = False) -> tuple[list[str], np.ndarray]:
+        """Parse the complete lines of *text*; return ``(times, values)`` of the new reads.
+
+        With *final* the remaining partial line is parsed as well (end of file).
+        """
+        lines = (self._partial + text).split("\n")
+        self._partial = "" if final else lines.pop()
+        times: list[str] = []
+        values: list[list[Any]] = []
+        for line in lines:
+            if self.finished:
+                break
+            line = line.rstrip("\r")
+            if self.wells is None:
+                self._scanned += 1
+                self._find_header(line)
+                if self.wells is None and self._scanned >= self.max_header_scan:
+                    raise ValueError(
+                        f"Could not find a header row with a '{self.time_col}' column and well IDs "
+                        f"in the first {self.max_header_scan} lines"
+                    )
+                continue
+            cells = next(csv.reader([line], delimiter=self.delimiter), [])
+            t = cells[self._time_idx] if self._time_idx < len(cells) else None
+            vals = [cells[c] if c < len(cells) else None for c in self._cols]
+            if _is_blank(t) or all(_is_blank(v) for v in vals):
+                if self.reads or times:
+                    self.finished = True
+                continue
+            times.append(t.strip())
+            values.append(vals)
+        self.reads += len(times)
+        return times, _to_float_matrix(values, len(self._cols))
+
+
+def read_plate_csv(
+    source: bytes | str | os.PathLike | BinaryIO,
+    *,
+    wells: Iterable[str] | None = None,
+    time_col: str = "Time",
+    max_header_scan: int = 500,
+) -> pd.DataFrame:
+    """Read the kinetic block of a plate-reader CSV export.
+
+    Same result layout and parameters as :func:`read_plate_excel`.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as fh:
+            source = fh.read()
+    elif not isinstance(source, (bytes, bytearray)):
+        source = source.read()
+    reader = PlateCsvReader(wells=wells, time_col=time_col, max_header_scan=max_header_scan)
+    times, values = reader.feed(bytes(source).decode("utf-8-sig", errors="replace"), final=True)
+    if reader.wells is None:
+        raise ValueError(f"Could not find a header row with a '{time_col}' column and well IDs")
+    df = pd.DataFrame(values, columns=reader.wells)
+    df.insert(0, time_col, pd.Series(times, dtype=object))
+    return df
@@ -0,0 +1,195 @@
+"""Asynchronous render jobs with cancellation of superseded previews.
+
+``/generate-plot`` and ``/render`` answer only once the image is ready, and a
+render nobody waits for any more (the user already changed the title again)
+still runs to completion.  :class:`JobManager` runs the same work as jobs on a
+small thread pool: clients submit, poll (long-poll) the status, fetch the
+result or cancel.  A job submitted with a *session* cancels the session's
+previous job if it has not finished yet.
+
+Cancellation is cooperative.  A queued job never starts; a running job is
+reported as cancelled at once and stops at its next :func:`checkpoint` — the
+pipeline calls it between stages (parse, preprocess, samples, plot, encode).
+Work already handed to a render worker process runs to completion and is only
+kept for the image cache.
+"""
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from Metrics import timing
+
+STATES = ("queued", "running", "done", "failed", "cancelled")
+FINISHED = ("done", "failed", "cancelled")
+
+_current: contextvars.ContextVar["Job | None"] = contextvars.ContextVar("protrace_job", default=None)
+
+# ───────────────────────── helper utilities ──────────────────────────
+
+class JobCancelled(Exception):
+    """Raised at a :func:`checkpoint` of a job that has been cancelled."""
+
+
+def checkpoint() -> None:
+    """Stop the current job here if it was cancelled (no-op outside jobs)."""
+    job = _current.get()
+    if job is not None and job.cancel_requested.is_set():
+        raise JobCancelled(f"Job {job.id} was {job.cancel_reason or 'cancelled'}")
+
+# ───────────────────────────── jobs ──────────────────────────────────
+
+class Job:
+    """State of one submitted job; *result* / *exception* are set once finished."""
+
+    def __init__(self, session: str | None = None):
+        self.id = uuid.uuid4().hex
+        self.session = session
+        self.state = "queued"
+        self.created = time.time()
+        self.started: float | None = None
+        self.finished: float | None = None
+        self.result: Any = None
+        self.exception: BaseException | None = None
+        self.cancel_reason: str | None = None
+        self.stages: list[tuple[str, float]] = []
+        self.cancel_requested = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.state in FINISHED
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "jobId": self.id,
+            "sessionId": self.session,
+            "state": self.state,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "error": str(self.exception) if self.exception is not None else None,
+            "cancelReason": self.cancel_reason,
+            "stages": [{"name": n, "seconds": round(s, 4)} for n, s in self.stages],
+        }
+
+
+class JobManager:
+    """Run jobs on a thread pool; finished jobs are kept for a while for their results.
+
+    Parameters
+    ----------
+    workers : int, default 2
+        Jobs processed at the same time (the rest wait queued).
+    max_finished : int, default 100
+        Finished jobs (and their results) kept; the oldest are forgotten first.
+    """
+
+    def __init__(self, workers: int = 2, max_finished: int = 100):
+        self.workers = max(1, int(workers))
+        self.max_finished = max(1, int(max_finished))
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="render-job")
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._sessions: dict[str, str] = {}
+        self._changed = threading.Condition()
+        self.counts = {state: 0 for state in FINISHED}
+
+    # ― submission ―───────────────────────────────────────────────────
+    def submit(self, fn: Callable[..., Any], *args: Any, session: str | None = None) -> tuple[Job, list[Job]]:
+        """Queue ``fn(*args)``; return the job and the session's jobs it superseded."""
+        job = Job(session)
+        superseded = []
+        with self._changed:
+            if session is not None:
+                previous = self._jobs.get(self._sessions.get(session, ""))
+                if previous is not None and not previous.done:
+                    superseded.append(previous)
+                self._sessions[session] = job.id
+            self._jobs[job.id] = job
+        for previous in superseded:
+            self.cancel(previous.id, reason="superseded")
+        self._executor.submit(self._run, job, fn, args)
+        return job, superseded
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple) -> None:
+        with self._changed:
+            if job.done:  # cancelled while queued
+                return
+            job.state, job.started = "running", time.time()
+            self._changed.notify_all()
+
+        token = _current.set(job)
+        result, exception = None, None
+        try:
+            with timing() as timer:
+                result = fn(*args)
+        except Exception as e:
+            exception = e
+        finally:
+            _current.reset(token)
+
+        with self._changed:
+            job.stages = timer.stages()
+            if not job.done:  # not cancelled meanwhile
+                if exception is None:
+                    job.state, job.result = "done", result
+                elif isinstance(exception, JobCancelled):
+                    job.state = "cancelled"
+                else:
+                    job.state, job.exception = "failed", exception
+                self._finish(job)
+
+    def _finish(self, job: Job) -> None:
+        # called with the condition held
+        job.finished = time.time()
+        self.counts[job.state] += 1
+        self._changed.notify_all()
+        finished = [j for j in self._jobs.values() if j.done]
+        for old in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[old.id]
+            if old.session is not None and self._sessions.get(old.session) == old.id:
+                del self._sessions[old.session]
+
+    # ― queries / control ―────────────────────────────────────────────
+    def get(self, job_id: str) -> Job | None:
+        with self._changed:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str, reason: str = "cancelled") -> Job | None:
+        """Cancel a queued or running job (no-op once it finished)."""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None or job.done:
+                return job
+            job.cancel_requested.set()
+            job.state, job.cancel_reason = "cancelled", reason
+            self._finish(job)
+            return job
+
+    def wait(self, job: Job, timeout: float, state: str | None = None) -> Job:
+        """Block until *job* leaves *state* (default: until it finishes) or *timeout* passes."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._changed:
+            while not job.done and (state is None or job.state == state):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+        return job
+
+    def stats(self) -> dict[str, Any]:
+        with self._changed:
+            active = [j.state for j in self._jobs.values() if not j.done]
+        return {
+            "workers": self.workers,
+            "queued": active.count("queued"),
+            "running": active.count("running"),
+            **self.counts,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
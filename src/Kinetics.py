@@ -0,0 +1,188 @@
+"""Kinetic parameters of standardised assembly curves, for every well at once.
+
+Lag time, maximum slope, plateau height and half-time used to be read off the
+traces by hand in spreadsheets.  :func:`fit_kinetics` derives them for a whole
+``(reads, curves)`` matrix sharing one time axis in a few array passes — no
+per-well Python loop, no iterative curve fitting:
+
+* smoothing – centred moving average along the reads
+  (:func:`Preprocessing.moving_average`, NaN-aware, the window
+  shrinks at both ends);
+* baseline / plateau – mean of the first / last reads of the smoothed curve;
+  *amplitude* is their difference and sets the direction of the transition;
+* maximum slope – largest finite-difference derivative in that direction
+  (``numpy.gradient`` on the real, possibly uneven, time axis);
+* lag time – where the tangent at the maximum slope meets the baseline;
+* half-time – first crossing of ``baseline + amplitude / 2``, linearly
+  interpolated between the two reads around it.
+
+:func:`analyze_samples` applies it to the replicates of
+:func:`Sample.stdized_diff_samples` and adds per-sample mean, SD and counts.
+Times are in minutes of the plate's time axis, slopes in units per minute.
+"""
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from Metrics import stage
+from Preprocessing import moving_average
+
+PARAMETERS = ("baseline", "plateau", "amplitude", "maxSlope", "tMaxSlope", "lagTime", "halfTime")
+
+# ───────────────────────── helper utilities ──────────────────────────
+
+def _column_mean(y: np.ndarray) -> np.ndarray:
+    """Mean of every column over its finite values (NaN where there are none)."""
+    finite = np.isfinite(y)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(finite, y, 0.0).sum(axis=0) / finite.sum(axis=0)
+
+
+def first_crossing(t: np.ndarray, y: np.ndarray, level: np.ndarray, direction: np.ndarray) -> np.ndarray:
+    """Interpolated time at which each column of *y* first reaches its *level*.
+
+    *direction* is ``+1`` for a rising and ``-1`` for a falling transition;
+    columns that never reach their level give NaN.
+    """
+    reached = direction * (y - level) >= 0
+    idx = np.argmax(reached, axis=0)
+    cols = np.arange(y.shape[1])
+    prev = np.maximum(idx - 1, 0)
+    y0, y1 = y[prev, cols], y[idx, cols]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frac = np.where(idx > 0, (level - y0) / (y1 - y0), 0.0)
+    times = t[prev] + np.clip(frac, 0.0, 1.0) * (t[idx] - t[prev])
+    return np.where(reached.any(axis=0), times, np.nan)
+
+# ────────────────────────── main analysis API ─────────────────────────
+
+def fit_kinetics(
+    t: np.ndarray,
+    y: np.ndarray,
+    *,
+    window: int = 5,
+    baseline_reads: int = 5,
+    plateau_reads: int = 5,
+) -> dict[str, np.ndarray]:
+    """Kinetic parameters of every column of *y*.
+
+    Parameters
+    ----------
+    t : numpy.ndarray, shape (reads,)
+        Increasing time axis (minutes).
+    y : numpy.ndarray, shape (reads, curves)
+        Standardised curves, one per column.
+    window : int, default 5
+        Moving-average window in reads (``1`` = no smoothing).
+    baseline_reads, plateau_reads : int, default 5
+        Reads at the start / end averaged into the baseline / plateau.
+
+    Returns
+    -------
+    dict
+        One array of shape ``(curves,)`` per name in :data:`PARAMETERS`.
+        Curves without a transition (zero or undefined amplitude) have NaN
+        lag and half-times.
+    """
+    t = np.asarray(t, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if y.ndim == 1:
+        y = y[:, None]
+    if y.shape[0] != len(t):
+        raise ValueError("t and y have a different number of reads")
+    if len(t) < 2:
+        raise ValueError("at least two reads are needed")
+    if min(window, baseline_reads, plateau_reads) < 1:
+        raise ValueError("window, baseline_reads and plateau_reads must be at least 1")
+
+    smooth = moving_average(y, int(window))
+    baseline = _column_mean(smooth[: int(baseline_reads)])
+    plateau = _column_mean(smooth[-int(plateau_reads):])
+    amplitude = plateau - baseline
+    direction = np.where(amplitude < 0, -1.0, 1.0)
+    has_transition = np.isfinite(amplitude) & (amplitude != 0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = np.gradient(smooth, t, axis=0)
+    steepness = np.where(np.isfinite(slope), direction * slope, -np.inf)
+    at = np.argmax(steepness, axis=0)
+    cols = np.arange(y.shape[1])
+    max_slope = np.where(np.isfinite(steepness[at, cols]), slope[at, cols], np.nan)
+    t_max = np.where(np.isfinite(max_slope), t[at], np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lag = t_max - (smooth[at, cols] - baseline) / max_slope
+    lag = np.where(has_transition & (direction * max_slope > 0), lag, np.nan)
+    half = np.where(has_transition, first_crossing(t, smooth, baseline + amplitude / 2, direction), np.nan)
+
+    return {
+        "baseline": baseline,
+        "plateau": plateau,
+        "amplitude": amplitude,
+        "maxSlope": max_slope,
+        "tMaxSlope": t_max,
+        "lagTime": lag,
+        "halfTime": half,
+    }
+
+
+def analyze_samples(samples: Iterable[Any], **options: Any) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Fit every replicate of *samples*; return ``(per-well table, per-sample summary)``.
+
+    The replicates of all samples backed by the same plate are fitted in one
+    :func:`fit_kinetics` call; *options* are passed on to it.  The per-well
+    table has ``sample``, ``well``, ``background`` and one column per
+    parameter; the summary has ``sample``, ``n`` (replicates of the sample)
+    and ``<parameter>Mean`` / ``<parameter>Sd`` / ``<parameter>N``, taken
+    over the ``<parameter>N`` replicates with a finite value (e.g. no lag
+    time is found for a flat curve).
+    """
+    from Sample import stdized_diff_samples
+
+    samples = list(samples)
+    if not samples:
+        raise ValueError("`samples` is empty")
+    with stage("standardize"):
+        stdized = stdized_diff_samples(samples)
+
+    groups: dict[int, list[int]] = {}
+    for pos, sample in enumerate(samples):
+        groups.setdefault(id(sample.plate), []).append(pos)
+
+    wells = [sample.sample_wells or [sample.background_well] for sample in samples]
+    sizes = [len(w) for w in wells]
+    fitted: dict[str, list[np.ndarray]] = {name: [] for name in PARAMETERS}
+    columns: list[np.ndarray] = [None] * len(samples)  # rows of the concatenated fits per sample
+    offset = 0
+    with stage("kinetics"):
+        for positions in groups.values():
+            plate = samples[positions[0]].plate
+            result = fit_kinetics(plate.time_axis[0], np.hstack([stdized[p] for p in positions]), **options)
+            for name in PARAMETERS:
+                fitted[name].append(result[name])
+            for p in positions:
+                columns[p] = np.arange(offset, offset + sizes[p])
+                offset += sizes[p]
+    order = np.concatenate(columns)
+
+    wells_table = pd.DataFrame({
+        "sample": np.repeat([sample.sample_name for sample in samples], sizes),
+        "well": [well for sample_wells in wells for well in sample_wells],
+        "background": np.repeat([sample.background_well if sample.sample_wells else None for sample in samples], sizes),
+        **{name: np.concatenate(parts)[order] for name, parts in fitted.items()},
+    })
+
+    # one group per layout entry, even if two samples share a name
+    entry = np.repeat(np.arange(len(samples)), sizes)
+    grouped = wells_table[list(PARAMETERS)].groupby(entry)
+    summary = pd.concat([
+        grouped.size().rename("n"),
+        grouped.mean().add_suffix("Mean"),
+        grouped.std().add_suffix("Sd"),
+        grouped.count().add_suffix("N"),
+    ], axis=1).reset_index(drop=True)
+    summary.insert(0, "sample", [sample.sample_name for sample in samples])
+    return wells_table, summary
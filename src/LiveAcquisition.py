@@ -0,0 +1,392 @@
+"""Live acquisition: follow a plate-reader export while the run is still going.
+
+A kinetic run takes hours, and its export grows read by read on local disk.
+Re-uploading and re-parsing the whole workbook to look at the latest reads
+makes every look cost as much as the full history.  A :class:`LiveSource`
+instead polls the export on a background thread and parses only what is new:
+
+* ``csv`` – the file is read from the byte offset of the last poll; a trailing
+  partial line waits for the next poll (:class:`Ingestion.PlateCsvReader`);
+* ``xlsx`` – a workbook cannot be appended to, so it is re-read when its size
+  or modification time change, leaving the reads seen before undecoded
+  (``read_plate_excel(skip_reads=...)``);
+* ``directory`` – per-read dump files (``.csv`` / ``.xlsx``) in name order;
+  files seen before are not opened again.
+
+New reads are appended to one growing :class:`PlateMatrix` (amortised
+O(new reads), time axis extended from the last read).  Renders work on
+:meth:`LiveSource.snapshot`, and the source's :attr:`LiveSource.dataset_id`
+(``live:<id>``) can be used wherever a dataset id is accepted.
+
+Numpy, pandas and the parsers are imported on first use, so the API can import
+this module before the warm-up.
+"""
+from __future__ import annotations
+
+import codecs
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Any
+
+KINDS = ("csv", "xlsx", "directory")
+LIVE_PREFIX = "live:"
+CSV_SUFFIXES = (".csv", ".tsv", ".txt")
+
+log = logging.getLogger(__name__)
+
+Chunk = tuple[list[str], list[Any], Any]  # (wells, time stamps, values array)
+
+# ───────────────────────── helper utilities ──────────────────────────
+
+class SourceNotReady(Exception):
+    """The export cannot be read right now (e.g. a workbook being saved); retried on the next poll."""
+
+
+def detect_kind(path: str) -> str:
+    """``"directory"``, ``"xlsx"`` or ``"csv"`` from the path, ``ValueError`` otherwise."""
+    if os.path.isdir(path):
+        return "directory"
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".xlsx":
+        return "xlsx"
+    if ext in CSV_SUFFIXES:
+        return "csv"
+    raise ValueError(f"Cannot follow {os.path.basename(path)!r}: expected a .xlsx or .csv file or a directory")
+
+
+def _natural_key(name: str) -> list:
+    """Sort key putting ``read_2`` before ``read_10``."""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", name)]
+
+
+def _align(values: Any, wells: list[str], target: list[str]) -> Any:
+    """Reorder the columns of *values* (labelled *wells*) to *target*; missing wells are NaN."""
+    import numpy as np
+
+    pos = {well: col for col, well in enumerate(wells)}
+    idx = np.array([pos.get(well, -1) for well in target], dtype=np.intp)
+    aligned = values[:, np.maximum(idx, 0)]
+    aligned[:, idx < 0] = np.nan
+    return aligned
+
+# ───────────────────────────── tails ─────────────────────────────────
+
+class CsvTail:
+    """Reads appended to a CSV export since the last poll."""
+
+    def __init__(self, path: str, time_col: str = "Time"):
+        from Ingestion import PlateCsvReader
+
+        self.path = path
+        self.offset = 0
+        self.reader = PlateCsvReader(time_col=time_col)
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+
+    def poll(self) -> list[Chunk]:
+        size = os.path.getsize(self.path)
+        if size < self.offset:
+            raise ValueError(f"{os.path.basename(self.path)} shrank; the export was replaced, start a new live source")
+        if size == self.offset or self.reader.finished:
+            return []
+        with open(self.path, "rb") as fh:
+            fh.seek(self.offset)
+            data = fh.read(size - self.offset)
+        self.offset += len(data)
+        times, values = self.reader.feed(self._decoder.decode(data))
+        return [(self.reader.wells, times, values)] if times else []
+
+
+class XlsxTail:
+    """Reads added to a workbook since the last poll (re-read on change)."""
+
+    def __init__(self, path: str, time_col: str = "Time"):
+        self.path = path
+        self.time_col = time_col
+        self.reads = 0
+        self._stamp: tuple[int, int] | None = None
+
+    def poll(self) -> list[Chunk]:
+        from xml.etree.ElementTree import ParseError
+
+        from Ingestion import read_plate_excel
+
+        st = os.stat(self.path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return []
+        try:
+            df = read_plate_excel(self.path, time_col=self.time_col, skip_reads=self.reads)
+        except (ValueError, KeyError, ParseError, EOFError) as e:
+            # most likely caught mid-save; the stamp is kept so it is read again
+            raise SourceNotReady(f"{os.path.basename(self.path)} is not readable yet: {e}") from e
+        self._stamp = stamp
+        if df.empty:
+            return []
+        self.reads += len(df)
+        wells = [str(c) for c in df.columns[1:]]
+        return [(wells, df[self.time_col].tolist(), df[wells].to_numpy(dtype=float))]
+
+
+class DirectoryTail:
+    """Per-read dump files added to a directory since the last poll, in name order."""
+
+    def __init__(self, path: str, time_col: str = "Time"):
+        self.path = path
+        self.time_col = time_col
+        self.seen: set[str] = set()
+
+    def poll(self) -> list[Chunk]:
+        from Ingestion import read_plate_csv, read_plate_excel
+
+        names = sorted(
+            (name for name in os.listdir(self.path)
+             if name not in self.seen
+             and not name.startswith((".", "~$"))
+             and name.lower().endswith((".xlsx", *CSV_SUFFIXES))),
+            key=_natural_key,
+        )
+        chunks: list[Chunk] = []
+        for name in names:
+            file_path = os.path.join(self.path, name)
+            reader = read_plate_excel if name.lower().endswith(".xlsx") else read_plate_csv
+            try:
+                df = reader(file_path, time_col=self.time_col)
+            except (ValueError, KeyError, EOFError) as e:
+                if chunks:
+                    break  # keep the order: later files wait for this one
+                raise SourceNotReady(f"{name} is not readable yet: {e}") from e
+            self.seen.add(name)
+            if not df.empty:
+                wells = [str(c) for c in df.columns[1:]]
+                chunks.append((wells, df[self.time_col].tolist(), df[wells].to_numpy(dtype=float)))
+        return chunks
+
+
+_TAILS = {"csv": CsvTail, "xlsx": XlsxTail, "directory": DirectoryTail}
+
+# ───────────────────────────── sources ───────────────────────────────
+
+class LiveSource:
+    """A growing plate fed from a plate-reader export on local disk.
+
+    Parameters
+    ----------
+    path : str
+        The export file, or a directory of per-read dumps.
+    time_col : str, default ``"Time"``
+        Label of the time column in the export's header row.
+    interval : float, default 2
+        Seconds between polls of the background thread.
+    kind : {"csv", "xlsx", "directory"}, optional
+        Defaults to :func:`detect_kind`.
+    """
+
+    def __init__(self, path: str, *, time_col: str = "Time", interval: float = 2.0, kind: str | None = None):
+        self.id = uuid.uuid4().hex
+        self.path = os.path.abspath(path)
+        self.kind = kind or detect_kind(self.path)
+        if self.kind not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+        self.time_col = time_col
+        self.interval = max(0.1, float(interval))
+        self.tail = _TAILS[self.kind](self.path, time_col)
+        self.plate = None  # PlateMatrix once the first reads arrived
+        self.created = time.time()
+        self.polls = 0
+        self.last_poll: float | None = None
+        self.last_read: float | None = None
+        self.poll_seconds = 0.0
+        self.error: str | None = None
+        self.waiting: str | None = None
+        self._changed = threading.Condition()
+        self._poll_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def dataset_id(self) -> str:
+        return f"{LIVE_PREFIX}{self.id}"
+
+    @property
+    def reads(self) -> int:
+        plate = self.plate
+        return plate.n_reads if plate is not None else 0
+
+    # ― polling ―──────────────────────────────────────────────────────
+    def poll(self) -> int:
+        """Read what was appended since the last poll; return the number of new reads."""
+        with self._poll_lock:
+            start = time.perf_counter()
+            try:
+                chunks = self.tail.poll()
+                error = waiting = None
+            except SourceNotReady as e:
+                chunks, error, waiting = [], None, str(e)
+            except (OSError, ValueError) as e:
+                chunks, error, waiting = [], str(e), None
+                log.warning("Live source %s: %s", self.id[:12], e)
+
+            with self._changed:
+                added = 0
+                for wells, times, values in chunks:
+                    self._append(wells, times, values)
+                    added += len(times)
+                self.error, self.waiting = error, waiting
+                self.polls += 1
+                self.last_poll = time.time()
+                self.poll_seconds = time.perf_counter() - start
+                if added:
+                    self.last_read = self.last_poll
+                    log.debug("Live source %s: %d new read(s), %d in total", self.id[:12], added, self.reads)
+                self._changed.notify_all()
+            return added
+
+    def _append(self, wells: list[str], times: list[Any], values: Any) -> None:
+        # called with the condition held
+        import pandas as pd
+
+        from PlateMatrix import PlateMatrix
+
+        if self.plate is None:
+            self.plate = PlateMatrix(values, wells, pd.Series(times, dtype=object), time_col=self.time_col)
+            self.plate.time_axis  # resolved once, then extended by every append
+            return
+        if wells != self.plate.wells:
+            values = _align(values, wells, self.plate.wells)
+        self.plate.append(values, times)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    # ― lifecycle ―────────────────────────────────────────────────────
+    def start(self) -> "LiveSource":
+        """Poll on a daemon thread every :attr:`interval` seconds (idempotent)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"live-{self.id[:8]}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._changed:
+            self._changed.notify_all()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and not self._stop.is_set()
+
+    # ― reads ―────────────────────────────────────────────────────────
+    def snapshot(self) -> Any | None:
+        """The reads so far as a :class:`PlateMatrix` later polls do not change (``None`` before the first read)."""
+        with self._changed:
+            return self.plate.snapshot() if self.plate is not None else None
+
+    def wait(self, since: int, timeout: float) -> int:
+        """Block until there are more than *since* reads (or *timeout* passes); return the read count."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._changed:
+            while self.reads <= since and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            return self.reads
+
+    def status(self) -> dict[str, Any]:
+        with self._changed:
+            plate = self.plate
+            return {
+                "liveId": self.id,
+                "datasetId": self.dataset_id,
+                "path": self.path,
+                "kind": self.kind,
+                "running": self.running,
+                "reads": self.reads,
+                "wells": len(plate.wells) if plate is not None else 0,
+                "duration": plate.time_axis[1] if plate is not None else 0.0,
+                "finished": bool(getattr(getattr(self.tail, "reader", None), "finished", False)),
+                "interval": self.interval,
+                "polls": self.polls,
+                "created": self.created,
+                "lastPoll": self.last_poll,
+                "lastRead": self.last_read,
+                "pollSeconds": round(self.poll_seconds, 4),
+                "error": self.error,
+                "waiting": self.waiting,
+            }
+
+
+class LiveManager:
+    """The open live sources, by id.
+
+    Parameters
+    ----------
+    interval : float, default 2
+        Default poll interval in seconds.
+    max_sources : int, default 4
+        Sources followed at the same time.
+    """
+
+    def __init__(self, interval: float = 2.0, max_sources: int = 4):
+        self.interval = float(interval)
+        self.max_sources = max(1, int(max_sources))
+        self._sources: dict[str, LiveSource] = {}
+        self._lock = threading.Lock()
+
+    def open(self, path: str, *, time_col: str = "Time", interval: float | None = None) -> LiveSource:
+        """Follow *path*: read what is there now, then poll in the background.
+
+        A path that is already followed returns its source.
+        """
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} does not exist")
+        with self._lock:
+            for source in self._sources.values():
+                if source.path == path and source.time_col == time_col:
+                    return source
+            if len(self._sources) >= self.max_sources:
+                raise ValueError(f"Already following {self.max_sources} live sources; stop one first")
+            source = LiveSource(path, time_col=time_col, interval=interval or self.interval)
+            self._sources[source.id] = source
+        source.poll()
+        log.info("Following %s (%s) as live source %s: %d read(s)", path, source.kind, source.id[:12], source.reads)
+        return source.start()
+
+    def get(self, live_id: str) -> LiveSource | None:
+        with self._lock:
+            return self._sources.get(live_id)
+
+    def resolve(self, dataset_id: str) -> LiveSource | None:
+        """The source behind a ``live:<id>`` dataset id (``None`` for other ids)."""
+        if not dataset_id or not dataset_id.startswith(LIVE_PREFIX):
+            return None
+        return self.get(dataset_id[len(LIVE_PREFIX):])
+
+    def close(self, live_id: str) -> LiveSource | None:
+        with self._lock:
+            source = self._sources.pop(live_id, None)
+        if source is not None:
+            source.stop()
+        return source
+
+    def sources(self) -> list[LiveSource]:
+        with self._lock:
+            return list(self._sources.values())
+
+    def stats(self) -> dict[str, Any]:
+        sources = self.sources()
+        return {
+            "sources": len(sources),
+            "maxSources": self.max_sources,
+            "reads": sum(s.reads for s in sources),
+        }
+
+    def shutdown(self) -> None:
+        for source in self.sources():
+            self.close(source.id)
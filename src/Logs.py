@@ -0,0 +1,207 @@
+"""Non-blocking logging for the backend: ring buffer, rate limit, optional file.
+
+The backend used to ``print`` on every request into pipes that nobody read;
+once a pipe buffer filled, the next ``print`` blocked the request.  Log calls
+now only format the record and put it on a bounded in-memory queue
+(:class:`DroppingQueueHandler` — a full queue drops the record instead of
+waiting); a background :class:`logging.handlers.QueueListener` hands the
+records to the actual handlers:
+
+* :class:`RingBufferHandler` keeps the last *capacity* records for ``/logs``;
+* an optional :class:`logging.handlers.RotatingFileHandler`;
+* an optional console stream (stderr).
+
+:class:`RateLimitFilter` throttles repeats of the same message (same logger,
+level and format string) with a token bucket; the next record that passes
+reports how many were suppressed.
+"""
+from __future__ import annotations
+
+import collections
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from typing import Any
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+# ───────────────────────────── handlers ──────────────────────────────
+
+class RingBufferHandler(logging.Handler):
+    """Keep the last *capacity* records as dicts, numbered for incremental reads."""
+
+    def __init__(self, capacity: int = 2000):
+        super().__init__()
+        self._records: collections.deque[dict[str, Any]] = collections.deque(maxlen=max(1, int(capacity)))
+        self._seq = 0
+        self._buffer_lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # records from the queue are already formatted (message incl. traceback)
+        try:
+            entry = {
+                "time": record.created,
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+            }
+        except Exception:
+            self.handleError(record)
+            return
+        with self._buffer_lock:
+            self._seq += 1
+            entry["seq"] = self._seq
+            self._records.append(entry)
+
+    def records(self, since: int = 0, level: int = logging.NOTSET, limit: int | None = None) -> list[dict[str, Any]]:
+        """Records newer than sequence number *since* at or above *level*, oldest first."""
+        with self._buffer_lock:
+            entries = [e for e in self._records if e["seq"] > since]
+        if level:
+            entries = [e for e in entries if logging.getLevelName(e["level"]) >= level]
+        return entries[-limit:] if limit else entries
+
+    @property
+    def capacity(self) -> int:
+        """Number of records kept before the oldest are dropped."""
+        return self._records.maxlen
+
+    @property
+    def last_seq(self) -> int:
+        with self._buffer_lock:
+            return self._seq
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """:class:`~logging.handlers.QueueHandler` that never blocks: a full queue drops the record."""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per ``(logger, level, format string)``.
+
+    Parameters
+    ----------
+    rate : float
+        Sustained records per second let through per message (``0`` = unlimited).
+    burst : int
+        Records let through back to back before throttling starts.
+    """
+
+    def __init__(self, rate: float = 5.0, burst: int = 20):
+        super().__init__()
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.suppressed = 0
+        self._buckets: dict[tuple, list] = {}  # key -> [tokens, last refill, suppressed]
+        self._bucket_lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._bucket_lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) > 10000:  # unbounded message variety (e.g. f-strings)
+                    self._buckets.clear()
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                self.suppressed += 1
+                return False
+            bucket[0] -= 1
+            skipped, bucket[2] = bucket[2], 0
+        if skipped:
+            record.msg = f"{record.msg} [{skipped} similar message(s) suppressed]"
+        return True
+
+# ───────────────────────────── set-up ────────────────────────────────
+
+class LogSystem:
+    """The installed handlers, kept for ``/logs`` and shutdown."""
+
+    def __init__(self, ring: RingBufferHandler, queue_handler: DroppingQueueHandler,
+                 rate_limit: RateLimitFilter, listener: logging.handlers.QueueListener,
+                 file_path: str | None):
+        self.ring = ring
+        self.queue_handler = queue_handler
+        self.rate_limit = rate_limit
+        self.listener = listener
+        self.file_path = file_path
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "capacity": self.ring.capacity,
+            "lastSeq": self.ring.last_seq,
+            "dropped": self.queue_handler.dropped,
+            "suppressed": self.rate_limit.suppressed,
+            "file": self.file_path,
+        }
+
+    def stop(self) -> None:
+        """Flush the queue and detach the handlers."""
+        self.listener.stop()
+        logging.getLogger().removeHandler(self.queue_handler)
+
+
+def setup_logging(
+    level: str | int = "INFO",
+    capacity: int = 2000,
+    *,
+    file_path: str | None = None,
+    file_max_bytes: int = 10 * 1024 * 1024,
+    file_backups: int = 3,
+    console: bool = True,
+    rate: float = 5.0,
+    burst: int = 20,
+    queue_size: int = 10000,
+) -> LogSystem:
+    """Route all logging through a bounded queue to the ring buffer (and file/console).
+
+    Replaces any handlers on the root logger, so library loggers (werkzeug,
+    matplotlib, ...) and captured warnings end up in the same place.
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+    ring = RingBufferHandler(capacity)
+    handlers: list[logging.Handler] = [ring]
+    if file_path:
+        file_handler = logging.handlers.RotatingFileHandler(
+            file_path, maxBytes=file_max_bytes, backupCount=file_backups, encoding="utf-8", delay=True
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    if console:
+        stream = logging.StreamHandler(sys.stderr)
+        stream.setFormatter(formatter)
+        handlers.append(stream)
+
+    q: queue.Queue = queue.Queue(maxsize=max(1, int(queue_size)))
+    queue_handler = DroppingQueueHandler(q)
+    rate_limit = RateLimitFilter(rate, burst)
+    queue_handler.addFilter(rate_limit)
+    listener = logging.handlers.QueueListener(q, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level if isinstance(level, int) else level.upper())
+    logging.captureWarnings(True)
+    listener.start()
+    return LogSystem(ring, queue_handler, rate_limit, listener, file_path)
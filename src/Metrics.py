@@ -0,0 +1,221 @@
+"""Per-request stage timing and Prometheus-style metrics.
+
+Each request gets a :class:`StageTimer` (held in a context variable, so code
+deep in the call stack records into it without passing it around).  Code
+marks the interesting parts with :func:`stage`::
+
+    with stage("parse"):
+        df = read_plate_excel(data)
+
+The timer's stages become the ``Server-Timing`` header of the response and
+are aggregated into histograms.  Work done in a render worker runs under its
+own timer there; the worker returns :meth:`StageTimer.stages` with its result
+and the caller merges them with :func:`record`.
+
+:class:`MetricsRegistry` keeps counters and histograms and renders them in
+the Prometheus text exposition format; collector callbacks add gauges that
+are read at scrape time (cache occupancy, hit counters, ...).
+"""
+from __future__ import annotations
+
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+
+# latency buckets in seconds, payload buckets in bytes
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = tuple(float(4 ** k * 256) for k in range(10))  # 256 B … 64 MiB
+
+_current: contextvars.ContextVar["StageTimer | None"] = contextvars.ContextVar("protrace_stage_timer", default=None)
+
+# ───────────────────────────── stage timing ──────────────────────────
+
+class StageTimer:
+    """Ordered ``(stage, seconds)`` records of one request or render job."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._stages: list[tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._stages.append((name, float(seconds)))
+
+    def extend(self, stages: Iterable[tuple[str, float]]) -> None:
+        with self._lock:
+            self._stages.extend((str(n), float(s)) for n, s in stages)
+
+    def stages(self) -> list[tuple[str, float]]:
+        with self._lock:
+            return list(self._stages)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` header value (milliseconds); repeated stages are summed."""
+        totals: dict[str, float] = {}
+        for name, seconds in self.stages():
+            totals[name] = totals.get(name, 0.0) + seconds
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items()]
+        parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def current_timer() -> StageTimer | None:
+    return _current.get()
+
+
+@contextmanager
+def timing() -> Iterator[StageTimer]:
+    """Run the block under a fresh :class:`StageTimer` and yield it."""
+    timer = StageTimer()
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+
+
+def activate(timer: StageTimer | None) -> contextvars.Token:
+    """Make *timer* current until :func:`deactivate` is called with the returned token."""
+    return _current.set(timer)
+
+
+def deactivate(token: contextvars.Token) -> None:
+    _current.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the block as *name* on the current timer (no-op without one)."""
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - start)
+
+
+def record(stages: Iterable[tuple[str, float]]) -> None:
+    """Merge stages measured elsewhere (e.g. in a render worker) into the current timer."""
+    timer = _current.get()
+    if timer is not None:
+        timer.extend(stages)
+
+# ───────────────────────────── the registry ──────────────────────────
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in sorted(labels.items())
+    )
+    return "{" + body + "}"
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float]):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, value: float, labels: dict[str, str]) -> None:
+        key = tuple(sorted(labels.items()))
+        counts = self.series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[0][i] += 1
+        counts[1] += value
+        counts[2] += 1
+
+    def expose(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (buckets, total, count) in sorted(self.series.items()):
+            labels = dict(key)
+            for bound, n in zip(self.buckets, buckets):
+                lines.append(f"{self.name}_bucket{_labels({**labels, 'le': _number(bound)})} {n}")
+            lines.append(f"{self.name}_bucket{_labels({**labels, 'le': '+Inf'})} {count}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(labels)} {count}")
+        return lines
+
+
+class _Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.series: dict[tuple, float] = {}
+
+    def inc(self, amount: float, labels: dict[str, str]) -> None:
+        key = tuple(sorted(labels.items()))
+        self.series[key] = self.series.get(key, 0.0) + amount
+
+    def expose(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.series.items()):
+            lines.append(f"{self.name}{_labels(dict(key))} {_number(value)}")
+        return lines
+
+
+# (name, type, help, labels, value) tuples reported by collectors
+MetricSample = tuple[str, str, str, dict, float]
+
+
+class MetricsRegistry:
+    """Thread-safe counters, histograms and scrape-time collectors."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Histogram | _Counter] = {}
+        self._collectors: list[Callable[[], Iterable[MetricSample]]] = []
+
+    def histogram(self, name: str, help_text: str, buckets: Iterable[float] = DURATION_BUCKETS) -> None:
+        with self._lock:
+            self._metrics.setdefault(name, _Histogram(name, help_text, buckets))
+
+    def counter(self, name: str, help_text: str) -> None:
+        with self._lock:
+            self._metrics.setdefault(name, _Counter(name, help_text))
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            self._metrics[name].observe(float(value), labels)
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        with self._lock:
+            self._metrics[name].inc(float(amount), labels)
+
+    def add_collector(self, collector: Callable[[], Iterable[MetricSample]]) -> None:
+        """Register a callback returning ``(name, type, help, labels, value)`` samples at scrape time."""
+        self._collectors.append(collector)
+
+    def expose(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            lines = [line for metric in self._metrics.values() for line in metric.expose()]
+
+        grouped: dict[str, list[MetricSample]] = {}
+        for collector in self._collectors:
+            for sample in collector():
+                grouped.setdefault(sample[0], []).append(sample)
+        for name, samples in grouped.items():
+            lines.append(f"# HELP {name} {samples[0][2]}")
+            lines.append(f"# TYPE {name} {samples[0][1]}")
+            lines.extend(f"{name}{_labels(labels)} {_number(value)}" for _, _, _, labels, value in samples)
+        return "\n".join(lines) + "\n"
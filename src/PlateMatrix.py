@@ -0,0 +1,314 @@
+"""Array-backed plate data shared by all samples of a dataset.
+
+A :class:`PlateMatrix` stores every read of every well in one contiguous
+``float64`` (or ``float32``) array of shape ``(reads, wells)`` together with a
+precomputed well-ID → column index.  Samples resolve their wells to integer
+column indices once, so standardising a whole layout is a single gather plus
+one broadcast subtraction instead of label-based DataFrame slicing per sample.
+
+A matrix can also grow while a run is still acquiring: :meth:`PlateMatrix.append`
+adds reads in amortised O(new reads) — the array keeps spare capacity and the
+time axis is extended from the last known read instead of being recomputed.
+Appending is not thread-safe; readers on other threads work on a
+:meth:`PlateMatrix.snapshot`, which later appends leave untouched.
+
+Plates of different workbooks (replicate plates, runs of different days) are
+compared on one time grid: :meth:`PlateMatrix.resample` interpolates every
+well at once and :func:`align_plates` picks the grid shared by several plates.
+"""
+from __future__ import annotations
+
+import datetime as dt
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from TimeAxis import to_rel_minutes
+
+
+class PlateMatrix:
+    """Reads × wells matrix with the matching time column.
+
+    Parameters
+    ----------
+    values : array-like, shape (reads, wells)
+        Absorbance reads; stored as a C-contiguous array of *dtype*.
+    wells : iterable of str
+        Well IDs labelling the columns of *values*.
+    time : pandas.Series, optional
+        Time stamps of the reads (one per row).  ``None`` if the source had
+        no time column.
+    time_col : str, default ``"Time"``
+        Name of the time column in the source data.
+    dtype : numpy dtype, default ``float64``
+        Floating-point type of the stored reads (``float32`` halves memory).
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        wells: Iterable[str],
+        time: pd.Series | None = None,
+        *,
+        time_col: str = "Time",
+        dtype: np.dtype = np.float64,
+    ):
+        self.values = np.ascontiguousarray(values, dtype=dtype)
+        self._buffer = self.values  # grows with spare rows on append()
+        self.wells = list(wells)
+        if self.values.ndim != 2 or self.values.shape[1] != len(self.wells):
+            raise ValueError(
+                f"values of shape {self.values.shape} do not match {len(self.wells)} wells"
+            )
+        self.index = {well: col for col, well in enumerate(self.wells)}
+        if time is not None:
+            time = pd.Series(time).reset_index(drop=True)
+            if len(time) != self.values.shape[0]:
+                raise ValueError("time column and values have a different number of reads")
+        self._time = time
+        self._time_tail: list = []  # appended time stamps not yet in ``_time``
+        self.time_col = time_col
+        self._time_axis = None
+
+    def __getstate__(self) -> dict:
+        # ship the filled rows only, not the spare capacity
+        self._merge_time()
+        state = self.__dict__.copy()
+        del state["_buffer"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._buffer = self.values
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, time_col: str = "Time") -> "PlateMatrix":
+        """Build a matrix from a plate DataFrame (time column plus one column per well).
+
+        Every numeric column other than *time_col* becomes a well column.
+        """
+        if df is None:
+            raise ValueError("df cannot be empty!")
+        cols = [
+            c for c in df.columns
+            if c != time_col and pd.api.types.is_numeric_dtype(df[c].dtype)
+        ]
+        time = df[time_col] if time_col in df.columns else None
+        return cls(df[cols].to_numpy(dtype=float), [str(c) for c in cols], time, time_col=time_col)
+
+    # ― growth ―───────────────────────────────────────────────────────
+    def append(self, values: np.ndarray, time: Iterable | None = None) -> None:
+        """Add reads at the end of the matrix.
+
+        Parameters
+        ----------
+        values : array-like, shape (reads, wells)
+            New reads, in the column order of :attr:`wells`.
+        time : iterable, optional
+            Their time stamps; required exactly when the matrix has a time column.
+        """
+        new = np.asarray(values, dtype=float)
+        if new.ndim != 2 or new.shape[1] != len(self.wells):
+            raise ValueError(f"values of shape {new.shape} do not match {len(self.wells)} wells")
+        if (time is None) != (self._time is None):
+            raise ValueError("time stamps must be given exactly when the plate has a time column")
+        stamps = list(time) if time is not None else []
+        if time is not None and len(stamps) != len(new):
+            raise ValueError("time column and values have a different number of reads")
+        k = len(new)
+        if not k:
+            return
+
+        n = self.n_reads
+        if n + k > len(self._buffer):
+            grown = np.empty((max(2 * len(self._buffer), n + k, 16), len(self.wells)), dtype=self.values.dtype)
+            grown[:n] = self.values
+            self._buffer = grown
+        self._buffer[n:n + k] = new
+
+        if self._time_axis is not None:
+            self._time_axis = self._extend_axis(stamps, k)
+        if stamps:
+            self._time_tail.extend(stamps)
+        self.values = self._buffer[:n + k]
+
+    def _extend_axis(self, stamps: list, k: int) -> tuple[np.ndarray, float, dt.time]:
+        """Time axis after appending *k* reads, converting only the new stamps."""
+        rel, _, t0 = self._time_axis
+        if not stamps:
+            added = rel[-1] + np.arange(1, k + 1, dtype=np.float64)
+        else:
+            # convert from the last known read so day wrap-around carries over
+            last = self._time_tail[-1] if self._time_tail else self._time.iloc[-1]
+            step = to_rel_minutes(pd.Series([last, *stamps]))[0]
+            added = rel[-1] + step[1:]
+        rel = np.concatenate([rel, added])
+        rel.flags.writeable = False
+        return rel, float(rel[-1] - rel[0]), t0
+
+    def snapshot(self) -> "PlateMatrix":
+        """The current reads as a matrix of their own; later appends do not change it.
+
+        Shares the arrays (no copy), so taking one costs O(1).
+        """
+        copy = object.__new__(PlateMatrix)
+        copy.__dict__.update(self.__dict__)
+        copy._buffer = self.values
+        copy._time_tail = list(self._time_tail)
+        return copy
+
+    def with_values(self, values: np.ndarray) -> "PlateMatrix":
+        """A matrix of the same wells holding *values* as its first ``len(values)`` reads.
+
+        For plates derived from this one (see ``Preprocessing``): the time
+        column and time axis are sliced, not recomputed, and the dtype of
+        *values* is kept.
+        """
+        values = np.asarray(values)
+        k = len(values)
+        if k > self.n_reads:
+            raise ValueError(f"values have {k} reads but the plate has {self.n_reads}")
+        time = self.time[:k] if self.time is not None else None
+        derived = PlateMatrix(values, self.wells, time, time_col=self.time_col, dtype=values.dtype)
+        if self._time_axis is not None and k:
+            rel, _, t0 = self._time_axis
+            derived._time_axis = (rel[:k], float(rel[k - 1] - rel[0]), t0)
+        return derived
+
+    def resample(self, grid: np.ndarray) -> "PlateMatrix":
+        """The plate linearly interpolated onto *grid* (relative minutes, increasing).
+
+        All wells are interpolated together: the read bracketing every grid
+        point is found once and the whole matrix is blended in one gather.
+        Grid points outside the plate's time axis are NaN.  The result has no
+        time column; its time axis is *grid* from the same start time.
+        """
+        rel, _, t0 = self.time_axis
+        grid = np.asarray(grid, dtype=np.float64)
+        if self.n_reads < 2:
+            raise ValueError("at least two reads are needed to resample a plate")
+        left = np.clip(np.searchsorted(rel, grid, side="right") - 1, 0, self.n_reads - 2)
+        span = rel[left + 1] - rel[left]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(span > 0, (grid - rel[left]) / span, 0.0)[:, None]
+        lo, hi = self.values[left], self.values[left + 1]
+        # exact reads are copied, not blended (a NaN neighbour would spread)
+        values = np.where(weight == 0, lo, lo + weight * (hi - lo))
+        values[(grid < rel[0]) | (grid > rel[-1])] = np.nan
+
+        resampled = PlateMatrix(values, self.wells, time_col=self.time_col, dtype=self.values.dtype)
+        axis = grid.copy()
+        axis.flags.writeable = False
+        resampled._time_axis = (axis, float(grid[-1] - grid[0]) if len(grid) else 0.0, t0)
+        return resampled
+
+    def _merge_time(self) -> None:
+        if self._time_tail:
+            tail = pd.Series(self._time_tail)
+            self._time = pd.concat([self._time, tail], ignore_index=True) if len(self._time) else tail
+            self._time_tail = []
+
+    # ― shape helpers ―────────────────────────────────────────────────
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.values.shape
+
+    @property
+    def n_reads(self) -> int:
+        return self.values.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory footprint (used by the dataset cache)."""
+        extra = int(self.time.memory_usage(deep=True)) if self.time is not None else 0
+        return int(self.values.nbytes) + extra
+
+    def __len__(self) -> int:
+        return self.n_reads
+
+    def __contains__(self, well: str) -> bool:
+        return well in self.index
+
+    # ― time axis ―──────────────────────────────────────────────────
+    @property
+    def time(self) -> pd.Series | None:
+        """Time stamps of the reads, ``None`` without a time column."""
+        self._merge_time()
+        return self._time
+
+    @property
+    def time_axis(self) -> tuple[np.ndarray, float, dt.time]:
+        """``(relative minutes, duration, start time)`` shared by all samples.
+
+        Computed on first access and kept on the matrix, so it is resolved
+        once per dataset (and travels with the matrix to render workers).
+        Without a time column the read index is used as the axis.
+        """
+        if self._time_axis is None:
+            if self.time is None:
+                rel = np.arange(self.n_reads, dtype=np.float64)
+                rel.flags.writeable = False
+                self._time_axis = (rel, float(rel[-1] - rel[0]) if len(rel) else 0.0, dt.time(0, 0))
+            else:
+                self._time_axis = to_rel_minutes(self.time)
+        return self._time_axis
+
+    # ― column access ―────────────────────────────────────────────────
+    def column_index(self, well: str) -> int:
+        try:
+            return self.index[well]
+        except KeyError:
+            raise KeyError(f"Well {well!r} not found in plate data") from None
+
+    def columns(self, wells: Iterable[str]) -> np.ndarray:
+        """Integer column indices for *wells* (in the given order)."""
+        return np.fromiter((self.column_index(w) for w in wells), dtype=np.intp)
+
+    def column(self, well: str) -> np.ndarray:
+        """Read-only view of a single well's reads."""
+        view = self.values[:, self.column_index(well)]
+        view.flags.writeable = False
+        return view
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the plate as a DataFrame in the layout ``pre_process_df`` produces."""
+        df = pd.DataFrame(self.values, columns=self.wells)
+        if self.time is not None:
+            df.insert(0, self.time_col, self.time)
+        return df
+
+# ───────────────────────── plate alignment ───────────────────────────
+
+ALIGN_SPANS = ("shortest", "longest")
+
+
+def align_plates(plates: dict, *, step: float | None = None, span: str = "shortest") -> dict:
+    """Resample every plate of *plates* onto one common grid of relative minutes.
+
+    Parameters
+    ----------
+    plates : dict
+        Plates by any key (e.g. dataset id); the result has the same keys.
+    step : float, optional
+        Grid spacing in minutes; defaults to the largest median read interval
+        of the plates, so no plate is sampled finer than it was read.
+    span : {"shortest", "longest"}, default ``"shortest"``
+        End the grid with the shortest run (every plate covers all of it) or
+        the longest (shorter runs end in NaN).
+    """
+    if span not in ALIGN_SPANS:
+        raise ValueError(f"span must be one of {', '.join(ALIGN_SPANS)}")
+    if step is not None and (isinstance(step, bool) or not isinstance(step, (int, float)) or not step > 0):
+        raise ValueError("step must be a positive number of minutes")
+    axes = [plate.time_axis[0] for plate in plates.values()]
+    if not axes or min(len(rel) for rel in axes) < 2:
+        raise ValueError("every plate needs at least two reads to be aligned")
+    if step is None:
+        step = max(float(np.median(np.diff(rel))) for rel in axes)
+        if not step > 0:
+            raise ValueError("the plates have no increasing time axis to align on")
+    end = (min if span == "shortest" else max)(float(rel[-1]) for rel in axes)
+    # the end point is included when it falls on the grid (up to rounding)
+    grid = np.arange(int(np.floor(end / step + 1e-9)) + 1, dtype=np.float64) * step
+    return {key: plate.resample(grid) for key, plate in plates.items()}
@@ -1,9 +1,311 @@
+"""Preprocessing of plate-reader data, run once per dataset over the whole plate.
+
+:func:`pre_process_df` trims a parsed workbook to its reads.  Without an
+explicit read count it keeps every read up to the last one with a value in
+any well: trailing empty rows of a stopped run are dropped, while a well
+without a value in a read (e.g. a saturated one) stays NaN there.
+
+:func:`run_pipeline` applies a declarative *pipeline* to a
+:class:`PlateMatrix`.  Each step is one array pass over the
+``(reads, wells)`` matrix, never a per-well loop, and steps run in this
+order, each only when present:
+
+* ``reads`` – keep the first *n* reads (``"auto"``: all of them);
+* ``dtype`` – ``"float32"`` halves the memory of the plate and the bytes
+  shipped to render workers;
+* ``blank`` – wells whose per-read mean is subtracted from every well
+  (plate-wide blank);
+* ``outliers`` – ``{"threshold": 3.5, "window": 7}``: reads further than
+  *threshold* robust SDs (1.4826 × MAD of the well's residuals) from the
+  median of their neighbours within *window* reads are masked as NaN;
+* ``smooth`` – ``{"method": "savgol", "window": 7, "order": 2}``
+  (Savitzky–Golay) or ``{"method": "moving", "window": 5}`` (centred moving
+  average).  Masked reads do not enter the smoothed values.
+
+A pipeline is plain JSON so it can ride along with a request;
+:func:`normalize_pipeline` validates it into a canonical form and
+:func:`pipeline_key` keys its result per dataset, so every sample and every
+re-render of the same dataset reuses one preprocessed plate.
+"""
+import hashlib
+import json
+import warnings
+
 import pandas as pd
 import numpy as np
 
-def pre_process_df(df : pd.DataFrame, reads_num : int) -> pd.DataFrame :
-    if reads_num < 2:
+DTYPES = ("float64", "float32")
+SMOOTH_METHODS = ("savgol", "moving")
+SMOOTH_DEFAULTS = {"savgol": {"window": 7, "order": 2}, "moving": {"window": 5}}
+OUTLIER_DEFAULTS = {"threshold": 3.5, "window": 7}
+MAD_TO_SD = 1.4826  # MAD of a normal distribution times this is its SD
+MEDIAN_CHUNK_ELEMENTS = 1 << 21  # window values sorted at once by rolling_median (16 MB of float64)
+
+# ───────────────────────── helper utilities ──────────────────────────
+
+def detect_reads(values : np.ndarray) -> int:
+    """Number of leading reads up to the last one with a value in any well.
+
+    Wells missing from a read (saturated, or not yet read when a run was
+    stopped) do not end the plate; they stay NaN in the reads kept.
+    """
+    finite = np.isfinite(np.asarray(values, dtype=float))
+    if finite.ndim != 2 or not finite.size:
+        return len(finite)
+    read = finite.any(axis=1)
+    return int(np.flatnonzero(read)[-1]) + 1 if read.any() else 0
+
+
+def moving_average(y: np.ndarray, window: int) -> np.ndarray:
+    """Centred moving average of every column of *y* over *window* reads.
+
+    NaN reads are left out of the averages; near the ends the window shrinks
+    to the reads available.
+    """
+    y = np.asarray(y, dtype=float)
+    if window <= 1 or y.shape[0] < 2:
+        return y.copy()
+    finite = np.isfinite(y)
+    pad = [(1, 0)] + [(0, 0)] * (y.ndim - 1)
+    sums = np.pad(np.cumsum(np.where(finite, y, 0.0), axis=0), pad)
+    counts = np.pad(np.cumsum(finite, axis=0), pad)
+
+    n = y.shape[0]
+    half = window // 2
+    lo = np.clip(np.arange(n) - half, 0, n)
+    hi = np.clip(np.arange(n) + window - half, 0, n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (sums[hi] - sums[lo]) / (counts[hi] - counts[lo])
+
+
+def _nanmedian(a : np.ndarray, axis : int) -> np.ndarray:
+    """Median along *axis* ignoring NaN (NaN where all are NaN).
+
+    ``numpy.nanmedian`` falls back to a Python loop over the other axes once
+    there is a NaN; sorting puts NaN last, so the median is a gather instead.
+    """
+    ordered = np.sort(a, axis=axis)
+    k = np.sum(~np.isnan(a), axis=axis, keepdims=True)
+    lo = np.take_along_axis(ordered, np.maximum((k - 1) // 2, 0), axis=axis)
+    hi = np.take_along_axis(ordered, k // 2, axis=axis)
+    return np.squeeze((lo + hi) / 2, axis=axis)
+
+
+def rolling_median(y : np.ndarray, window : int, exclude_centre : bool = False) -> np.ndarray:
+    """Centred rolling median of every column of *y* over *window* reads (NaN-aware).
+
+    With *exclude_centre* each read is left out of its own window, so on a
+    monotonic stretch the median does not simply return the read itself.
+    The windows of a block of columns are sorted at a time, so the temporary
+    copies stay near ``MEDIAN_CHUNK_ELEMENTS`` values whatever the plate size.
+    """
+    y = np.asarray(y, dtype=float)
+    columns = y.reshape(len(y), -1)
+    half = window // 2
+    out = np.empty_like(columns)
+    step = max(1, MEDIAN_CHUNK_ELEMENTS // max(1, len(y) * window))
+    for start in range(0, columns.shape[1], step):
+        padded = np.pad(columns[:, start:start + step], [(half, window - 1 - half), (0, 0)],
+                        constant_values=np.nan)
+        windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=0)
+        if exclude_centre:
+            windows = np.delete(windows, half, axis=-1)
+        out[:, start:start + step] = _nanmedian(windows, axis=-1)
+    return out.reshape(y.shape)
+
+
+def mad_outliers(y : np.ndarray, threshold : float = 3.5, window : int = 7) -> np.ndarray:
+    """Boolean mask of the reads of *y* that are outliers of their column.
+
+    The residual of every read is its distance from the median of the
+    other reads in its *window*; a read is an outlier when its residual is more than *threshold* robust SDs
+    (1.4826 × median absolute deviation of the column's residuals) from the
+    column's median residual.  Columns without spread have no outliers.
+    """
+    y = np.asarray(y, dtype=float)
+    residual = y - rolling_median(y, window, exclude_centre=True)
+    centre = _nanmedian(residual, axis=0)
+    deviation = np.abs(residual - centre)
+    spread = MAD_TO_SD * _nanmedian(deviation, axis=0)
+    with np.errstate(invalid="ignore"):
+        return (deviation > threshold * spread) & (spread > 0)
+
+
+def savgol_filter(y : np.ndarray, window : int = 7, order : int = 2) -> np.ndarray:
+    """Savitzky–Golay smoothing of every column of *y*.
+
+    Least-squares polynomials of degree *order* over *window* reads (odd);
+    the first and last ``window // 2`` reads are evaluated on the polynomial
+    fitted to the first / last window.  NaN reads are filled with the local
+    moving average before filtering (columns without any value stay NaN).
+    """
+    y = np.asarray(y, dtype=float)
+    n = y.shape[0]
+    window = min(window, n if n % 2 else n - 1)
+    if window <= order:
+        return y.copy()
+    missing = np.isnan(y)
+    if missing.any():
+        y = np.where(missing, moving_average(y, window), y)
+
+    half = window // 2
+    offsets = np.arange(-half, half + 1, dtype=float)
+    design = np.vander(offsets, order + 1, increasing=True)  # (window, order + 1)
+    fit = np.linalg.pinv(design)                              # polynomial coefficients per window
+    out = np.empty_like(y)
+    windows = np.lib.stride_tricks.sliding_window_view(y, window, axis=0)
+    out[half:n - half] = windows @ fit[0]
+    out[:half] = design[:half] @ np.tensordot(fit, y[:window], axes=1)
+    out[n - half:] = design[half + 1:] @ np.tensordot(fit, y[n - window:], axes=1)
+    return out
+
+# ─────────────────────────── pipeline API ────────────────────────────
+
+def _positive_int(value, name : str, minimum : int = 1) -> int:
+    if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+        raise ValueError(f"{name} must be an integer of at least {minimum}")
+    return value
+
+
+def _step_options(value, name : str, defaults : dict) -> dict:
+    """Options of a step given as ``true`` (defaults) or an object."""
+    if value is True:
+        return dict(defaults)
+    if not isinstance(value, dict):
+        raise ValueError(f"preprocessing.{name} must be true or an object")
+    unknown = set(value) - set(defaults) - {"method"}
+    if unknown:
+        raise ValueError(f"Unknown preprocessing.{name} option(s) {', '.join(sorted(unknown))}")
+    return {**defaults, **{k: v for k, v in value.items() if k != "method"}}
+
+
+def normalize_pipeline(spec) -> dict:
+    """Validate a pipeline and return its canonical form.
+
+    Steps that change nothing (``reads: "auto"``, ``dtype: "float64"``,
+    ``false``/``null``) are left out, so equivalent pipelines get the same
+    :func:`pipeline_key`; an empty result means the plate is used as loaded.
+
+    Raises
+    ------
+    ValueError
+        For an unknown step or option, or an invalid value.
+    """
+    if spec is None:
+        return {}
+    if not isinstance(spec, dict):
+        raise ValueError("preprocessing must be an object")
+    unknown = set(spec) - {"reads", "dtype", "blank", "outliers", "smooth"}
+    if unknown:
+        raise ValueError(f"Unknown preprocessing step(s) {', '.join(sorted(unknown))}")
+    pipeline = {}
+
+    reads = spec.get("reads", "auto")
+    if reads not in ("auto", None):
+        pipeline["reads"] = _positive_int(reads, "preprocessing.reads", 2)
+
+    dtype = spec.get("dtype") or "float64"
+    if dtype not in DTYPES:
+        raise ValueError(f"preprocessing.dtype must be one of {', '.join(DTYPES)}")
+    if dtype != "float64":
+        pipeline["dtype"] = dtype
+
+    blank = spec.get("blank")
+    if blank:
+        if isinstance(blank, str):
+            blank = [blank]
+        if not isinstance(blank, list) or not all(isinstance(w, str) and w for w in blank):
+            raise ValueError("preprocessing.blank must be a well ID or a list of well IDs")
+        pipeline["blank"] = sorted(set(blank))
+
+    outliers = spec.get("outliers")
+    if outliers:
+        options = _step_options(outliers, "outliers", OUTLIER_DEFAULTS)
+        threshold = options["threshold"]
+        if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or not threshold > 0:
+            raise ValueError("preprocessing.outliers.threshold must be a positive number")
+        pipeline["outliers"] = {
+            "threshold": float(threshold),
+            "window": _positive_int(options["window"], "preprocessing.outliers.window", 3),
+        }
+
+    smooth = spec.get("smooth")
+    if smooth:
+        method = smooth.get("method", "savgol") if isinstance(smooth, dict) else "savgol"
+        if method not in SMOOTH_METHODS:
+            raise ValueError(f"preprocessing.smooth.method must be one of {', '.join(SMOOTH_METHODS)}")
+        options = _step_options(smooth, "smooth", SMOOTH_DEFAULTS[method])
+        window = _positive_int(options["window"], "preprocessing.smooth.window")
+        if method == "savgol":
+            order = _positive_int(options["order"], "preprocessing.smooth.order", 0)
+            if window % 2 == 0 or window <= order:
+                raise ValueError("preprocessing.smooth.window must be odd and larger than the order")
+            pipeline["smooth"] = {"method": method, "window": window, "order": order}
+        else:
+            pipeline["smooth"] = {"method": method, "window": window}
+    return pipeline
+
+
+def pipeline_key(dataset_key : str, pipeline : dict) -> str:
+    """Key of *dataset_key* preprocessed by the canonical *pipeline*."""
+    if not pipeline:
+        return dataset_key
+    canonical = json.dumps(pipeline, sort_keys=True, separators=(",", ":"))
+    return f"{dataset_key}+pp-{hashlib.sha256(canonical.encode('ascii')).hexdigest()[:16]}"
+
+
+def run_pipeline(plate, pipeline : dict):
+    """Return *plate* preprocessed by the canonical *pipeline*.
+
+    The result is a new :class:`PlateMatrix` sharing the time column and
+    time axis of *plate*; an empty pipeline returns *plate* itself.
+
+    Raises
+    ------
+    ValueError
+        When a blank well is not on the plate or fewer reads are left than
+        requested.
+    """
+    if not pipeline:
+        return plate
+    reads = pipeline.get("reads", plate.n_reads)
+    if reads > plate.n_reads:
+        raise ValueError(f"preprocessing.reads is {reads} but the plate has {plate.n_reads} reads")
+    values = plate.values[:reads].astype(pipeline.get("dtype", "float64"))
+
+    if "blank" in pipeline:
+        missing = [w for w in pipeline["blank"] if w not in plate]
+        if missing:
+            raise ValueError(f"Blank well(s) {', '.join(missing)} not found in plate data")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN reads
+            blank = np.nanmean(values[:, plate.columns(pipeline["blank"])], axis=1, keepdims=True)
+        values -= blank
+
+    if "outliers" in pipeline:
+        options = pipeline["outliers"]
+        values[mad_outliers(values, options["threshold"], options["window"])] = np.nan
+
+    if "smooth" in pipeline:
+        options = pipeline["smooth"]
+        if options["method"] == "savgol":
+            smoothed = savgol_filter(values, options["window"], options["order"])
+        else:
+            smoothed = moving_average(values, options["window"])
+        # masked and missing reads stay missing
+        values = np.where(np.isnan(values), np.nan, smoothed).astype(values.dtype)
+
+    return plate.with_values(values)
+
+
+def pre_process_df(df : pd.DataFrame, reads_num : int = None) -> pd.DataFrame :
+    if df is None:
+        raise ValueError("df cannot be empty!")
+    if reads_num is None:
+        wells = df.drop(columns=[c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c].dtype)])
+        reads_num = detect_reads(wells.to_numpy(dtype=float))
+        if reads_num < 2:
+            raise ValueError("the data must contain at least 2 reads!")
+    elif reads_num < 2:
         raise ValueError("reads_num must be greater or equal than 2!")
-    if df is None or reads_num is None:
-        raise ValueError("df or reads_num cannot be empty!")
-    return df.loc[0: reads_num - 1]
\ No newline at end of file
+    return df.loc[0: reads_num - 1]
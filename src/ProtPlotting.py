@@ -7,6 +7,32 @@ Revision history
 * **v1.3** – tightened spacing and reduced title sizes.
 * **v1.4** – new *y_label* parameter so callers can override the default
   y‑axis label (was fixed to ``A_{350}``).
+* **v1.5** – pyplot-free: figures are built on the object-oriented
+  ``Figure``/``FigureCanvasAgg`` API and *font* is applied per figure instead
+  of through the global ``rcParams``, so renders are reentrant and can run on
+  several threads; nothing is registered with pyplot, so a failed render
+  cannot leak a figure.
+* **v1.6** – the time axis is resolved once per dataset
+  (``PlateMatrix.time_axis``, vectorised in :mod:`TimeAxis`) instead of
+  being re-converted for every sample.
+* **v1.7** – replicates are batched into one artist per sample instead of
+  one ``Line2D`` per replicate, and legend entries are proxy artists rather
+  than empty plotted lines.
+* **v1.8** – optional shape-preserving *downsample* (LTTB or min/max, see
+  :mod:`Downsampling`) and *rasterize* for the data points of vector exports.
+* **v1.9** – :func:`update_cosmetics` changes title, subtitle, y label, font
+  and width of an existing figure, so cosmetic edits skip rebuilding the data
+  artists; the title texts carry gids (``TITLE_GID``, ``SUBTITLE_GID``).
+* **v2.0** – :func:`refresh_data` moves the points, ticks, dividers and
+  sample labels of an existing figure to data that has grown (live
+  acquisition) instead of building a new figure; data artists, dividers and
+  sample labels carry numbered gids (``protrace-data-<i>`` …).
+* **v2.1** – *summary* draws each sample as its mean line with a shaded
+  ± SD or ± SEM band (:func:`Sample.summarize_samples`, one pass per plate)
+  instead of every replicate point.
+* **v2.2** – the single-collection ``artists="figure"`` mode is gone: it
+  changed the drawing order of overlapping points and made SVG exports larger
+  and slower than one artist per sample.
 """
 
 import datetime as dt
@@ -14,40 +40,22 @@ from typing import Any, Iterable
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+import matplotlib as mpl
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.text import Text
+
+from Downsampling import (
+    METHODS as _DOWNSAMPLE_METHODS,
+    downsample as _downsample,
+    downsample_indices as _downsample_indices,
+)
+from Metrics import stage
+from Sample import stdized_diff_samples, summarize_samples
 
 # ───────────────────────── helper utilities ──────────────────────────
 
-def _series_to_rel_minutes(series: pd.Series) -> tuple[np.ndarray, float, dt.time]:
-    """Convert an absolute-time Series to minutes-since-start plus metadata."""
-    first = series.iloc[0]
-
-    # pandas / numpy datetime64
-    if isinstance(first, pd.Timestamp) or np.issubdtype(series.dtype, np.datetime64):
-        ts = pd.to_datetime(series)
-        rel = (ts - ts.iloc[0]).dt.total_seconds() / 60.0
-        return rel.to_numpy(), float(rel.iat[-1]), ts.iloc[0].time()
-
-    # native ``datetime.time``
-    if isinstance(first, dt.time):
-        secs = series.apply(lambda t: t.hour * 3600 + t.minute * 60 + t.second)
-        rel = (secs - secs.iloc[0]) / 60.0
-        return rel.to_numpy(), float(rel.iat[-1]), first
-
-    # strings "HH:MM[:SS]"
-    try:
-        ts = pd.to_datetime(series, format="%H:%M:%S", errors="raise")
-    except ValueError:
-        ts = pd.to_datetime(series, format="%H:%M", errors="coerce")
-    if ts.notna().all():
-        rel = (ts - ts.iloc[0]).dt.total_seconds() / 60.0
-        return rel.to_numpy(), float(rel.iat[-1]), ts.iloc[0].time()
-
-    # numeric fallback
-    rel = pd.to_numeric(series, errors="coerce") - pd.to_numeric(series.iloc[0])
-    return rel.to_numpy(), float(rel.iat[-1]), dt.time(0, 0)
-
-
 def _add_minutes(t: dt.time, minutes: float) -> dt.time:
     total = (t.hour * 60 + t.minute + minutes) % (24 * 60)
     h, m = divmod(int(round(total)), 60)
@@ -57,8 +65,151 @@ def _add_minutes(t: dt.time, minutes: float) -> dt.time:
 def _fmt(t: dt.time) -> str:
     return t.strftime("%H:%M")
 
+
+def _apply_font(fig: Figure, font: str | list[str] | None) -> None:
+    """Set the font family of every text artist of *fig* (per-figure ``font.family``).
+
+    Tick labels created later (e.g. on resize) copy their font from the first
+    tick of each axis, so the family survives re-layout.
+    """
+    if font is None:
+        return
+    for text in fig.findobj(Text):
+        text.set_fontfamily(font)
+
+
+def _find_text(fig: Figure, gid: str) -> Text | None:
+    return next((t for t in fig.texts if t.get_gid() == gid), None)
+
+
+def _show_text(text: Text, value: str | None) -> None:
+    """Set *text* to *value*; an empty value hides it and takes it out of the
+    layout, so it is treated as if it had never been added."""
+    text.set_text(value or "")
+    text.set_visible(bool(value))
+    text.set_in_layout(bool(value))
+
+
+def _set_title(fig: Figure, title: str | None) -> None:
+    text = _find_text(fig, TITLE_GID)
+    if title and text is None:
+        fig.suptitle(title, fontsize=18, fontweight="bold", y=0.86, gid=TITLE_GID)
+    elif text is not None:
+        _show_text(text, title)
+
+
+def _set_subtitle(fig: Figure, subtitle: str | None) -> None:
+    text = _find_text(fig, SUBTITLE_GID)
+    if subtitle and text is None:
+        fig.text(0.5, 0.8, subtitle, ha="center", va="top", fontweight="bold", fontsize=14,
+                 gid=SUBTITLE_GID)
+    elif text is not None:
+        _show_text(text, subtitle)
+
+
+def _title_height(fig: Figure) -> float | None:
+    """Height of the title as ``tight_layout`` reserves it (``None`` without one)."""
+    text = _find_text(fig, TITLE_GID)
+    if text is None or not text.get_in_layout():
+        return None
+    return text.get_window_extent(fig.canvas.get_renderer()).height
+
+
+def _layout(fig: Figure) -> None:
+    """Lay out from the default subplot parameters, so a re-layout of an
+    updated figure matches the layout of a freshly built one."""
+    with stage("layout"):
+        fig.subplots_adjust(left=mpl.rcParams["figure.subplot.left"],
+                            right=mpl.rcParams["figure.subplot.right"],
+                            bottom=0.20, top=0.88)
+        fig.tight_layout(rect=(0, 0, 1, 0.88))
+
+
+def _default_max_points(figsize: tuple[float, float], n_samples: int) -> int:
+    """About two points per pixel column of one sample's share of the x axis at 300 dpi."""
+    return max(16, 2 * int(np.ceil(figsize[0] * 300 / n_samples)))
+
+
+def _standardize(samples: list[Any], time_col: str, summary: str | None) -> list[np.ndarray]:
+    """Replicate columns of every sample, or ``(mean, lower, upper)`` columns with *summary*."""
+    with stage("standardize"):
+        if not summary:
+            return stdized_diff_samples(samples, time_col=time_col)
+        bands = []
+        for stats in summarize_samples(samples, time_col=time_col):
+            spread = stats.sd if summary == "sd" else stats.sem
+            bands.append(np.column_stack([stats.mean, stats.mean - spread, stats.mean + spread]))
+        return bands
+
+
+def _band(ax, x: np.ndarray, lower: np.ndarray, upper: np.ndarray, colour: Any, rasterize: bool, gid: str):
+    return ax.fill_between(x, lower, upper, color=colour, alpha=0.25, linewidth=0,
+                           rasterized=rasterize, gid=gid)
+
+
+def _data_layout(
+    samples: list[Any],
+    stdized: list[np.ndarray],
+    time_col: str,
+    downsample: str | None,
+    max_points: int | None,
+    summary: str | None = None,
+) -> tuple[list[tuple[np.ndarray, np.ndarray]], tuple[list, list, list, list, float]]:
+    """Place the samples side by side on the shared x axis.
+
+    Returns the ``(x, values)`` points of every sample (downsampled if asked)
+    and ``(tick positions, tick labels, sample centres, divider positions,
+    total span)``.  With *summary* the values are ``(mean, lower, upper)``
+    columns, downsampled at the reads chosen for the mean.
+    """
+    points = []
+    x_offset = 0.0
+    tick_pos, tick_lab, centre_pos, divider_pos = [], [], [], []
+    for idx, (sample, values) in enumerate(zip(samples, stdized)):
+        plate = sample.plate
+
+        # relative minutes axis (resolved once per plate and cached on it)
+        if plate.time_col == time_col:
+            rel_min, duration, t0 = plate.time_axis
+        else:
+            rel_min = np.arange(plate.n_reads, dtype=float)
+            duration = float(rel_min[-1] - rel_min[0])
+            t0 = dt.time(0, 0)
+
+        if downsample and summary:
+            keep = _downsample_indices(rel_min, values[:, 0], max_points, downsample)
+            if keep is not None:
+                values = values[keep[:, 0]]
+                rel_min = rel_min[keep[:, 0]]
+            x = np.broadcast_to(rel_min[:, None], values.shape)
+        elif downsample:
+            x, values = _downsample(rel_min, values, max_points, downsample)
+        else:
+            x = np.broadcast_to(rel_min[:, None], values.shape)
+        points.append((x + x_offset, values))
+
+        # hour ticks
+        hour_marks = np.arange(0, duration + 0.1, 60)
+        tick_pos.extend(x_offset + hour_marks)
+        tick_lab.extend([_fmt(_add_minutes(t0, h)) for h in hour_marks])
+
+        centre_pos.append(x_offset + duration / 2)
+        x_offset += duration
+        if idx < len(samples) - 1:
+            divider_pos.append(x_offset)
+    return points, (tick_pos, tick_lab, centre_pos, divider_pos, x_offset)
+
 # ────────────────────────── main plotting API ─────────────────────────
 
+_ARTIST_MODES = ("sample", "replicate")
+_SUMMARY_MODES = ("sd", "sem")
+TITLE_GID = "protrace-title"
+SUBTITLE_GID = "protrace-subtitle"
+DATA_GID = "protrace-data"
+DIVIDER_GID = "protrace-divider"
+LABEL_GID = "protrace-label"
+BAND_GID = "protrace-band"
+
 def plot_stdized_samples(
     samples: Iterable[Any],
     *,
@@ -70,67 +221,91 @@ def plot_stdized_samples(
     title: str | None = None,
     subtitle: str | None = None,
     y_label: str = r"$A_{350}$",
+    artists: str = "sample",
+    downsample: str | None = None,
+    max_points: int | None = None,
+    rasterize: bool = False,
+    summary: str | None = None,
 ):
     """Plot *standardised* A₃₅₀ traces for a collection of *Sample* objects.
 
+    Samples backed by the same :class:`PlateMatrix` (or the same DataFrame)
+    are standardised together in a single vectorised pass.
+
     Parameters
     ----------
     y_label : str, default ``"$A_{350}$"``
         Text to display on the y‑axis. Supply any string (including LaTeX math
         wrapped in ``$...$``) to override the default.
+    artists : {"sample", "replicate"}, default ``"sample"``
+        How data points are batched into artists.  ``"sample"`` draws all
+        replicates of a sample as one marker-only line (pixel-identical to
+        one line per replicate); ``"replicate"`` is the original one line per
+        replicate column.
+    downsample : {"lttb", "minmax"}, optional
+        Reduce every replicate to at most *max_points* points before plotting
+        so long runs (thousands of reads) draw and export in roughly constant
+        time.  ``None`` plots every read.
+    max_points : int, optional
+        Points per replicate when *downsample* is set; defaults to about two
+        per pixel column of the sample's share of the axis at 300 dpi.
+    rasterize : bool, default ``False``
+        Embed the data points of SVG/PDF exports as a bitmap while axes, ticks
+        and text stay vector.
+    summary : {"sd", "sem"}, optional
+        Draw every sample as the mean of its replicates with a shaded band of
+        ± one standard deviation (``"sd"``) or standard error (``"sem"``)
+        instead of every replicate point; *artists* is then ignored and
+        *max_points* applies to the mean.  Two artists per sample, however
+        many replicates.
     """
-    # ― global font family (optional) ―───────────────────────────────
-    if font is not None:
-        plt.rcParams["font.family"] = font
-
+    if artists not in _ARTIST_MODES:
+        raise ValueError(f"`artists` must be one of {', '.join(_ARTIST_MODES)}")
+    if summary is not None and summary not in _SUMMARY_MODES:
+        raise ValueError(f"`summary` must be one of {', '.join(_SUMMARY_MODES)}")
+    if downsample is not None and downsample not in _DOWNSAMPLE_METHODS:
+        raise ValueError(f"`downsample` must be one of {', '.join(_DOWNSAMPLE_METHODS)}")
     samples = list(samples)
     if not samples:
         raise ValueError("`samples` is empty")
+    if downsample and not max_points:
+        max_points = _default_max_points(figsize, len(samples))
 
-    cmap = plt.get_cmap(cmap_name)
-    fig, ax = plt.subplots(figsize=figsize)
+    cmap = mpl.colormaps[cmap_name]
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
 
-    # ────────────────────── layout bookkeeping ───────────────────────
-    x_offset = 0.0
-    divider_pos, centre_pos = [], []
-    legend_handles: list[Any] = []
-    tick_pos, tick_lab = [], []
-
-    for idx, sample in enumerate(samples):
-        df_val = sample.stdized_diff_sample()
-        if isinstance(df_val, pd.Series):
-            df_val = df_val.to_frame(name=df_val.name or getattr(sample, "background_well", "val"))
-        df_raw = sample.dataframe
-
-        # relative minutes axis
-        if time_col in df_raw.columns:
-            rel_min, duration, t0 = _series_to_rel_minutes(df_raw[time_col])
-        else:
-            rel_min = df_val.index.to_numpy(dtype=float)
-            duration = float(rel_min[-1] - rel_min[0])
-            t0 = dt.time(0, 0)
+    # standardise (or summarise) every sample in one vectorised pass over the plate matrix
+    stdized = _standardize(samples, time_col, summary)
+    points, (tick_pos, tick_lab, centre_pos, divider_pos, total_span) = _data_layout(
+        samples, stdized, time_col, downsample, max_points, summary
+    )
 
+    legend_handles: list[Any] = []
+    for idx, (sample, (x, values)) in enumerate(zip(samples, points)):
         # plot replicates
         colour = cmap(idx % cmap.N)
-        for col in df_val.columns:
-            ax.plot(rel_min + x_offset, df_val[col].to_numpy(), ".", ms=dot_size, color=colour)
-        legend_handles.append(ax.plot([], [], ".", ms=8, color=colour, label=sample.sample_name)[0])
-
-        # hour ticks
-        hour_marks = np.arange(0, duration + 0.1, 60)
-        tick_pos.extend(x_offset + hour_marks)
-        tick_lab.extend([_fmt(_add_minutes(t0, h)) for h in hour_marks])
-
-        centre_pos.append(x_offset + duration / 2)
-        x_offset += duration
-        if idx < len(samples) - 1:
-            divider_pos.append(x_offset)
-
-    total_span = x_offset
+        if summary:
+            _band(ax, x[:, 0], values[:, 1], values[:, 2], colour, rasterize, f"{BAND_GID}-{idx}")
+            ax.plot(x[:, 0], values[:, 0], "-", lw=1.5, color=colour,
+                    rasterized=rasterize, gid=f"{DATA_GID}-{idx}")
+            legend_handles.append(Line2D([], [], lw=2, color=colour, label=sample.sample_name))
+            continue
+        if artists == "replicate":
+            for col in range(values.shape[1]):
+                ax.plot(x[:, col], values[:, col], ".", ms=dot_size, color=colour,
+                        rasterized=rasterize, gid=f"{DATA_GID}-{idx}-{col}")
+        else:
+            # column-major ravel keeps the per-replicate drawing order
+            ax.plot(x.ravel(order="F"), values.ravel(order="F"), ".",
+                    ms=dot_size, color=colour, rasterized=rasterize, gid=f"{DATA_GID}-{idx}")
+        legend_handles.append(Line2D([], [], linestyle="none", marker=".", ms=8,
+                                     color=colour, label=sample.sample_name))
 
     # ────────────────────── cosmetics ────────────────────────────────
-    for xb in divider_pos:
-        ax.axvline(xb, color="k", linewidth=1, zorder=0)
+    for i, xb in enumerate(divider_pos):
+        ax.axvline(xb, color="k", linewidth=1, zorder=0, gid=f"{DIVIDER_GID}-{i}")
     ax.axhline(0, linestyle=":", color="k", linewidth=1.0)
     for sp in ("left", "bottom"):
         ax.spines[sp].set_linewidth(2.0)
@@ -143,9 +318,9 @@ def plot_stdized_samples(
     ax.set_xticklabels(tick_lab, fontweight="bold", fontsize=9)
 
     # per-sample labels beneath traces
-    for xc, samp in zip(centre_pos, samples):
+    for idx, (xc, samp) in enumerate(zip(centre_pos, samples)):
         ax.text(xc, -0.08, samp.sample_name, transform=ax.get_xaxis_transform(),
-                ha="center", va="top", fontweight="bold")
+                ha="center", va="top", fontweight="bold", gid=f"{LABEL_GID}-{idx}")
 
     # global Time label
     try:
@@ -160,13 +335,134 @@ def plot_stdized_samples(
     ax.legend(handles=legend_handles, frameon=False, bbox_to_anchor=(1.02, 0.5), loc="center left")
 
     # ────────────────────── titles (adjusted) ────────────────────────
-    if title:
-        fig.suptitle(title, fontsize=18, fontweight="bold", y=0.86)
-    if subtitle:
-        fig.text(0.5, 0.8, subtitle, ha="center", va="top", fontweight="bold", fontsize=14)
+    _set_title(fig, title)
+    _set_subtitle(fig, subtitle)
+
+    # ― font family for this figure only (optional) ―───────────────
+    _apply_font(fig, font)
 
     # tighten layout
-    fig.subplots_adjust(bottom=0.20, top=0.88)
-    fig.tight_layout(rect=(0, 0, 1, 0.88))
+    _layout(fig)
 
     return fig, ax
+
+
+def update_cosmetics(
+    fig: Figure,
+    *,
+    width: float | None = None,
+    font: str | None = None,
+    title: str | None = None,
+    subtitle: str | None = None,
+    y_label: str = r"$A_{350}$",
+) -> Figure:
+    """Apply new cosmetic settings to a figure from :func:`plot_stdized_samples`.
+
+    The result draws like a figure built from scratch with the same samples
+    and these settings, without re-standardising or re-plotting the data.
+    The figure is only laid out again when something the layout depends on
+    changed: *y_label*, *font*, *width* or the height of the title (e.g. a
+    title added, removed or gaining descenders); a new subtitle or a title of
+    the same height is a text swap.  The figure height is kept.
+
+    Parameters
+    ----------
+    width : float, optional
+        New figure width in inches; ``None`` keeps the current width.
+    font, title, subtitle, y_label
+        As for :func:`plot_stdized_samples`.
+    """
+    if not isinstance(fig.canvas, FigureCanvasAgg):  # e.g. an unpickled figure
+        FigureCanvasAgg(fig)
+    ax = fig.axes[0]
+    family = [font] if font is not None else list(mpl.rcParams["font.family"])
+    relayout = (
+        ax.get_ylabel() != y_label
+        or ax.yaxis.label.get_fontfamily() != family
+        or (width is not None and fig.get_figwidth() != width)
+    )
+    title_height = _title_height(fig)
+
+    _set_title(fig, title)
+    _set_subtitle(fig, subtitle)
+    ax.set_ylabel(y_label)
+    if width is not None:
+        fig.set_size_inches(width, fig.get_figheight())
+    # new texts and a changed font need the family set (again) on every text
+    _apply_font(fig, font if font is not None else family)
+
+    if relayout or _title_height(fig) != title_height:
+        _layout(fig)
+    return fig
+
+
+def refresh_data(
+    fig: Figure,
+    samples: Iterable[Any],
+    *,
+    time_col: str = "Time",
+    cmap_name: str = "tab10",
+    artists: str = "sample",
+    downsample: str | None = None,
+    max_points: int | None = None,
+    summary: str | None = None,
+) -> Figure:
+    """Move the data of a figure from :func:`plot_stdized_samples` to *samples*.
+
+    For plates that gained reads since the figure was built: the points,
+    hour ticks, sample dividers, sample labels and axis limits are updated in
+    place and the figure is laid out again.  The result draws like a figure
+    built from scratch with the same samples and settings.  *samples* must be
+    the layout the figure was built for (same samples, wells and order); the
+    remaining parameters must repeat the ones used to build it.
+    """
+    if not isinstance(fig.canvas, FigureCanvasAgg):  # e.g. an unpickled figure
+        FigureCanvasAgg(fig)
+    samples = list(samples)
+    if downsample and not max_points:
+        max_points = _default_max_points(tuple(fig.get_size_inches()), len(samples))
+    ax = fig.axes[0]
+    by_gid = {a.get_gid(): a for a in (*ax.lines, *ax.collections, *ax.texts) if a.get_gid()}
+
+    stdized = _standardize(samples, time_col, summary)
+    points, (tick_pos, tick_lab, centre_pos, divider_pos, total_span) = _data_layout(
+        samples, stdized, time_col, downsample, max_points, summary
+    )
+
+    with stage("refresh"):
+        if summary:
+            # a band is a polygon over the whole curve: replaced, in the original order
+            cmap = mpl.colormaps[cmap_name]
+            for idx, (x, values) in enumerate(points):
+                old = by_gid.pop(f"{BAND_GID}-{idx}")
+                rasterized = old.get_rasterized()
+                old.remove()
+                _band(ax, x[:, 0], values[:, 1], values[:, 2], cmap(idx % cmap.N), rasterized, f"{BAND_GID}-{idx}")
+        for idx, (x, values) in enumerate(points):
+            if summary:
+                by_gid[f"{DATA_GID}-{idx}"].set_data(x[:, 0], values[:, 0])
+            elif artists == "replicate":
+                for col in range(values.shape[1]):
+                    by_gid[f"{DATA_GID}-{idx}-{col}"].set_data(x[:, col], values[:, col])
+            else:
+                by_gid[f"{DATA_GID}-{idx}"].set_data(x.ravel(order="F"), values.ravel(order="F"))
+            by_gid[f"{LABEL_GID}-{idx}"].set_x(centre_pos[idx])
+        for i, xb in enumerate(divider_pos):
+            by_gid[f"{DIVIDER_GID}-{i}"].set_xdata([xb, xb])
+
+        ax.set_xlim(0, total_span)
+        ax.set_xticks(tick_pos)
+        ax.set_xticklabels(tick_lab, fontweight="bold", fontsize=9)
+        _apply_font(fig, ax.yaxis.label.get_fontfamily())
+
+        # y limits from the new data, as a fresh figure autoscales them
+        ax.relim()
+        # relim() skips collections
+        if summary:
+            for x, values in points:
+                ax.update_datalim(np.vstack([np.column_stack([x[:, 0], values[:, 1]]),
+                                             np.column_stack([x[:, 0], values[:, 2]])]))
+        ax.autoscale_view(scalex=False)
+
+    _layout(fig)
+    return fig
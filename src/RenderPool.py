@@ -0,0 +1,370 @@
+"""Pool of pre-warmed render workers for concurrent plot requests.
+
+Matplotlib holds the GIL for most of a draw, so concurrent requests handled in
+one process serialise behind each other.  :class:`RenderPool` keeps a few
+worker processes with matplotlib, pandas and the font cache already loaded and
+dispatches each render job to one of them.  Rendering is pyplot-free and
+reentrant, so ``mode="thread"`` runs the same jobs on a thread pool inside
+this process instead (no per-job pickling, no process start-up cost).
+
+* ``processes`` – pool size; ``0`` renders inline in the calling thread.
+* ``timeout`` – seconds a caller waits for one job before giving up.  A timed
+  out job may still be running, so the whole pool is retired: it accepts no new
+  jobs, in-flight jobs get a grace period to finish and the remaining workers
+  are then terminated.  New jobs go to a fresh pool.
+* ``max_jobs_per_worker`` – workers are replaced after this many jobs to bound
+  memory growth (process mode only).
+"""
+from __future__ import annotations
+
+import contextvars
+import multiprocessing
+import multiprocessing.pool
+import threading
+import time
+from typing import Any, Callable
+
+# ───────────────────────── worker-side functions ─────────────────────
+
+def _warm_worker() -> None:
+    """Pool initializer: import the heavy modules and build font caches once."""
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    import ProtPlotting  # noqa: F401
+
+    # first text draw loads the font list and mathtext machinery
+    fig = Figure(figsize=(1, 1))
+    FigureCanvasAgg(fig)
+    fig.add_subplot().set_title(r"$A_{350}$")
+    fig.canvas.draw()
+
+
+def _ping(_: Any = None) -> int:
+    """No-op job; returns once a worker has run its initializer."""
+    import os
+
+    return os.getpid()
+
+
+def _build_samples(plate: Any, samples_config: list[dict], plot_settings: dict) -> list:
+    """The samples of a render request, on a common time grid with ``plotSettings.align``.
+
+    *plate* is a plate or a dict of plates by dataset id (see
+    :func:`Sample.samples_from_config`); ``align`` is ``true`` or
+    ``{"step": minutes, "span": "shortest" | "longest"}`` (see
+    :func:`PlateMatrix.align_plates`).
+    """
+    from Metrics import stage
+    from PlateMatrix import align_plates
+    from Sample import samples_from_config
+
+    with stage("samples"):
+        align = plot_settings.get("align")
+        if align:
+            options = align if isinstance(align, dict) else {}
+            plates = plate if isinstance(plate, dict) else {None: plate}
+            plate = align_plates(plates, step=options.get("step"), span=options.get("span", "shortest"))
+        return samples_from_config(plate, samples_config)
+
+
+def _plot_figure(plate: Any, samples_config: list[dict], plot_settings: dict) -> Any:
+    """Build the samples and draw the figure for a render request."""
+    from Jobs import checkpoint
+    from Metrics import stage
+    from ProtPlotting import plot_stdized_samples
+
+    samples = _build_samples(plate, samples_config, plot_settings)
+    checkpoint()
+    with stage("plot"):
+        fig, _ = plot_stdized_samples(
+            samples,
+            figsize=(plot_settings["width"], 5),  # height is fixed at 5
+            font=plot_settings["font"],
+            title=plot_settings["title"],
+            subtitle=plot_settings["subtitle"],
+            y_label=plot_settings["yLabel"],
+            artists=plot_settings.get("artists", "sample"),
+            downsample=plot_settings.get("downsample"),
+            max_points=plot_settings.get("maxPoints"),
+            rasterize=bool(plot_settings.get("rasterize", False)),
+            summary=plot_settings.get("summary"),
+        )
+    checkpoint()
+    return fig
+
+
+def apply_cosmetics(fig: Any, plot_settings: dict) -> Any:
+    """Update a figure built by a render job to the cosmetic *plot_settings*.
+
+    The counterpart of the settings :func:`render_job` passes to the plot;
+    see :data:`FigureStore.COSMETIC_SETTINGS`.
+    """
+    from Metrics import stage
+    from ProtPlotting import update_cosmetics
+
+    with stage("cosmetics"):
+        return update_cosmetics(
+            fig,
+            width=plot_settings["width"],
+            font=plot_settings["font"],
+            title=plot_settings["title"],
+            subtitle=plot_settings["subtitle"],
+            y_label=plot_settings["yLabel"],
+        )
+
+
+def refresh_plot(fig: Any, plate: Any, samples_config: list[dict], plot_settings: dict) -> Any:
+    """Update a figure built by a render job to the reads *plate* has now.
+
+    For plates that grow during a live acquisition; *samples_config* and the
+    data settings must be the ones the figure was built with.
+    """
+    from ProtPlotting import refresh_data
+
+    samples = _build_samples(plate, samples_config, plot_settings)
+    return refresh_data(
+        fig,
+        samples,
+        artists=plot_settings.get("artists", "sample"),
+        downsample=plot_settings.get("downsample"),
+        max_points=plot_settings.get("maxPoints"),
+        summary=plot_settings.get("summary"),
+    )
+
+
+def render_job(
+    plate: Any,
+    samples_config: list[dict],
+    plot_settings: dict,
+    formats: list[str],
+    dpi: int = 150,
+    quality: str = "export",
+) -> tuple[dict[str, bytes], list[tuple[str, float]]]:
+    """Build the samples, draw the figure and encode it to *formats* at *dpi* / *quality*.
+
+    Returns the encoded outputs and the ``(stage, seconds)`` timings measured
+    on the worker, for the caller to merge into its request timer.
+    """
+    from Export import render_formats
+    from Metrics import timing
+
+    with timing() as timer:
+        fig = _plot_figure(plate, samples_config, plot_settings)
+        outputs = render_formats(fig, formats, dpi=dpi, quality=quality)
+    return outputs, timer.stages()
+
+
+def render_figure_job(
+    plate: Any,
+    samples_config: list[dict],
+    plot_settings: dict,
+    formats: list[str],
+    dpi: int = 150,
+    quality: str = "export",
+    pickled: bool = False,
+) -> tuple[dict[str, bytes], list[tuple[str, float]], Any]:
+    """Like :func:`render_job`, but also return the figure for later cosmetic updates.
+
+    With *pickled* the figure is returned as pickle bytes (what crossing a
+    process boundary costs anyway), so the caller only pays for unpickling
+    when it actually reuses the figure.
+    """
+    import pickle
+
+    from Export import render_formats
+    from Metrics import stage, timing
+
+    with timing() as timer:
+        fig = _plot_figure(plate, samples_config, plot_settings)
+        outputs = render_formats(fig, formats, dpi=dpi, quality=quality)
+        if pickled:
+            with stage("pickle"):
+                fig = pickle.dumps(fig)
+    return outputs, timer.stages(), fig
+
+# ───────────────────────────── the pool ──────────────────────────────
+
+class RenderTimeoutError(TimeoutError):
+    """Raised when a render job does not finish within the pool timeout."""
+
+
+class RenderPool:
+    """Dispatch render jobs to a pool of warm worker processes (or threads).
+
+    Parameters
+    ----------
+    processes : int, default 2
+        Number of workers; ``0`` runs jobs inline.
+    timeout : float, default 60
+        Seconds to wait for a single job.
+    max_jobs_per_worker : int, default 50
+        Recycle a worker process after this many jobs (``0`` = never).
+    mode : {"process", "thread"}, default "process"
+        Run workers as separate processes or as threads of this process.
+    """
+
+    def __init__(
+        self,
+        processes: int = 2,
+        timeout: float = 60.0,
+        max_jobs_per_worker: int = 50,
+        mode: str = "process",
+    ):
+        if mode not in ("process", "thread"):
+            raise ValueError(f"mode must be 'process' or 'thread', not {mode!r}")
+        self.mode = mode
+        self.processes = max(0, int(processes))
+        self.timeout = float(timeout)
+        self.max_jobs_per_worker = int(max_jobs_per_worker) or None
+        self._pool = None
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.retired = 0
+
+    # ― lifecycle ―────────────────────────────────────────────────────
+    def start(self, wait: bool = False) -> "RenderPool":
+        """Create the worker processes now instead of on the first job.
+
+        With *wait*, block until the workers are warm (inline mode warms
+        this process instead).
+        """
+        if not self.processes:
+            if wait:
+                _warm_worker()
+            return self
+        pool = self._get_pool()
+        if wait and self.mode == "process":
+            pool.map(_ping, range(self.processes), chunksize=1)
+        return self
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None and self.mode == "thread":
+                _warm_worker()
+                self._pool = multiprocessing.pool.ThreadPool(processes=self.processes)
+            elif self._pool is None:
+                # "spawn" avoids forking a multi-threaded server process
+                ctx = multiprocessing.get_context("spawn")
+                self._pool = ctx.Pool(
+                    processes=self.processes,
+                    initializer=_warm_worker,
+                    maxtasksperchild=self.max_jobs_per_worker,
+                )
+            return self._pool
+
+    def _retire(self, pool) -> None:
+        """Stop sending work to *pool* and terminate it once in-flight jobs had their chance."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+                self.retired += 1
+        pool.close()
+
+        def reap():
+            time.sleep(self.timeout)
+            pool.terminate()
+            pool.join()
+
+        threading.Thread(target=reap, name="render-pool-reaper", daemon=True).start()
+
+    # ― jobs ―─────────────────────────────────────────────────────────
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on a worker and return its result."""
+        if not self.processes:
+            return self._finish(fn, *args)
+
+        pool = self._get_pool()
+        if self.mode == "thread":
+            # carry the caller's context (e.g. its job, for cancellation checkpoints)
+            args = (fn, *args)
+            fn = contextvars.copy_context().run
+        async_result = pool.apply_async(fn, args)
+        try:
+            result = async_result.get(self.timeout)
+        except multiprocessing.TimeoutError:
+            self._count("timeouts")
+            self._retire(pool)
+            raise RenderTimeoutError(f"Render did not finish within {self.timeout:g} s") from None
+        except Exception:
+            self._count("failed")
+            raise
+        self._count("completed")
+        return result
+
+    def _finish(self, fn: Callable[..., Any], *args: Any) -> Any:
+        try:
+            result = fn(*args)
+        except Exception:
+            self._count("failed")
+            raise
+        self._count("completed")
+        return result
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def render(
+        self,
+        plate: Any,
+        samples_config: list[dict],
+        plot_settings: dict,
+        formats: list[str],
+        dpi: int = 150,
+        quality: str = "export",
+    ) -> dict[str, bytes]:
+        """Render a plot on a worker; see :func:`render_job`.
+
+        The worker's stage timings are merged into the caller's request timer.
+        """
+        from Metrics import record
+
+        outputs, stages = self.submit(render_job, plate, samples_config, plot_settings, formats, dpi, quality)
+        record(stages)
+        return outputs
+
+    def render_figure(
+        self,
+        plate: Any,
+        samples_config: list[dict],
+        plot_settings: dict,
+        formats: list[str],
+        dpi: int = 150,
+        quality: str = "export",
+    ) -> tuple[dict[str, bytes], Any]:
+        """Render like :meth:`render` and also return the figure (see :func:`render_figure_job`).
+
+        From worker processes the figure arrives as pickle bytes.
+        """
+        from Metrics import record
+
+        pickled = self.mode == "process" and self.processes > 0
+        outputs, stages, fig = self.submit(
+            render_figure_job, plate, samples_config, plot_settings, formats, dpi, quality, pickled
+        )
+        record(stages)
+        return outputs, fig
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "processes": self.processes,
+            "timeout": self.timeout,
+            "maxJobsPerWorker": self.max_jobs_per_worker or 0,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "retired": self.retired,
+        }
@@ -1,25 +1,68 @@
 from Preprocessing import *
+from PlateMatrix import PlateMatrix
+from typing import NamedTuple
 import pandas as pd
 import numpy as np
 
+class SampleSummary(NamedTuple):
+    """
+    per-read mean, standard deviation (ddof 1), standard error and replicate count of one sample;
+    SD and SEM are NaN where fewer than two replicates have a value
+    """
+    mean : np.ndarray
+    sd : np.ndarray
+    sem : np.ndarray
+    n : np.ndarray
+
 class Sample:
     def __init__(self, dataframe, sample_name : str, background_well : str = None, sample_wells : list = None):
+        """
+        dataframe can be the preprocessed plate DataFrame or a PlateMatrix; samples of the
+        same dataset should share one PlateMatrix so they are standardized in one pass
+        """
         self.dataframe = dataframe
         self.sample_name = sample_name
         self.background_well = background_well
         self.sample_wells = sample_wells
+        self._plate = dataframe if isinstance(dataframe, PlateMatrix) else None
+    @property
+    def plate(self):
+        """
+        the PlateMatrix backing this sample (built on first use for DataFrame input)
+        """
+        if self._plate is None:
+            self._plate = PlateMatrix.from_dataframe(self.dataframe)
+        return self._plate
+    def well_indices(self):
+        """
+        integer columns of the plotted wells and the background column to subtract (or None)
+        """
+        plate = self.plate
+        if (self.sample_wells is None):
+            return plate.columns([self.background_well]), None
+        elif (self.background_well is None):
+            return plate.columns(self.sample_wells), None
+        else:
+            return plate.columns(self.sample_wells), plate.column_index(self.background_well)
     def stdized_diff_sample_mean(self):
         """
         calculate the mean of difference between background well and sample wells (standardization by the background)
         """
+        if isinstance(self.dataframe, PlateMatrix):
+            return pd.Series(summarize_samples([self])[0].mean, name = self.sample_name)
         if (self.sample_wells is None):
             return self.dataframe[self.background_well]
         elif (self.background_well is None):
-            return np.mean(self.dataframe[self.sample_wells], aixs = 1)
+            return np.mean(self.dataframe[self.sample_wells], axis = 1)
         else:
             return np.mean(self.dataframe[self.sample_wells].sub(self.dataframe[self.background_well], axis = 0), axis = 1)
     def stdized_diff_sample(self):
-        if (self.sample_wells is None): 
+        if isinstance(self.dataframe, PlateMatrix):
+            values = stdized_diff_samples([self])[0]
+            if (self.sample_wells is None):
+                return pd.Series(values[:, 0], name = self.background_well)
+            return pd.DataFrame(values, columns = list(self.sample_wells))
+        if (self.sample_wells is None):
             return self.dataframe[self.background_well]
         elif (self.background_well is None):
             return self.dataframe[self.sample_wells]
@@ -27,3 +70,98 @@ class Sample:
             return self.dataframe[self.sample_wells].sub(self.dataframe[self.background_well], axis = 0)
     pass
 
+def samples_from_config(plate, samples_config : list):
+    """
+    create Sample objects from the frontend's samplesConfig entries
+    (sampleName, backgroundWell, sampleWells); "empty" wells are treated as None
+
+    for a figure drawn from several workbooks *plate* is a dict of plates by dataset id and
+    every entry takes the plate of its own ``datasetId``; entries without one (or naming an
+    id not in the dict) take the plate under the key ``None``
+    """
+    plates = plate if isinstance(plate, dict) else {None: plate}
+    samples = []
+    for sample_config in samples_config:
+        samples.append(Sample(
+            dataframe = plates.get(sample_config.get('datasetId'), plates.get(None)),
+            sample_name = sample_config['sampleName'],
+            background_well = sample_config.get('backgroundWell') or None,
+            sample_wells = sample_config.get('sampleWells') or None
+        ))
+    return samples
+
+def _stdized_blocks(samples, time_col : str = "Time"):
+    """
+    gather the standardized replicate columns of many samples, one block per plate
+
+    Yields ``(positions, values, counts)``: the positions of the plate's samples in *samples*,
+    their (reads x replicates) values side by side and the replicate count of each.
+    Samples are grouped by their PlateMatrix (DataFrame-backed samples sharing a DataFrame
+    share one matrix). Per plate all replicate columns are gathered in one fancy-index and
+    the background columns are subtracted in one broadcast.
+    """
+    # one PlateMatrix per distinct source
+    plates = {}
+    for sample in samples:
+        if sample._plate is None:
+            key = id(sample.dataframe)
+            if key not in plates:
+                plates[key] = PlateMatrix.from_dataframe(sample.dataframe, time_col = time_col)
+            sample._plate = plates[key]
+
+    groups = {}
+    for pos, sample in enumerate(samples):
+        groups.setdefault(id(sample.plate), []).append(pos)
+
+    for positions in groups.values():
+        plate = samples[positions[0]].plate
+        cols, refs, counts = [], [], []
+        for pos in positions:
+            sample_cols, ref = samples[pos].well_indices()
+            cols.append(sample_cols)
+            refs.append(np.full(len(sample_cols), -1 if ref is None else ref, dtype = np.intp))
+            counts.append(len(sample_cols))
+        cols = np.concatenate(cols)
+        refs = np.concatenate(refs)
+
+        values = plate.values[:, cols]
+        has_ref = refs >= 0
+        if has_ref.any():
+            values[:, has_ref] -= plate.values[:, refs[has_ref]]
+        yield positions, values, counts
+
+def stdized_diff_samples(samples, time_col : str = "Time"):
+    """
+    standardize many samples at once; returns one (reads x replicates) array per sample
+    """
+    samples = list(samples)
+    results = [None] * len(samples)
+    for positions, values, counts in _stdized_blocks(samples, time_col):
+        for pos, block in zip(positions, np.split(values, np.cumsum(counts)[:-1], axis = 1)):
+            results[pos] = block
+    return results
+
+def summarize_samples(samples, time_col : str = "Time"):
+    """
+    mean, SD, SEM and n per read of every sample; returns one SampleSummary per sample
+
+    All samples of a plate are reduced together: the standardized replicate columns are
+    gathered once and summed per sample with ``np.add.reduceat`` (NaN reads are left out),
+    so there is no Python loop over samples or reads.
+    """
+    samples = list(samples)
+    results = [None] * len(samples)
+    for positions, values, counts in _stdized_blocks(samples, time_col):
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        finite = np.isfinite(values)
+        n = np.add.reduceat(finite, starts, axis = 1)
+        with np.errstate(invalid = "ignore", divide = "ignore"):
+            mean = np.add.reduceat(np.where(finite, values, 0.0), starts, axis = 1) / n
+            # second pass around the mean keeps the variance accurate for large offsets
+            deviation = np.where(finite, values - np.repeat(mean, counts, axis = 1), 0.0)
+            sd = np.sqrt(np.add.reduceat(deviation ** 2, starts, axis = 1) / (n - 1))
+            sd[n < 2] = np.nan
+            sem = sd / np.sqrt(n)
+        for i, pos in enumerate(positions):
+            results[pos] = SampleSummary(mean[:, i], sd[:, i], sem[:, i], n[:, i])
+    return results
@@ -0,0 +1,113 @@
+"""Background warm-up of the backend and its readiness state.
+
+The server binds its port straight away and answers ``/health`` while the
+expensive parts of start-up — importing numpy, pandas and matplotlib, loading
+the font list, starting the render workers — run as named phases on a
+background thread::
+
+    warmup = Warmup([("numpy", lambda: importlib.import_module("numpy")), ...])
+    warmup.start()
+    ...
+    warmup.status()   # {"ready": False, "phase": "matplotlib", "phases": [...]}
+
+Each phase's wall time is recorded, which doubles as the import-time breakdown
+of a cold start.  A failing phase stops the warm-up; the backend keeps
+serving and the failure is reported by :meth:`Warmup.status`.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+Phase = tuple[str, Callable[[], Any]]
+
+log = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Run start-up *phases* in order on a background thread and track their progress.
+
+    Parameters
+    ----------
+    phases : list of (name, callable)
+        Work to do, in order.
+    on_ready : callable, optional
+        Called with the warm-up itself once every phase has finished (not on failure).
+    """
+
+    def __init__(self, phases: list[Phase], on_ready: Callable[["Warmup"], Any] | None = None):
+        self.phases = list(phases)
+        self.on_ready = on_ready
+        self.started = time.perf_counter()
+        self.timings: list[tuple[str, float]] = []
+        self.phase: str | None = None
+        self.error: str | None = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    # ― lifecycle ―────────────────────────────────────────────────────
+    def start(self) -> "Warmup":
+        """Run the phases on a daemon thread (idempotent)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="backend-warmup", daemon=True)
+                self._thread.start()
+        return self
+
+    def run(self) -> None:
+        """Run the phases in the calling thread."""
+        try:
+            for name, fn in self.phases:
+                with self._lock:
+                    self.phase = name
+                start = time.perf_counter()
+                try:
+                    fn()
+                except Exception as e:
+                    with self._lock:
+                        self.error = f"{name}: {e}"
+                    log.exception("Start-up phase %s failed", name)
+                    return
+                with self._lock:
+                    self.timings.append((name, time.perf_counter() - start))
+            with self._lock:
+                self.phase = None
+            if self.on_ready is not None:
+                self.on_ready(self)
+        finally:
+            self._done.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the warm-up has finished (or failed); ``True`` if it is ready."""
+        self._done.wait(timeout)
+        return self.ready
+
+    # ― state ―────────────────────────────────────────────────────────
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set() and self.error is None
+
+    def elapsed(self) -> float:
+        """Seconds since the warm-up object was created (roughly process start)."""
+        return time.perf_counter() - self.started
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            timings = list(self.timings)
+            phase, error = self.phase, self.error
+        return {
+            "ready": self.ready,
+            "phase": phase,
+            "error": error,
+            "phases": [{"name": n, "seconds": round(s, 4)} for n, s in timings],
+            "pending": [n for n, _ in self.phases[len(timings):]] if error is None else [],
+            "elapsed": round(self.elapsed(), 4),
+        }
+
+    def summary(self) -> str:
+        """``name=seconds`` pairs of the finished phases, e.g. for a log line."""
+        with self._lock:
+            return " ".join(f"{n}={s:.3f}" for n, s in self.timings)
@@ -0,0 +1,123 @@
+"""Conversion of a plate's time column to a relative-minutes axis.
+
+Every sample of a dataset shares the same time column, so the axis is
+resolved once per dataset (see :attr:`PlateMatrix.time_axis`) rather than once
+per plotted sample.  All supported inputs go through array operations:
+
+* ``datetime64`` / ``Timestamp`` / ``datetime`` – integer nanosecond arithmetic
+* ``timedelta64`` / ``timedelta`` – elapsed seconds
+* ``datetime.time`` – clock fields gathered into an integer array, then
+  weighted into seconds since midnight
+* ``"HH:MM[:SS]"`` strings – split into fields with vectorised string ops
+* numerics – used as minutes directly
+
+Time-of-day inputs that cross midnight keep increasing instead of jumping back
+by 24 h.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import itertools
+import operator
+
+import numpy as np
+import pandas as pd
+
+_DAY_MINUTES = 24 * 60
+_CLOCK_FIELDS = operator.attrgetter("hour", "minute", "second", "microsecond")
+_CLOCK_SECONDS = np.array([3600.0, 60.0, 1.0, 1e-6])  # seconds per unit of each clock field
+
+# ───────────────────────── helper utilities ──────────────────────────
+
+def _time_of_day(seconds: float) -> dt.time:
+    seconds = float(seconds) % (_DAY_MINUTES * 60)
+    h, rem = divmod(int(seconds), 3600)
+    m, s = divmod(rem, 60)
+    return dt.time(h, m, s)
+
+
+def _unwrap_days(minutes: np.ndarray) -> np.ndarray:
+    """Add 24 h after every backwards jump of a time-of-day sequence."""
+    steps = np.diff(minutes, prepend=minutes[:1])
+    return minutes + np.cumsum(steps < 0) * _DAY_MINUTES
+
+
+def _time_seconds(values: np.ndarray) -> np.ndarray:
+    """Seconds since midnight of an array of ``datetime.time``."""
+    fields = np.fromiter(
+        itertools.chain.from_iterable(map(_CLOCK_FIELDS, values)), dtype=np.int64, count=4 * len(values)
+    )
+    return fields.reshape(-1, 4) @ _CLOCK_SECONDS
+
+
+def _clock_seconds(series: pd.Series) -> np.ndarray | None:
+    """Seconds since midnight for ``"HH:MM[:SS]"`` strings, ``None`` if any fails to parse."""
+    text = series.astype(str).str.strip()
+    fields = text.str.split(":", expand=True)
+    if fields.shape[1] not in (2, 3):
+        return None
+    parts = fields.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    if np.isnan(parts[:, :2]).any():
+        return None
+    secs = parts[:, 0] * 3600 + parts[:, 1] * 60
+    if parts.shape[1] == 3:
+        # "HH:MM" rows next to "HH:MM:SS" rows have no seconds field
+        secs += np.nan_to_num(parts[:, 2])
+    return secs
+
+
+def _result(rel: np.ndarray, t0: dt.time) -> tuple[np.ndarray, float, dt.time]:
+    rel = np.ascontiguousarray(rel, dtype=np.float64)
+    rel.flags.writeable = False
+    return rel, float(rel[-1]), t0
+
+# ────────────────────────── main conversion API ───────────────────────
+
+def to_rel_minutes(series: pd.Series) -> tuple[np.ndarray, float, dt.time]:
+    """Convert an absolute-time Series to minutes-since-start plus metadata.
+
+    Returns
+    -------
+    rel_minutes : numpy.ndarray
+        Read-only ``float64`` minutes relative to the first read.
+    duration : float
+        Minutes from the first to the last read.
+    start : datetime.time
+        Clock time of the first read (``00:00`` for purely numeric input).
+    """
+    series = pd.Series(series).reset_index(drop=True)
+    if series.empty:
+        raise ValueError("time column is empty")
+    first = series.iloc[0]
+
+    # pandas / numpy datetime64, python datetime
+    if pd.api.types.is_datetime64_any_dtype(series.dtype) or isinstance(first, dt.datetime):
+        ts = pd.to_datetime(series)
+        ns = ts.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        return _result((ns - ns[0]) / 6e10, ts.iloc[0].time())
+
+    # elapsed durations
+    if pd.api.types.is_timedelta64_dtype(series.dtype) or isinstance(first, dt.timedelta):
+        secs = pd.to_timedelta(series).dt.total_seconds().to_numpy()
+        return _result((secs - secs[0]) / 60.0, _time_of_day(secs[0]))
+
+    # native ``datetime.time``
+    if isinstance(first, dt.time):
+        secs = _time_seconds(series.to_numpy())
+        minutes = _unwrap_days(secs / 60.0)
+        return _result(minutes - minutes[0], first)
+
+    # numerics (already minutes)
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        values = series.to_numpy(dtype=float)
+        return _result(values - values[0], dt.time(0, 0))
+
+    # strings "HH:MM[:SS]"
+    secs = _clock_seconds(series)
+    if secs is not None:
+        minutes = _unwrap_days(secs / 60.0)
+        return _result(minutes - minutes[0], _time_of_day(secs[0]))
+
+    # numeric fallback
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    return _result(values - values[0], dt.time(0, 0))
@@ -8,7 +8,7 @@ import numpy as np
 header = 30
 
 df = pd.read_excel('/Users/zhijiang/Desktop/University/Bio Lab/Remote tasks/CA350ExampleData/CA350_unprocessedData/dataset2/TCA8_forTSAR_04152024.xlsx',header=header, )
-df = pre_process_df(df, 361)
+df = pre_process_df(df)
 
 DMSO = Sample(df, 'DMSO', 'B2') #background only
 sample_B = Sample(df, 'sample_B', 'B2', ['B3','B4'])
@@ -26,7 +26,6 @@ fig, ax = plot_stdized_samples(samples, time_col='Time',
                                subtitle="WT CA + Compound Only")
 # please do not attempt changing height 
 
-# If you’re in a script:
-plt.show()
-# Or save to disk:
+# The figure is not managed by pyplot (plt.show() will not display it);
+# show it inline in a notebook or save to disk:
 fig.savefig("A350_traces.svg", bbox_inches="tight")
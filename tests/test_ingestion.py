@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from Ingestion import read_plate_excel
+from workbook import make_workbook, plate_wells, synthetic_values
+
+
+@pytest.mark.parametrize("plate", [96, 384, 1536])
+def test_reads_every_well_of_the_plate(plate):
+    data = make_workbook(plate=plate, reads=10, time_format="minutes")
+    df = read_plate_excel(data)
+
+    wells = plate_wells(plate)
+    assert list(df.columns) == ["Time"] + wells
+    assert df.shape == (10, plate + 1)
+    np.testing.assert_allclose(df[wells].to_numpy(), synthetic_values(10, plate))
+
+
+def test_projects_1536_well_ids():
+    data = make_workbook(plate=1536, reads=5, time_format="minutes")
+    df = read_plate_excel(data, wells=["AF48", "Z1", "AA24"])
+    assert list(df.columns) == ["Time", "AF48", "Z1", "AA24"]
+    assert df["AF48"].notna().all()
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import Preprocessing
+from PlateMatrix import PlateMatrix
+from Preprocessing import (
+    detect_reads, mad_outliers, moving_average, normalize_pipeline, pipeline_key,
+    pre_process_df, run_pipeline, savgol_filter,
+)
+
+WELLS = ["A1", "A2", "A3", "A4"]
+
+
+def make_plate(reads=40):
+    rng = np.random.default_rng(0)
+    t = np.arange(reads, dtype=float)
+    values = np.column_stack([
+        np.full(reads, 0.05),                          # blank
+        0.05 + 1 / (1 + np.exp(-(t - reads / 2) / 3)), # sigmoid growth
+        0.05 + 0.005 * t,                              # straight line
+        0.5 + rng.normal(0, 0.01, reads),              # noisy plateau
+    ])
+    time = pd.Series([f"00:{m:02d}:00" for m in range(reads)])
+    return PlateMatrix(values, WELLS, time)
+
+
+def test_saturated_well_keeps_every_read():
+    values = np.arange(10 * 4, dtype=float).reshape(10, 4)
+    values[6:, 2] = np.nan  # saturated from read 7 on
+    values[8:, :] = np.nan  # run stopped after read 8
+    assert detect_reads(values) == 8
+
+    df = pd.DataFrame(values, columns=WELLS)
+    df.insert(0, "Time", [f"00:{m:02d}:00" for m in range(10)])
+    trimmed = pre_process_df(df)
+    assert len(trimmed) == 8
+    assert trimmed["A3"].isna().sum() == 2
+    assert trimmed[["A1", "A2", "A4"]].notna().all().all()
+
+
+def test_blank_subtracts_the_blank_wells_from_every_well():
+    plate = make_plate()
+    blanked = run_pipeline(plate, normalize_pipeline({"blank": "A1"}))
+    np.testing.assert_allclose(blanked.column("A1"), 0)
+    np.testing.assert_allclose(blanked.values, plate.values - plate.values[:, :1])
+    with pytest.raises(ValueError, match="B1"):
+        run_pipeline(plate, normalize_pipeline({"blank": ["B1"]}))
+
+
+def test_mad_outliers_masks_spikes_only():
+    plate = make_plate()
+    rng = np.random.default_rng(1)
+    values = plate.values + rng.normal(0, 0.005, plate.shape)
+    values[:, 0] = plate.values[:, 0]
+    values[7, 3] += 0.5
+    values[12, 2] -= 0.4
+    mask = mad_outliers(values, threshold=3.5, window=7)
+    assert set(zip(*np.nonzero(mask))) == {(7, 3), (12, 2)}
+    assert not mask[:, 0].any()  # no spread, no outliers
+
+    cleaned = run_pipeline(plate.with_values(values), normalize_pipeline({"outliers": True}))
+    assert np.isnan(cleaned.values[7, 3]) and np.isnan(cleaned.values[12, 2])
+    assert np.isfinite(cleaned.values).sum() == values.size - 2
+
+
+def test_smoothing_keeps_polynomials_and_missing_reads():
+    t = np.arange(15, dtype=float)[:, None]
+    quadratic = 0.1 + 0.02 * t + 0.003 * t ** 2
+    np.testing.assert_allclose(savgol_filter(quadratic, 7, 2), quadratic)
+    np.testing.assert_allclose(moving_average(t, 5)[2:-2], t[2:-2])
+
+    plate = make_plate()
+    values = plate.values.copy()
+    values[5, 2] = np.nan
+    for smooth in ({"method": "savgol"}, {"method": "moving", "window": 3}):
+        smoothed = run_pipeline(plate.with_values(values), normalize_pipeline({"smooth": smooth}))
+        assert np.isnan(smoothed.values[5, 2])
+        # a straight line is unchanged away from the ends and the gap
+        np.testing.assert_allclose(smoothed.column("A3")[7:-3], values[7:-3, 2])
+        assert np.std(smoothed.column("A4")) < np.std(values[:, 3])
+
+
+def test_pipeline_key_is_stable_across_equivalent_pipelines():
+    a = normalize_pipeline({"blank": ["A1", "A2"], "smooth": True, "reads": "auto", "dtype": "float64"})
+    b = normalize_pipeline({"smooth": {"method": "savgol", "order": 2, "window": 7}, "blank": ["A2", "A1", "A1"]})
+    assert a == b
+    assert pipeline_key("abc", a) == pipeline_key("abc", b)
+    assert pipeline_key("abc", a) != pipeline_key("abd", a)
+    assert pipeline_key("abc", a) != pipeline_key("abc", normalize_pipeline({"blank": "A1", "smooth": True}))
+    assert pipeline_key("abc", normalize_pipeline({"reads": "auto"})) == "abc"
+
+
+def test_run_pipeline_shares_the_time_axis():
+    plate = make_plate()
+    assert run_pipeline(plate, {}) is plate
+    processed = run_pipeline(plate, normalize_pipeline({"reads": 12, "dtype": "float32", "blank": "A1"}))
+    assert processed.values.dtype == np.float32
+    assert processed.shape == (12, 4)
+    assert processed.time_axis[2] == plate.time_axis[2]
+    np.testing.assert_allclose(processed.time_axis[0], plate.time_axis[0][:12])
+
+
+def test_server_preprocesses_a_dataset_once_per_pipeline(monkeypatch):
+    import server
+
+    calls = []
+    monkeypatch.setattr(Preprocessing, "run_pipeline", lambda *a: calls.append(a) or run_pipeline(*a))
+    server.preprocessed_cache.clear()
+    plate = make_plate()
+    smooth = normalize_pipeline({"smooth": True})
+    blank = normalize_pipeline({"blank": "A1"})
+
+    first = server.preprocess_plate(pipeline_key("ds", smooth), plate, smooth)
+    assert server.preprocess_plate(pipeline_key("ds", smooth), plate, smooth) is first
+    server.preprocess_plate(pipeline_key("ds", blank), plate, blank)
+    assert server.preprocess_plate("ds", plate, {}) is plate
+    assert len(calls) == 2